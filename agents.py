@@ -1,169 +1,261 @@
 """
 CartPilot Agent Implementations — Industrial Version (FINAL)
-Each agent has a single responsibility and updates shared state.
+Each agent has a single responsibility: it declares the state keys it reads
+and writes, and returns a partial update of the shared state.
 """
 
-import json
-from typing import Dict, Any
-from pathlib import Path
+import os
+import weakref
+from itertools import islice
+from typing import Dict, Any, List, Optional
 from state import CartPilotState
-from rules import get_dependencies, check_compatibility, get_all_dependencies
+from executor import agent
+from rules import RuleSet, get_rules, get_all_dependencies
+from catalog import get_catalog, fan_out, merge_offers, encode_cursor, ranked_offers
+from solver import solve
+from intent_cascade import IntentCascade
+from intent_vectors import CentroidClassifier, seed_documents
 
 
 # ============================================================
 # 1️⃣ INTENT AGENT — user text → industrial scenario
 # ============================================================
 
-def intent_agent(state: CartPilotState) -> CartPilotState:
+# Scenario keywords and the fallback scenario live in the rules data file
+# (rules.json, "intent_keywords" / "default_scenario"); each RuleSet compiles its
+# own IntentMatcher, so a hot reload reaches the intent agent too
+
+# Vector centroids per rule set, built on its first escalation
+_intent_vectors: "weakref.WeakKeyDictionary[RuleSet, CentroidClassifier]" = weakref.WeakKeyDictionary()
+
+
+def load_intent_vectors(rules: Optional[RuleSet] = None) -> CentroidClassifier:
+    """Trained centroids from CARTPILOT_INTENT_MODEL, else built from the rules' keywords and scenario components."""
+    rules = rules or get_rules()
+    vectors = _intent_vectors.get(rules)
+    if vectors is None:
+        path = os.environ.get("CARTPILOT_INTENT_MODEL")
+        if path:
+            vectors = CentroidClassifier.load(path)
+        else:
+            vectors = CentroidClassifier.fit(*seed_documents(rules.intent_keywords, rules.scenarios))
+        vectors = _intent_vectors.setdefault(rules, vectors)
+    return vectors
+
+
+# Goals whose rule confidence is below the threshold go to the vector classifier,
+# then to the LLM if its similarity is below the vector threshold (0 disables escalation);
+# the LLM gets the timeout in seconds before the rule answer stands. The default 0.5 keeps
+# two-way ties with the rules, where the earlier scenario wins as it always has
+INTENT_CASCADE = IntentCascade(
+    threshold=float(os.environ.get("CARTPILOT_INTENT_THRESHOLD", "0.5")),
+    timeout=float(os.environ.get("CARTPILOT_INTENT_LLM_TIMEOUT", "3")),
+    vector_threshold=float(os.environ.get("CARTPILOT_INTENT_VECTOR_THRESHOLD", "0.25")),
+)
+
+
+def classify_intents(goals: List[str], rules: Optional[RuleSet] = None) -> List[Dict[str, Any]]:
+    """Run goals through the intent cascade with the keywords and centroids of rules (default: current)."""
+    rules = rules or get_rules()
+    return INTENT_CASCADE.classify_batch(
+        goals,
+        matcher=rules.intent_matcher,
+        default=rules.default_scenario,
+        load_vectors=lambda: load_intent_vectors(rules),
+    )
+
+
+@agent(reads=["user_goal", "rules_version"], writes=["parsed_intent"])
+def intent_agent(state: CartPilotState) -> Dict[str, Any]:
     """Convert user goal into industrial scenario"""
 
-    user_goal = state["user_goal"].lower()
-
-    if "electrical" in user_goal or "voltage" in user_goal:
-        scenario = "electrical_work"
-    elif "construction" in user_goal or "workshop" in user_goal:
-        scenario = "construction_work"
-    elif "fire" in user_goal:
-        scenario = "fire_risk_environment"
-    elif "height" in user_goal or "ladder" in user_goal:
-        scenario = "working_at_height"
-    elif "gas" in user_goal or "confined" in user_goal:
-        scenario = "confined_space"
-    elif "chemical" in user_goal or "spill" in user_goal:
-        scenario = "chemical_environment"
-    elif "security" in user_goal or "warehouse" in user_goal:
-        scenario = "facility_security"
-    elif "diagnostic" in user_goal or "testing" in user_goal:
-        scenario = "equipment_diagnostics"
-    else:
-        scenario = "tool_usage"
-
-    state["parsed_intent"] = {"scenario": scenario}
-    return state
+    rules = get_rules(state.get("rules_version"))
+
+    return {"parsed_intent": classify_intents([state["user_goal"]], rules)[0]}
 
 
 # ============================================================
 # 2️⃣ PLANNER AGENT — scenario → required components
 # ============================================================
 
-def planner_agent(state: CartPilotState) -> CartPilotState:
+# Scenario → components lives in the rules data file (rules.json, "scenarios")
+
+@agent(reads=["parsed_intent", "rules_version"], writes=["required_components"])
+def planner_agent(state: CartPilotState) -> Dict[str, Any]:
     """Map industrial scenario → required product categories"""
 
     scenario = state["parsed_intent"]["scenario"]
+    rules = get_rules(state.get("rules_version"))
 
-    scenario_mapping = {
-        "electrical_work": ["digital-multimeters", "clamp-meters"],
-        "construction_work": ["hard-hats-and-helmets", "safety-gloves"],
-        "fire_risk_environment": ["fire-extinguishers"],
-        "working_at_height": ["fall-protection"],
-        "confined_space": ["portable-gas-detectors"],
-        "chemical_environment": ["respirators", "spill-kits"],
-        "facility_security": ["video-surveillance", "locks"],
-        "equipment_diagnostics": ["thermal-cameras", "air-quality-sensors"],
-        "tool_usage": ["power-drills", "wrenches", "pliers"]
-    }
-
-    state["required_components"] = scenario_mapping.get(scenario, ["power-drills"])
-    return state
+    return {"required_components": rules.scenarios.get(scenario, ["power-drills"])}
 
 
 # ============================================================
 # 3️⃣ DEPENDENCY AGENT
 # ============================================================
 
-def dependency_agent(state: CartPilotState) -> CartPilotState:
+@agent(
+    reads=["required_components", "rules_version"],
+    writes=["component_dependencies", "missing_dependencies"],
+)
+def dependency_agent(state: CartPilotState) -> Dict[str, Any]:
     """Find missing dependencies using rules.py"""
 
     required_components = state["required_components"]
+    rules = get_rules(state.get("rules_version"))
 
-    component_dependencies = get_all_dependencies(required_components)
-
-    all_required_deps = set()
-    for deps in component_dependencies.values():
-        all_required_deps.update(deps)
+    # Transitive closures, precompiled once per rules version
+    component_dependencies = get_all_dependencies(required_components, rules)
 
     existing_components = set(required_components)
-    missing_dependencies = [dep for dep in all_required_deps if dep not in existing_components]
-
-    state["component_dependencies"] = component_dependencies
-    state["missing_dependencies"] = missing_dependencies
+    missing_dependencies = [
+        dep for dep in rules.dependencies.bundle(required_components) if dep not in existing_components
+    ]
 
-    return state
+    return {
+        "component_dependencies": component_dependencies,
+        "missing_dependencies": missing_dependencies,
+    }
 
 
 # ============================================================
 # 4️⃣ COMPATIBILITY AGENT
 # ============================================================
 
-def compatibility_agent(state: CartPilotState) -> CartPilotState:
+@agent(
+    reads=["required_components", "missing_dependencies", "rules_version"],
+    writes=["compatibility_matrix", "compatibility_issues"],
+)
+def compatibility_agent(state: CartPilotState) -> Dict[str, Any]:
     """Check compatibility between components"""
 
     required_components = state["required_components"]
     missing_deps = state["missing_dependencies"]
     all_components = required_components + missing_deps
 
-    compatibility_matrix = {}
-    compatibility_issues = []
+    compatibility = get_rules(state.get("rules_version")).compatibility
 
-    for comp1 in all_components:
-        compatibility_matrix[comp1] = {}
-        for comp2 in all_components:
-            if comp1 != comp2:
-                is_compatible = check_compatibility(comp1, comp2)
-                compatibility_matrix[comp1][comp2] = is_compatible
-                if not is_compatible:
-                    compatibility_issues.append({
-                        "component1": comp1,
-                        "component2": comp2,
-                        "issue": "Incompatible components"
-                    })
+    # One bitset pass over the cart; the full matrix is only built if read
+    compatibility_issues = [
+        {"component1": comp1, "component2": comp2, "issue": "Incompatible components"}
+        for comp1, comp2 in compatibility.issues(all_components)
+    ]
 
-    state["compatibility_matrix"] = compatibility_matrix
-    state["compatibility_issues"] = compatibility_issues
-    return state
+    return {
+        "compatibility_matrix": compatibility.matrix(all_components),
+        "compatibility_issues": compatibility_issues,
+    }
 
 
 # ============================================================
-# 5️⃣ PRODUCT SELECTION AGENT (FIXED FOR GRAINGER CATALOG)
+# 5️⃣ PRODUCT SELECTION AGENT (MULTI-VENDOR CATALOG)
 # ============================================================
 
-def product_selection_agent(state: CartPilotState) -> CartPilotState:
+# Solver: candidates per component (cheapest first) and search time limit
+SOLVER_CANDIDATES = int(os.environ.get("CARTPILOT_SOLVER_CANDIDATES", "64"))
+SOLVER_TIME_LIMIT_MS = float(os.environ.get("CARTPILOT_SOLVER_TIME_LIMIT_MS", "50"))
+
+
+@agent(
+    reads=["required_components", "missing_dependencies", "catalog_version", "rules_version", "constraints"],
+    writes=[
+        "selected_products", "product_alternatives", "alternatives_cursor",
+        "shard_timings", "solver", "validation_errors",
+    ],
+)
+def product_selection_agent(state: CartPilotState) -> Dict[str, Any]:
     """
-    Select products from Grainger catalog by matching component → product.id
-    THIS FIXES THE EMPTY CART BUG 🔥
+    Select products by matching component → product.id across all vendor shards.
+    I/O-bound shards are queried concurrently; the cheapest vendor offer wins.
+    Only the top-k alternatives are kept, with a cursor for the rest.
+    With a budget or tag constraints (request or rules), the solver picks
+    the cheapest feasible combination instead; if it finds none, nothing is
+    selected and validation_errors says why (alternatives stay browsable).
     """
 
-    catalog_path = Path(__file__).parent / "catalog.json"
-    with open(catalog_path) as f:
-        catalog = json.load(f)
-
-    grainger_products = catalog["products"]["grainger"]
+    catalog = get_catalog(state.get("catalog_version"))
     all_components = state["required_components"] + state["missing_dependencies"]
 
+    # Indexed lookup in every vendor shard: lazy views of products whose ID contains the component keyword
+    vendor_matches, shard_timings = fan_out(catalog, all_components)
+
     selected_products = {}
     product_alternatives = {}
+    alternatives_cursor = {}
+    component_offers = {}
 
     for component in all_components:
-        # Find products whose ID contains the component keyword
-        matches = [
-            p for p in grainger_products
-            if component.lower() in p["id"].lower()
+        offers = [
+            (vendor, found[component])
+            for vendor, found in vendor_matches.items()
+            if found[component]
         ]
 
-        if matches:
-            selected_products[component] = matches[0]
-            product_alternatives[component] = matches[1:] if len(matches) > 1 else []
-
-    state["selected_products"] = selected_products
-    state["product_alternatives"] = product_alternatives
-    return state
+        if offers:
+            component_offers[component] = offers
+            # Bounded top-k alternatives; the rest stay behind a cursor
+            selected, alternatives, more = merge_offers(offers)
+            selected_products[component] = selected
+            product_alternatives[component] = alternatives
+            alternatives_cursor[component] = (
+                encode_cursor(catalog.version, component, len(alternatives)) if more else None
+            )
+
+    update: Dict[str, Any] = {}
+    constraints = state.get("constraints") or {}
+    tag_index = get_rules(state.get("rules_version")).tag_index
+    constrained = (
+        constraints.get("budget") is not None
+        or bool(constraints.get("required_tags"))
+        or bool(constraints.get("forbidden_tags"))
+        or bool(tag_index.pairs)
+    )
+    if selected_products and constrained:
+        candidates = {}
+        offer_refs = {}  # per component: id(candidate) -> its (vendor, position)
+        for component, selected in selected_products.items():
+            cheapest = list(islice(ranked_offers(component_offers[component], "price"), SOLVER_CANDIDATES - 1))
+            candidates[component] = [selected, *(product for _, product in cheapest)]
+            offer_refs[component] = {id(product): ref for ref, product in cheapest}
+        result = solve(
+            candidates,
+            budget=constraints.get("budget"),
+            required_tags=constraints.get("required_tags") or (),
+            forbidden_tags=constraints.get("forbidden_tags") or (),
+            tag_conflicts=tag_index,
+            time_limit=SOLVER_TIME_LIMIT_MS / 1000,
+        )
+        if result["feasible"]:
+            selected_products = result["choice"]
+            # Alternatives were listed around the first match: relist them around the solver's pick
+            for component, product in selected_products.items():
+                ref = offer_refs[component].get(id(product))
+                if ref is not None:
+                    _, alternatives, more = merge_offers(component_offers[component], selected=ref)
+                    product_alternatives[component] = alternatives
+                    alternatives_cursor[component] = (
+                        encode_cursor(catalog.version, component, len(alternatives), selected=ref)
+                        if more else None
+                    )
+        else:
+            # Never hand back a cart that breaks the budget or tag rules
+            selected_products = {}
+            update["validation_errors"] = [f"Constraints not met: {result['reason']}"]
+        update["solver"] = {key: value for key, value in result.items() if key != "choice"}
+
+    update["selected_products"] = selected_products
+    update["product_alternatives"] = product_alternatives
+    update["alternatives_cursor"] = alternatives_cursor
+    update["shard_timings"] = shard_timings
+    return update
 
 
 # ============================================================
 # 6️⃣ CART COMPOSER AGENT
 # ============================================================
 
-def cart_composer_agent(state: CartPilotState) -> CartPilotState:
+@agent(reads=["selected_products"], writes=["final_cart", "total_price", "cart_summary"])
+def cart_composer_agent(state: CartPilotState) -> Dict[str, Any]:
     """Create final cart"""
 
     selected_products = state["selected_products"]
@@ -177,8 +269,8 @@ def cart_composer_agent(state: CartPilotState) -> CartPilotState:
         final_cart.append(product_copy)
         total_price += product.get("price", 0.0)
 
-    state["final_cart"] = final_cart
-    state["total_price"] = total_price
-    state["cart_summary"] = f"{len(final_cart)} items selected. Total ${total_price:.2f}"
-
-    return state
+    return {
+        "final_cart": final_cart,
+        "total_price": total_price,
+        "cart_summary": f"{len(final_cart)} items selected. Total ${total_price:.2f}",
+    }
@@ -2,10 +2,17 @@
 FastAPI backend for CartPilot.
 Exposes /generate-cart endpoint for cart generation.
 """
-from fastapi import FastAPI, HTTPException
+import os
+import time
+from fastapi import FastAPI, HTTPException, Query
 from pydantic import BaseModel, Field
 from typing import List, Dict, Any, Optional
 from graph import run_cartpilot
+from agents import INTENT_CASCADE, classify_intents
+from ollama_llm import get_llm_cache, get_llm_client, llm_batch_stats
+from catalog import ALTERNATIVES_K, CatalogWatcher, alternatives_page, decode_cursor, encode_cursor, get_catalog
+from rules import RulesWatcher, get_rules, reload_rules
+from bulk_validation import validate_carts
 
 app = FastAPI(
     title="CartPilot API",
@@ -17,6 +24,9 @@ app = FastAPI(
 class CartRequest(BaseModel):
     """Request schema for cart generation."""
     user_goal: str = Field(..., description="High-level user goal (e.g., 'I want to set up a home office for remote work')")
+    budget: Optional[float] = Field(None, gt=0, description="Maximum cart total; the cheapest feasible cart is chosen")
+    required_tags: List[str] = Field(default_factory=list, description="Tags the cart as a whole must carry")
+    forbidden_tags: List[str] = Field(default_factory=list, description="Tags no chosen product may carry")
 
 
 class CartItem(BaseModel):
@@ -37,13 +47,98 @@ class CartResponse(BaseModel):
     completeness_score: float
     cart_summary: str
     validation_errors: List[str]
+    alternatives: Dict[str, List[Dict[str, Any]]] = Field(default_factory=dict)
     metadata: Dict[str, Any] = Field(default_factory=dict)
 
 
+class AlternativesResponse(BaseModel):
+    """One page of ranked alternatives for a component."""
+    component: str
+    alternatives: List[Dict[str, Any]]
+    next_cursor: Optional[str] = None
+
+
+class IntentBatchRequest(BaseModel):
+    """Goals to classify in one call."""
+    goals: List[str] = Field(..., max_length=10_000, description="User goals, classified independently")
+
+
+class IntentBatchResponse(BaseModel):
+    """One parsed intent per goal, in request order."""
+    intents: List[Dict[str, Any]]
+    goals_per_second: float
+
+
+class CartValidationRequest(BaseModel):
+    """Stored component sets to re-validate against the current rules."""
+    carts: List[List[str]] = Field(..., max_length=100_000, description="One list of component names per cart")
+
+
+class CartValidationResponse(BaseModel):
+    """Per-cart findings, in request order."""
+    results: List[Dict[str, Any]]
+    rules_version: str
+    carts_per_second: float
+
+
+# Set CARTPILOT_CATALOG_RELOAD=<seconds> to hot-reload catalog.json on change
+CATALOG_RELOAD_INTERVAL = float(os.environ.get("CARTPILOT_CATALOG_RELOAD", "0"))
+catalog_watcher: Optional[CatalogWatcher] = None
+
+# Set CARTPILOT_RULES_RELOAD=<seconds> to hot-reload rules.json on change
+RULES_RELOAD_INTERVAL = float(os.environ.get("CARTPILOT_RULES_RELOAD", "0"))
+rules_watcher: Optional[RulesWatcher] = None
+
+
+@app.on_event("startup")
+def start_catalog():
+    """Load the catalog and rules before serving and start the reload watchers if enabled."""
+    global catalog_watcher, rules_watcher
+    get_rules()
+    try:
+        get_catalog()
+    except (OSError, ValueError) as e:
+        # Keep serving; /generate-cart retries the load on each request until it succeeds
+        print(f"Warning: catalog not loaded at startup ({e})")
+    if CATALOG_RELOAD_INTERVAL > 0:
+        catalog_watcher = CatalogWatcher(interval=CATALOG_RELOAD_INTERVAL).start()
+    if RULES_RELOAD_INTERVAL > 0:
+        rules_watcher = RulesWatcher(interval=RULES_RELOAD_INTERVAL).start()
+
+
+@app.on_event("shutdown")
+def stop_catalog():
+    if catalog_watcher is not None:
+        catalog_watcher.stop()
+    if rules_watcher is not None:
+        rules_watcher.stop()
+
+
 @app.get("/")
 def root():
     """Health check endpoint."""
-    return {"status": "ok", "service": "CartPilot"}
+    return {"status": "ok", "service": "CartPilot", "rules_version": get_rules().version}
+
+
+@app.post("/rules/reload")
+def rules_reload():
+    """Recompile rules.json and swap it in; an invalid file keeps the current rules."""
+    try:
+        rules = reload_rules()
+    except (OSError, ValueError) as e:
+        raise HTTPException(status_code=422, detail=f"Rules not reloaded: {e}")
+    return {"rules_version": rules.version}
+
+
+@app.get("/stats")
+def stats():
+    """Runtime counters for monitoring."""
+    return {
+        "llm_cache": get_llm_cache().stats(),
+        "llm_client": get_llm_client().stats(),
+        "llm_batching": llm_batch_stats(),
+        "intent": INTENT_CASCADE.stats(),
+    }
 
 
 @app.post("/generate-cart", response_model=CartResponse)
@@ -61,7 +156,12 @@ def generate_cart(request: CartRequest):
     """
     try:
         # Execute multi-agent pipeline
-        final_state = run_cartpilot(request.user_goal)
+        constraints = {
+            "budget": request.budget,
+            "required_tags": request.required_tags,
+            "forbidden_tags": request.forbidden_tags,
+        }
+        final_state = run_cartpilot(request.user_goal, constraints)
         
         # Calculate total price
         total_price = sum(item.get("price", 0.0) for item in final_state["final_cart"])
@@ -84,7 +184,12 @@ def generate_cart(request: CartRequest):
             "parsed_intent": final_state["parsed_intent"],
             "required_components": final_state["required_components"],
             "selected_components": list(final_state["selected_products"].keys()),
-            "compatibility_issues_count": len(final_state["compatibility_issues"])
+            "compatibility_issues_count": len(final_state["compatibility_issues"]),
+            "catalog_version": final_state["catalog_version"],
+            "rules_version": final_state["rules_version"],
+            "shard_timings_ms": final_state["shard_timings"],
+            "alternatives_cursor": final_state["alternatives_cursor"],
+            "solver": final_state["solver"],
         }
         
         return CartResponse(
@@ -93,6 +198,7 @@ def generate_cart(request: CartRequest):
             completeness_score=final_state["completeness_score"],
             cart_summary=final_state["cart_summary"],
             validation_errors=final_state["validation_errors"],
+            alternatives=final_state["product_alternatives"],
             metadata=metadata
         )
     
@@ -100,6 +206,62 @@ def generate_cart(request: CartRequest):
         raise HTTPException(status_code=500, detail=f"Cart generation failed: {str(e)}")
 
 
+@app.get("/alternatives", response_model=AlternativesResponse)
+def get_alternatives(cursor: str, limit: int = Query(ALTERNATIVES_K, ge=1, le=100)):
+    """
+    Page through a component's further alternatives, starting from a cursor
+    in metadata.alternatives_cursor (or a previous page's next_cursor).
+    """
+    try:
+        version, component, offset, rank, selected = decode_cursor(cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    catalog = get_catalog(version)
+    if catalog.version != version:
+        raise HTTPException(status_code=410, detail="Catalog has changed since this cursor was issued")
+
+    try:
+        alternatives, more = alternatives_page(catalog, component, offset, limit, rank, selected)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"invalid cursor: {e}")
+    next_cursor = encode_cursor(version, component, offset + len(alternatives), rank, selected) if more else None
+    return AlternativesResponse(component=component, alternatives=alternatives, next_cursor=next_cursor)
+
+
+@app.post("/classify-intent", response_model=IntentBatchResponse)
+def classify_intent(request: IntentBatchRequest):
+    """
+    Classify many goals at once through the intent cascade: rules, then one
+    vector-classifier pass over the unsure goals, then the LLM for the rest.
+    """
+    start = time.perf_counter()
+    intents = classify_intents(request.goals)
+    elapsed = time.perf_counter() - start
+    return IntentBatchResponse(
+        intents=intents,
+        goals_per_second=round(len(intents) / elapsed, 1) if elapsed > 0 else 0.0,
+    )
+
+
+@app.post("/validate-carts", response_model=CartValidationResponse)
+def validate_carts_endpoint(request: CartValidationRequest):
+    """
+    Re-validate many component sets in one call: missing dependencies and
+    incompatible pairs per cart, computed for the whole batch with matrix
+    operations against one rule set.
+    """
+    rules = get_rules()
+    start = time.perf_counter()
+    results = validate_carts(request.carts, rules)
+    elapsed = time.perf_counter() - start
+    return CartValidationResponse(
+        results=results,
+        rules_version=rules.version,
+        carts_per_second=round(len(results) / elapsed, 1) if elapsed > 0 else 0.0,
+    )
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
@@ -0,0 +1,73 @@
+"""
+Performance benchmarks for CartPilot (modules under benchmarks/).
+Run with: python benchmark.py [name ...]   (no name runs everything)
+"""
+import argparse
+
+from benchmarks.catalog import bench_catalog
+from benchmarks.matcher import bench_matcher
+from benchmarks.memory import bench_memory
+from benchmarks.compiled import bench_compiled
+from benchmarks.backends import bench_backends
+from benchmarks.shards import bench_shards
+from benchmarks.ingest import bench_ingest
+from benchmarks.enrich import bench_enrich
+from benchmarks.scraper import bench_scraper
+from benchmarks.rebuild import bench_rebuild
+from benchmarks.dedup import bench_dedup
+from benchmarks.alternatives import bench_alternatives
+from benchmarks.intent import bench_intent
+from benchmarks.llm_cache import bench_llm_cache
+from benchmarks.llm_client import bench_llm_client
+from benchmarks.llm_batch import bench_llm_batch
+from benchmarks.cascade import bench_cascade
+from benchmarks.vectors import bench_vectors
+from benchmarks.closure import bench_closure
+from benchmarks.compat import bench_compat
+from benchmarks.solver import bench_solver
+from benchmarks.bulk import bench_bulk
+from benchmarks.executor import bench_executor
+
+
+# ---------------------------------------------------
+# Benchmarks
+# ---------------------------------------------------
+
+BENCHMARKS = {
+    "catalog": bench_catalog,
+    "matcher": bench_matcher,
+    "memory": bench_memory,
+    "compiled": bench_compiled,
+    "backends": bench_backends,
+    "shards": bench_shards,
+    "ingest": bench_ingest,
+    "enrich": bench_enrich,
+    "scraper": bench_scraper,
+    "rebuild": bench_rebuild,
+    "dedup": bench_dedup,
+    "alternatives": bench_alternatives,
+    "intent": bench_intent,
+    "llm_cache": bench_llm_cache,
+    "llm_client": bench_llm_client,
+    "llm_batch": bench_llm_batch,
+    "cascade": bench_cascade,
+    "vectors": bench_vectors,
+    "closure": bench_closure,
+    "compat": bench_compat,
+    "solver": bench_solver,
+    "bulk": bench_bulk,
+    "executor": bench_executor,
+}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("names", nargs="*", metavar="name", help=", ".join(BENCHMARKS))
+    args = parser.parse_args()
+    unknown = set(args.names) - set(BENCHMARKS)
+    if unknown:
+        parser.error(f"unknown benchmark(s): {', '.join(sorted(unknown))}")
+
+    for name in args.names or BENCHMARKS:
+        print(f"\n== {name} ==")
+        BENCHMARKS[name]()
@@ -0,0 +1,4 @@
+"""
+CartPilot benchmarks, one module per optimization. Run them with
+python benchmark.py [name ...]; shared data generators live in common.py.
+"""
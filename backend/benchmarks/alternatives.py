@@ -0,0 +1,40 @@
+"""
+Per-component selection: unbounded alternative lists vs bounded top-k with a cursor.
+"""
+import random
+
+from benchmarks.common import timeit
+
+
+def bench_alternatives(sizes=(1_000, 100_000, 1_000_000), vendors=2):
+    """Per-component selection: unbounded alternative lists vs bounded top-k with a cursor."""
+    from catalog import Catalog, ShardedCatalog, equivalence_key, fan_out, merge_offers
+
+    def unbounded(offers):
+        # Previous behaviour: every equivalent-collapsed match is materialized into state
+        cheapest = {}
+        for vendor, matches in offers:
+            for product in matches:
+                key = equivalence_key(product)
+                best = cheapest.get(key)
+                if best is None or product["price"] < best["price"]:
+                    cheapest[key] = dict(product, vendor=vendor)
+        return list(cheapest.values())
+
+    print(f"{'matches':>10} {'unbounded ms':>13} {'alts':>9} {'top-k ms':>9} {'alts':>5}")
+    for n in sizes:
+        rng = random.Random(n)
+        shards = {}
+        for v in range(vendors):
+            products = [{"id": f"wrenches-{v}-{i}", "name": f"Wrench {i}", "price": round(rng.uniform(5, 500), 2),
+                         "category": "tools", "specs": {}, "compatibility_tags": ["hand_tool"]}
+                        for i in range(n // vendors)]
+            shards[f"vendor{v}"] = Catalog(products, vendor=f"vendor{v}", version=str(v))
+        catalog = ShardedCatalog(shards)
+        found, _ = fan_out(catalog, ["wrenches"])
+        offers = [(vendor, matches["wrenches"]) for vendor, matches in found.items()]
+
+        repeat = 3 if n >= 100_000 else 20
+        full_ms = timeit(lambda: unbounded(offers), repeat=1 if n >= 1_000_000 else repeat)
+        topk_ms = timeit(lambda: merge_offers(offers), repeat=repeat)
+        print(f"{n:>10,} {full_ms:>13.2f} {len(unbounded(offers)):>9,} {topk_ms:>9.2f} {len(merge_offers(offers)[1]):>5}")
@@ -0,0 +1,29 @@
+"""
+Component lookup latency: in-memory catalog vs SQLite/FTS5 backend.
+"""
+from benchmarks.common import synthetic_products, timeit
+
+
+def bench_backends(sizes=(10_000, 100_000, 1_000_000)):
+    """Component lookup latency: in-memory catalog vs SQLite/FTS5 backend."""
+    import tempfile
+    from pathlib import Path
+    from catalog import Catalog
+    from catalog_sqlite import SQLiteCatalog, build_sqlite_catalog
+
+    component = "safety-goggles"
+    print(f"{'products':>10} {'memory find ms':>15} {'sqlite query ms':>16} {'sqlite cached ms':>17} {'sqlite product ms':>18}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in sizes:
+            products = synthetic_products(n)
+            memory = Catalog(products)
+            path = Path(tmp) / f"catalog_{n}.db"
+            build_sqlite_catalog(products, path)
+            sqlite = SQLiteCatalog(path)
+
+            memory_ms = timeit(lambda: memory.find(component)[0], repeat=1000)
+            query_ms = timeit(lambda: sqlite.query_rows(component), repeat=20)
+            cached_ms = timeit(lambda: sqlite.rows(component), repeat=1000)
+            row = int(sqlite.rows(component)[0])
+            product_ms = timeit(lambda: sqlite.product(row), repeat=1000)
+            print(f"{n:>10,} {memory_ms:>15.4f} {query_ms:>16.3f} {cached_ms:>17.4f} {product_ms:>18.4f}")
@@ -0,0 +1,48 @@
+"""
+Intent cascade on a mixed goal stream: escalation rate and latency per tier vs always asking the LLM.
+"""
+import random
+import time
+
+
+def bench_cascade(goals=400, llm_ms=20.0, thresholds=(0.0, 0.6, 1.01)):
+    """Intent cascade on a mixed goal stream: escalation rate and latency per tier vs always asking the LLM."""
+    from agents import load_intent_vectors
+    from intent_cascade import IntentCascade
+    from rules import get_rules
+
+    rules = get_rules()
+
+    rng = random.Random(0)
+    keywords = [k for _, ks in rules.intent_keywords for k in ks]
+    filler = ["need", "kit", "for", "the", "site", "crew", "new", "gear"]
+    texts = []
+    for _ in range(goals):
+        roll = rng.random()
+        if roll < 0.7:  # one clear scenario
+            words = [rng.choice(keywords)] + rng.sample(filler, 3)
+        elif roll < 0.9:  # two competing scenarios
+            words = rng.sample(keywords, 2) + rng.sample(filler, 2)
+        else:  # no keywords at all
+            words = rng.sample(filler, 4)
+        rng.shuffle(words)
+        texts.append(" ".join(words))
+
+    def simulated_llm(batch, scenarios, timeout=None):
+        time.sleep(llm_ms / 1000)
+        return [scenarios[-1]] * len(batch)
+
+    print(f"  {'threshold':>9} {'escalated':>10} {'mean ms':>8}  per tier (count, mean ms)")
+    vectors = load_intent_vectors(rules)
+    for threshold in thresholds:
+        cascade = IntentCascade(rules.intent_matcher, rules.default_scenario, threshold=threshold, llm=simulated_llm,
+                                load_vectors=lambda: vectors)
+        start = time.perf_counter()
+        for text in texts:
+            cascade.classify(text)
+        mean_ms = (time.perf_counter() - start) * 1000 / goals
+        stats = cascade.stats()
+        tiers = ", ".join(
+            f"{tier} {t['count']} @ {t['mean_ms']:.3f}" for tier, t in stats["tiers"].items() if t["count"]
+        )
+        print(f"  {threshold:>9g} {stats['escalation_rate']:>10.1%} {mean_ms:>8.2f}  {tiers}")
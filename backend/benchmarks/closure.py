@@ -0,0 +1,42 @@
+"""
+Transitive dependency bundles: per-request recursive walk vs compiled closure with cached bundles.
+"""
+import random
+import time
+
+from benchmarks.common import timeit
+
+
+def bench_closure(sizes=(100, 1_000, 10_000), fan_out=3, requests=2_000):
+    """Transitive dependency bundles: per-request recursive walk vs compiled closure with cached bundles."""
+    from rules import DependencyClosure
+
+    rng = random.Random(0)
+    print(f"{'components':>11} {'compile ms':>11} {'walk us':>9} {'compiled us':>12} {'mean deps':>10}")
+    for n in sizes:
+        names = [f"component-{i}" for i in range(n)]
+        # Random DAG: each component depends on a few later ones
+        rules = {
+            name: rng.sample(names[i + 1:], min(fan_out, n - i - 1))
+            for i, name in enumerate(names) if i < n - 1 and rng.random() < 0.7
+        }
+        carts = [tuple(rng.sample(names[: n // 2], 4)) for _ in range(50)]
+        stream = [rng.choice(carts) for _ in range(requests)]
+
+        def walk(components):
+            seen, stack = {}, list(components)
+            while stack:
+                for dep in rules.get(stack.pop(), []):
+                    if dep not in seen:
+                        seen[dep] = None
+                        stack.append(dep)
+            return tuple(seen)
+
+        start = time.perf_counter()
+        closure = DependencyClosure(rules)
+        compile_ms = (time.perf_counter() - start) * 1000
+        walk_us = timeit(lambda: [walk(c) for c in stream], repeat=1) * 1000 / requests
+        compiled_us = timeit(lambda: [closure.bundle(c) for c in stream], repeat=3) * 1000 / requests
+        assert all(set(walk(c)) == set(closure.bundle(c)) for c in carts)
+        mean_deps = sum(len(closure.bundle(c)) for c in carts) / len(carts)
+        print(f"{n:>11,} {compile_ms:>11.1f} {walk_us:>9.1f} {compiled_us:>12.2f} {mean_deps:>10.1f}")
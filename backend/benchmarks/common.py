@@ -0,0 +1,115 @@
+"""
+Shared helpers for the benchmarks (and tests): synthetic catalog rows, the
+original enrichment as a reference, and a timer.
+"""
+import random
+import time
+from typing import Any, Callable, Dict, List
+
+from rules import get_rules
+
+# Category / price / spec combinations used by upgrade_json.enrich
+_PROFILES = [
+    ("safety", 49.99, {"type": "ppe"}, ["ppe", "workplace_safety"]),
+    ("security", 299.99, {"type": "facility_security"}, ["security", "access_control"]),
+    ("tools", 59.99, {"material": "steel"}, ["hand_tool"]),
+    ("test_instruments", 249.99, {"usage": "diagnostics"}, ["testing"]),
+]
+
+
+def synthetic_products(n: int, seed: int = 0) -> List[Dict[str, Any]]:
+    """Generate n catalog rows shaped like catalog.json products."""
+    rng = random.Random(seed)
+    dependency_rules = get_rules().dependency_rules
+    keys = sorted(set(dependency_rules) | {d for deps in dependency_rules.values() for d in deps})
+    keys += ["respirators", "spill-kits", "locks", "wrenches", "pliers", "air-quality-sensors"]
+    products = []
+    for i in range(n):
+        category, price, specs, tags = _PROFILES[rng.randrange(len(_PROFILES))]
+        # ~1 in 20 rows matches a known component, the rest are noise SKUs
+        if rng.random() < 0.05:
+            pid = f"{rng.choice(keys)}?attrs=Variant%7C{i}&filters=attrs"
+        else:
+            pid = f"SKU-{i:08d}-item"
+        products.append({
+            "id": pid,
+            "name": f"Synthetic product {i}",
+            "price": price,
+            "category": category,
+            "specs": dict(specs),
+            "compatibility_tags": list(tags),
+        })
+    return products
+
+
+def timeit(fn: Callable[[], Any], repeat: int) -> float:
+    """Mean wall time of fn() in milliseconds."""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) * 1000 / repeat
+
+
+def synthetic_raw_products(n: int, seed: int = 0) -> List[Dict[str, Any]]:
+    """Unenriched scraper rows with keyword-bearing names."""
+    from enrichment import CATEGORY_KEYWORDS
+
+    rng = random.Random(seed)
+    vocab = [k for _, keywords in CATEGORY_KEYWORDS for k in keywords]
+    noise = ["industrial", "heavy duty", "grainger", "supply", "kit", "series", "pro", "compact"]
+    products = []
+    for i in range(n):
+        words = rng.sample(noise, 2) + ([rng.choice(vocab)] if rng.random() < 0.9 else [])
+        rng.shuffle(words)
+        pid = f"kh-article-{i}" if rng.random() < 0.02 else f"SKU-{i:08d}"
+        products.append({"id": pid, "name": " ".join(words).title(), "price": 0.0,
+                         "category": "grainger", "specs": {}, "compatibility_tags": []})
+    return products
+
+
+def reference_enrich(product):
+    """Original any()-chain enrichment, kept as the speed/correctness baseline."""
+    name = product["name"].lower()
+
+    # ---------- CATEGORY DETECTION ----------
+    if any(x in name for x in ["helmet","glove","respirator","goggles","hearing","fall","first aid","fire","gas","spill","lockout"]):
+        category = "safety"
+    elif any(x in name for x in ["camera","metal detector","safe","lock","gate","security"]):
+        category = "security"
+    elif any(x in name for x in ["hammer","pliers","wrench","screwdriver","drill","grinder","saw","tool","socket","bit"]):
+        category = "tools"
+    elif any(x in name for x in ["multimeter","clamp","oscilloscope","thermal","thermometer","air quality","pressure","sound","tachometer","data logger","inspection"]):
+        category = "test_instruments"
+    elif "kh-" in product["id"]:
+        category = "guide"
+    else:
+        category = "safety"
+
+    product["category"] = category
+
+    # ---------- PRICE + SPECS ----------
+    if product["price"] == 0:
+        if category == "safety":
+            product["price"] = 49.99
+            product["specs"] = {"type":"ppe"}
+            product["compatibility_tags"] = ["ppe","workplace_safety"]
+
+        elif category == "security":
+            product["price"] = 299.99
+            product["specs"] = {"type":"facility_security"}
+            product["compatibility_tags"] = ["security","access_control"]
+
+        elif category == "tools":
+            product["price"] = 59.99
+            product["specs"] = {"material":"steel"}
+            product["compatibility_tags"] = ["hand_tool"]
+
+        elif category == "test_instruments":
+            product["price"] = 249.99
+            product["specs"] = {"usage":"diagnostics"}
+            product["compatibility_tags"] = ["testing"]
+
+        elif category == "guide":
+            product["price"] = 0
+            product["specs"] = {"type":"knowledge_article"}
+            product["compatibility_tags"] = ["guide","documentation"]
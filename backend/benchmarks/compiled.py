@@ -0,0 +1,29 @@
+"""
+Cold-start load time: JSON catalog vs compiled, memory-mapped catalog.
+"""
+import json
+
+from benchmarks.common import synthetic_products, timeit
+
+
+def bench_compiled(sizes=(10_000, 100_000, 1_000_000)):
+    """Cold-start load time: JSON catalog vs compiled, memory-mapped catalog."""
+    import tempfile
+    from pathlib import Path
+    from catalog import Catalog, load_catalog
+    from catalog_compiler import write_compiled
+
+    print(f"{'products':>10} {'json load ms':>13} {'mmap load ms':>13} {'first find ms':>14}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in sizes:
+            source = Path(tmp) / f"catalog_{n}.json"
+            target = Path(tmp) / f"catalog_{n}.bin"
+            with open(source, "w") as f:
+                json.dump({"products": {"grainger": synthetic_products(n)}}, f)
+            write_compiled(Catalog.from_file(source), target)
+
+            json_ms = timeit(lambda: load_catalog(source), repeat=1)
+            mmap_ms = timeit(lambda: load_catalog(target), repeat=5)
+            compiled = load_catalog(target)
+            find_ms = timeit(lambda: compiled.find("safety-goggles")[0], repeat=1)
+            print(f"{n:>10,} {json_ms:>13.1f} {mmap_ms:>13.2f} {find_ms:>14.3f}")
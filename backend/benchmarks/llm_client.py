@@ -0,0 +1,61 @@
+"""
+Ollama client against a fake server: tail latency with hedging, and fail-fast on an outage.
+"""
+import random
+import time
+
+
+def bench_llm_client(calls=200, latency=0.05, slow=1.0, slow_rate=0.05, concurrency=4):
+    """Ollama client against a fake server: tail latency with hedging, and fail-fast on an outage."""
+    import asyncio
+    from ollama_client import CircuitBreaker, FakeOllamaServer, LLMUnavailable, OllamaClient
+
+    rng = random.Random(0)
+
+    def sampled_latency(prompt):
+        return slow if rng.random() < slow_rate else latency
+
+    async def tail(hedge_after):
+        async with FakeOllamaServer(latency=sampled_latency) as server:
+            client = OllamaClient(server.url, max_concurrency=concurrency, timeout=5.0, hedge_after=hedge_after)
+
+            async def timed():
+                start = time.perf_counter()
+                await client.generate("plan a cart")
+                return (time.perf_counter() - start) * 1000
+
+            # Bursts of `concurrency` callers, so hedges only use spare slots between bursts
+            durations = []
+            for _ in range(calls // concurrency):
+                durations.extend(await asyncio.gather(*(timed() for _ in range(concurrency // 2))))
+            await client.aclose()
+            return sorted(durations), client.hedges, server.max_in_flight
+
+    for label, hedge_after in (("no hedging", None), (f"hedge after {latency * 3 * 1000:.0f} ms", latency * 3)):
+        rng.seed(0)
+        durations, hedges, peak = asyncio.run(tail(hedge_after))
+        p50, p99 = durations[len(durations) // 2], durations[int(len(durations) * 0.99)]
+        print(f"  {label:<22} p50 {p50:>7.1f} ms  p99 {p99:>7.1f} ms  {hedges} hedges, "
+              f"peak in-flight {peak}/{concurrency}")
+
+    async def outage():
+        async with FakeOllamaServer(latency=0.5) as server:
+            server.healthy = False
+            client = OllamaClient(server.url, timeout=0.2,
+                                  breaker=CircuitBreaker(failure_threshold=3, reset_timeout=60))
+            timings = []
+            for _ in range(20):
+                start = time.perf_counter()
+                try:
+                    await client.generate("plan a cart")
+                except LLMUnavailable:
+                    pass
+                timings.append((time.perf_counter() - start) * 1000)
+            await client.aclose()
+            return timings, client.stats()
+
+    timings, stats = asyncio.run(outage())
+    tripped = stats["failures"]
+    print(f"  outage: {tripped} calls hit the {0.2 * 1000:.0f} ms deadline "
+          f"({sum(timings[:tripped]) / tripped:.0f} ms each), then {stats['rejected']} rejected by the "
+          f"open breaker in {sum(timings[tripped:]) / max(len(timings) - tripped, 1) * 1000:.1f} us each")
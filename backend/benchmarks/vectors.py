@@ -0,0 +1,43 @@
+"""
+Hashing-vectorizer centroid classifier: model fit/load time and goals/s per goal vs batched.
+"""
+import random
+import time
+
+from benchmarks.common import timeit
+from rules import get_rules
+
+
+def bench_vectors(goals=20_000, batch=512):
+    """Hashing-vectorizer centroid classifier: model fit/load time and goals/s per goal vs batched."""
+    import tempfile
+    from pathlib import Path
+    from intent_vectors import CentroidClassifier, seed_documents
+
+    rules = get_rules()
+    scenarios = rules.scenarios
+
+    rng = random.Random(0)
+    vocab = [k for _, ks in rules.intent_keywords for k in ks]
+    vocab += [c.replace("-", " ") for cs in scenarios.values() for c in cs]
+    vocab += ["need", "kit", "for", "the", "site", "crew", "new", "gear", "electrician", "monitor", "roof"]
+    texts = [" ".join(rng.choice(vocab) for _ in range(rng.randint(3, 8))) for _ in range(goals)]
+
+    start = time.perf_counter()
+    model = CentroidClassifier.fit(*seed_documents(rules.intent_keywords, scenarios))
+    fit_ms = (time.perf_counter() - start) * 1000
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "intent_model.npz"
+        model.save(path)
+        size = path.stat().st_size
+        load_ms = timeit(lambda: CentroidClassifier.load(path), repeat=5)
+    print(f"  fit {fit_ms:.1f} ms, load {load_ms:.2f} ms, {len(model.features):,} features, {size / 1024:.0f} KB")
+
+    single = texts[:2_000]
+    per_goal_ms = timeit(lambda: [model.classify([t]) for t in single], repeat=3)
+    batched_ms = timeit(lambda: [model.classify(texts[i:i + batch]) for i in range(0, goals, batch)], repeat=3)
+    matcher = rules.intent_matcher
+    rules_ms = timeit(lambda: [matcher.score(t) for t in texts], repeat=3)
+    print(f"  {'one goal per call':<22} {len(single) / per_goal_ms * 1000:>10,.0f} goals/s")
+    print(f"  {f'batches of {batch}':<22} {goals / batched_ms * 1000:>10,.0f} goals/s")
+    print(f"  {'rule matcher':<22} {goals / rules_ms * 1000:>10,.0f} goals/s")
@@ -0,0 +1,216 @@
+"""
+Catalog compiler: turns catalog.json into the binary format read by
+catalog.CompiledCatalog (fixed-width records, string table, prebuilt
+component index), which the API memory-maps instead of parsing JSON.
+
+Usage:
+    python catalog_compiler.py catalog.json catalog.bin
+    CARTPILOT_CATALOG=catalog.bin uvicorn api:app
+"""
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from catalog import (
+    Catalog,
+    COMPILED_HEADER,
+    COMPILED_MAGIC,
+    COMPILED_RECORD,
+    DEFAULT_VENDOR,
+    default_components,
+)
+from matcher import ComponentMatcher
+
+_COLUMNS = frozenset(("id", "name", "price", "category", "specs", "compatibility_tags"))
+
+# Records buffered in memory before being flushed to the spill file
+_BATCH = 8192
+
+
+def _align(n: int) -> int:
+    return (n + 7) & ~7
+
+
+class CompiledWriter:
+    """
+    Streams products into a compiled catalog file.
+
+    Records, strings and the id text are spilled to temporary files as
+    products arrive, so memory stays bounded by the batch size plus the
+    category/profile tables and the component index runs.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        vendor: str = DEFAULT_VENDOR,
+        version: Optional[str] = None,
+        components: Optional[Iterable[str]] = None,
+    ):
+        self.path = Path(path)
+        self.vendor = vendor
+        self.version = version
+        self.count = 0
+
+        self._matcher = ComponentMatcher(components if components is not None else default_components())
+        self._index: Dict[str, List[int]] = {}
+        self._categories: Dict[str, int] = {}
+        self._profiles: Dict[Tuple, int] = {}
+        self._profile_values: List[List[Any]] = []
+        self._extras: Dict[str, Dict[str, Any]] = {}
+        self._hash = hashlib.sha256()
+
+        self._records = tempfile.TemporaryFile()
+        self._strings = tempfile.TemporaryFile()
+        self._id_text = tempfile.TemporaryFile()
+        self._starts = tempfile.TemporaryFile()
+        self._strings_len = 0
+        self._id_text_len = 0
+        self._batch: Dict[str, List] = {field: [] for field in COMPILED_RECORD.names}
+        self._batch_starts: List[int] = []
+
+    def _string(self, text: str) -> Tuple[int, int]:
+        data = text.encode("utf-8")
+        offset = self._strings_len
+        self._strings.write(data)
+        self._strings_len += len(data)
+        self._hash.update(data)
+        return offset, len(data)
+
+    def _code(self, table: Dict, key, value=None) -> int:
+        """Dense integer code for key, assigned in first-seen order."""
+        code = table.get(key)
+        if code is None:
+            code = table[key] = len(table)
+            if value is not None:
+                self._profile_values.append(value)
+        return code
+
+    def _flush(self) -> None:
+        if self._batch_starts:
+            records = np.zeros(len(self._batch_starts), dtype=COMPILED_RECORD)
+            for field, values in self._batch.items():
+                records[field] = values
+                values.clear()
+            data = records.tobytes()
+            self._records.write(data)
+            self._hash.update(data)
+            self._starts.write(np.asarray(self._batch_starts, dtype="<u8").tobytes())
+            self._batch_starts.clear()
+
+    def add(self, product: Dict[str, Any]) -> None:
+        row = self.count
+        batch = self._batch
+        for field, text in (("id", product["id"]), ("name", product.get("name", ""))):
+            offset, length = self._string(text)
+            batch[f"{field}_off"].append(offset)
+            batch[f"{field}_len"].append(length)
+        batch["price"].append(product.get("price", 0.0))
+        batch["category"].append(self._code(self._categories, product.get("category", "")))
+
+        specs = product.get("specs") or {}
+        tags = tuple(product.get("compatibility_tags") or ())
+        try:
+            key = (tuple(sorted(specs.items())), tags)
+            hash(key)
+        except TypeError:  # nested spec values
+            key = (json.dumps(specs, sort_keys=True), tags)
+        batch["profile"].append(self._code(self._profiles, key, [dict(specs), list(tags)]))
+
+        lowered = product["id"].lower()
+        self._batch_starts.append(self._id_text_len)
+        data = lowered.encode("utf-8") + b"\n"
+        self._id_text.write(data)
+        self._id_text_len += len(data)
+        for component in self._matcher.match(lowered):
+            self._index.setdefault(component, []).append(row)
+
+        if not _COLUMNS.issuperset(product):
+            self._extras[str(row)] = {k: v for k, v in product.items() if k not in _COLUMNS}
+
+        self.count += 1
+        if len(self._batch_starts) == _BATCH:
+            self._flush()
+
+    def close(self) -> str:
+        """Assemble the compiled file and atomically move it into place. Returns the version."""
+        self._flush()
+        version = self.version or self._hash.hexdigest()[:12]
+
+        runs = {}
+        index = tempfile.TemporaryFile()
+        position = 0
+        for component in sorted(self._index):
+            rows = self._index[component]
+            runs[component] = [position, len(rows)]
+            index.write(np.asarray(rows, dtype="<i8").tobytes())
+            position += len(rows)
+
+        meta = tempfile.TemporaryFile()
+        meta.write(json.dumps({
+            "vendor": self.vendor,
+            "version": version,
+            "categories": list(self._categories),
+            "profiles": self._profile_values,
+            "extras": self._extras,
+            "index": runs,
+        }).encode("utf-8"))
+
+        sections = [self._records, self._strings, self._id_text, self._starts, index, meta]
+        offsets = []
+        offset = _align(COMPILED_HEADER.size)
+        for section in sections:
+            length = section.tell()
+            offsets.append((offset, length))
+            offset = _align(offset + length)
+        header = COMPILED_HEADER.pack(COMPILED_MAGIC, self.count, *[v for pair in offsets for v in pair])
+
+        # Write then rename: workers that already mapped the old file keep a
+        # valid mapping, and the watcher never sees a partial file.
+        tmp = Path(f"{self.path}.tmp")
+        with open(tmp, "wb") as f:
+            f.write(header)
+            for (start, _), section in zip(offsets, sections):
+                f.seek(start)
+                section.seek(0)
+                shutil.copyfileobj(section, f)
+                section.close()
+            f.truncate(offset)
+        os.replace(tmp, self.path)
+        return version
+
+
+def write_compiled(catalog: Catalog, path: Path) -> None:
+    """Serialize a loaded catalog to the compiled format at path."""
+    writer = CompiledWriter(path, vendor=catalog.vendor, version=catalog.version)
+    for product in catalog.products:
+        writer.add(product)
+    writer.close()
+
+
+def compile_catalog(source: Path, target: Path, vendor: str = DEFAULT_VENDOR) -> Catalog:
+    """Compile a JSON catalog file to the binary format."""
+    catalog = Catalog.from_file(source, vendor=vendor)
+    write_compiled(catalog, target)
+    return catalog
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compile catalog.json to a memory-mappable binary catalog")
+    parser.add_argument("source", nargs="?", default="catalog.json")
+    parser.add_argument("target", nargs="?", default="catalog.bin")
+    parser.add_argument("--vendor", default=DEFAULT_VENDOR)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    catalog = compile_catalog(Path(args.source), Path(args.target), vendor=args.vendor)
+    elapsed = time.perf_counter() - start
+    print(f"✅ Compiled {len(catalog)} products to {args.target} in {elapsed:.2f}s (version {catalog.version})")
@@ -0,0 +1,304 @@
+"""
+SQLite catalog backend for catalogs larger than RAM.
+
+Products live in an embedded SQLite database with an FTS5 trigram index over
+product id/name (substring matching, same rule as the in-memory catalog) and
+secondary indexes on category and price. Only the rows a request reads are
+fetched, through a small connection pool that is safe to share across the
+FastAPI threadpool.
+
+Usage:
+    python catalog_sqlite.py catalog.json catalog.db
+    CARTPILOT_CATALOG=catalog.db uvicorn api:app
+"""
+import argparse
+import hashlib
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+import numpy as np
+
+from catalog import DEFAULT_VENDOR, ProductView
+
+SCHEMA = """
+CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE products (
+    row INTEGER PRIMARY KEY,
+    id TEXT NOT NULL,
+    name TEXT NOT NULL,
+    price REAL NOT NULL,
+    category TEXT NOT NULL,
+    specs TEXT NOT NULL,
+    compatibility_tags TEXT NOT NULL,
+    extra TEXT
+);
+CREATE INDEX products_category ON products (category, price);
+CREATE INDEX products_price ON products (price);
+CREATE VIRTUAL TABLE products_fts USING fts5 (
+    id, name, content='products', content_rowid='row', tokenize='trigram'
+);
+"""
+
+_COLUMNS = frozenset(("id", "name", "price", "category", "specs", "compatibility_tags"))
+
+
+# ---------------------------------------------------
+# Connection pool
+# ---------------------------------------------------
+
+class SQLitePool:
+    """Fixed-size pool of read-only connections shared across threads."""
+
+    def __init__(self, path: Path, size: int = 8):
+        self.path = Path(path)
+        self._idle: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._size = size
+        self._opened = 0
+
+    def _open(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(
+            f"file:{self.path}?mode=ro", uri=True, check_same_thread=False
+        )
+        conn.execute("PRAGMA query_only = ON")
+        return conn
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        """Borrow a connection; blocks while all connections are in use."""
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                grow = self._opened < self._size
+                if grow:
+                    self._opened += 1
+            conn = self._open() if grow else self._idle.get()
+        try:
+            yield conn
+        finally:
+            self._idle.put(conn)
+
+    def close(self) -> None:
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+
+
+# ---------------------------------------------------
+# Catalog backend
+# ---------------------------------------------------
+
+class SQLiteCatalog:
+    """
+    Catalog backend with the same query surface as catalog.Catalog
+    (find / rows / product / filter), served from a SQLite database.
+
+    Component lookups go through the FTS5 trigram index; row lists for the
+    most recently used components are kept in a bounded LRU.
+    """
+
+    # Queries wait on SQLite (which releases the GIL); fan_out runs them in its pool
+    io_bound = True
+
+    def __init__(self, path: Path, pool_size: int = 8, cache_size: int = 1024):
+        self.path = Path(path)
+        self._pool = SQLitePool(self.path, size=pool_size)
+        with self._pool.connection() as conn:
+            meta = dict(conn.execute("SELECT key, value FROM meta"))
+        self.vendor = meta["vendor"]
+        self.version = meta["version"]
+        self._count = int(meta["count"])
+        self._cache: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._cache_size = cache_size
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return self._count
+
+    @property
+    def shards(self) -> Dict[str, "SQLiteCatalog"]:
+        return {self.vendor: self}
+
+    @property
+    def products(self) -> ProductView:
+        return ProductView(self, np.arange(self._count))
+
+    def product(self, row: int) -> Dict[str, Any]:
+        """Fetch one product dict by row."""
+        with self._pool.connection() as conn:
+            record = conn.execute(
+                "SELECT id, name, price, category, specs, compatibility_tags, extra "
+                "FROM products WHERE row = ?",
+                (row,),
+            ).fetchone()
+        if record is None:
+            raise IndexError(row)
+        pid, name, price, category, specs, tags, extra = record
+        product = {
+            "id": pid,
+            "name": name,
+            "price": price,
+            "category": category,
+            "specs": json.loads(specs),
+            "compatibility_tags": json.loads(tags),
+        }
+        if extra:
+            product.update(json.loads(extra))
+        return product
+
+    def column(self, field: str, rows: np.ndarray) -> Optional[np.ndarray]:
+        """Prices at rows, read from the table in one query; other fields are not columns."""
+        if field != "price":
+            return None
+        with self._pool.connection() as conn:
+            prices = dict(conn.execute(
+                "SELECT row, price FROM products WHERE row IN (SELECT value FROM json_each(?))",
+                (json.dumps(rows.tolist()),),
+            ))
+        return np.fromiter((prices[r] for r in rows.tolist()), dtype=np.float64, count=len(rows))
+
+    def query_rows(self, component: str) -> np.ndarray:
+        """Run the index query for a component (uncached)."""
+        key = component.lower()
+        with self._pool.connection() as conn:
+            if len(key) >= 3:
+                phrase = '"' + key.replace('"', '""') + '"'
+                cursor = conn.execute(
+                    "SELECT rowid FROM products_fts WHERE products_fts MATCH ? ORDER BY rowid",
+                    (f"id : {phrase}",),
+                )
+            else:
+                # Trigram index needs at least three characters
+                cursor = conn.execute(
+                    "SELECT row FROM products WHERE instr(lower(id), ?) > 0 ORDER BY row",
+                    (key,),
+                )
+            return np.fromiter((r for (r,) in cursor), dtype=np.int64)
+
+    def rows(self, component: str) -> np.ndarray:
+        """Row positions of all products matching a component, ascending."""
+        key = component.lower()
+        with self._lock:
+            rows = self._cache.get(key)
+            if rows is not None:
+                self._cache.move_to_end(key)
+                return rows
+        rows = self.query_rows(key)
+        with self._lock:
+            self._cache[key] = rows
+            if len(self._cache) > self._cache_size:
+                self._cache.popitem(last=False)
+        return rows
+
+    def find(self, component: str) -> ProductView:
+        """Return all products matching a component, in catalog order."""
+        return ProductView(self, self.rows(component))
+
+    def search(self, text: str, limit: int = 20) -> List[Dict[str, Any]]:
+        """Full-text search over product id and name, best matches first."""
+        phrase = '"' + text.replace('"', '""') + '"'
+        with self._pool.connection() as conn:
+            found = [r for (r,) in conn.execute(
+                "SELECT rowid FROM products_fts WHERE products_fts MATCH ? ORDER BY rank LIMIT ?",
+                (phrase, limit),
+            )]
+        return [self.product(r) for r in found]
+
+    def filter(
+        self,
+        rows: Optional[np.ndarray] = None,
+        category: Optional[str] = None,
+        min_price: Optional[float] = None,
+        max_price: Optional[float] = None,
+    ) -> np.ndarray:
+        """Category / price filter using the secondary indexes."""
+        clauses, params = [], []
+        if category is not None:
+            clauses.append("category = ?")
+            params.append(category)
+        if min_price is not None:
+            clauses.append("price >= ?")
+            params.append(min_price)
+        if max_price is not None:
+            clauses.append("price <= ?")
+            params.append(max_price)
+        where = " WHERE " + " AND ".join(clauses) if clauses else ""
+        with self._pool.connection() as conn:
+            cursor = conn.execute(f"SELECT row FROM products{where} ORDER BY row", params)
+            matched = np.fromiter((r for (r,) in cursor), dtype=np.int64)
+        return matched if rows is None else np.intersect1d(rows, matched)
+
+
+# ---------------------------------------------------
+# Build
+# ---------------------------------------------------
+
+def build_sqlite_catalog(
+    products: Iterable[Dict[str, Any]],
+    path: Path,
+    vendor: str = DEFAULT_VENDOR,
+    version: str = "inline",
+) -> int:
+    """Write products into a new SQLite catalog at path. Returns the row count."""
+    tmp = Path(f"{path}.tmp")
+    if tmp.exists():
+        tmp.unlink()
+    conn = sqlite3.connect(tmp)
+    try:
+        conn.executescript(SCHEMA)
+        rows = (
+            (
+                row,
+                p["id"],
+                p.get("name", ""),
+                p.get("price", 0.0),
+                p.get("category", ""),
+                json.dumps(p.get("specs") or {}),
+                json.dumps(p.get("compatibility_tags") or []),
+                None if _COLUMNS.issuperset(p) else json.dumps({k: v for k, v in p.items() if k not in _COLUMNS}),
+            )
+            for row, p in enumerate(products)
+        )
+        conn.executemany("INSERT INTO products VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+        conn.execute("INSERT INTO products_fts (products_fts) VALUES ('rebuild')")
+        count = conn.execute("SELECT count(*) FROM products").fetchone()[0]
+        conn.executemany(
+            "INSERT INTO meta VALUES (?, ?)",
+            [("vendor", vendor), ("version", version), ("count", str(count))],
+        )
+        conn.commit()
+    finally:
+        conn.close()
+    os.replace(tmp, path)
+    return count
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build a SQLite/FTS5 catalog from catalog.json")
+    parser.add_argument("source", nargs="?", default="catalog.json")
+    parser.add_argument("target", nargs="?", default="catalog.db")
+    parser.add_argument("--vendor", default=DEFAULT_VENDOR)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    with open(args.source, "rb") as f:
+        raw = f.read()
+    data = json.loads(raw)
+    count = build_sqlite_catalog(
+        data["products"][args.vendor],
+        Path(args.target),
+        vendor=args.vendor,
+        version=hashlib.sha256(raw).hexdigest()[:12],
+    )
+    print(f"✅ Wrote {count} products to {args.target} in {time.perf_counter() - start:.2f}s")
@@ -0,0 +1,164 @@
+"""
+Streaming catalog I/O: read products one at a time from catalog.json or
+NDJSON and write them back out incrementally, so ingesting a vendor dump
+holds one product in memory at a time regardless of file size.
+"""
+import json
+import re
+import textwrap
+from pathlib import Path
+from typing import Any, Dict, IO, Iterator, Optional, Tuple
+
+from catalog import DEFAULT_VENDOR
+
+CHUNK_SIZE = 1 << 20
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+
+
+class _IncrementalReader:
+    """Minimal pull parser over a text stream, decoding one value at a time."""
+
+    def __init__(self, fp: IO[str], chunk_size: int = CHUNK_SIZE):
+        self._fp = fp
+        self._chunk_size = chunk_size
+        self._decoder = json.JSONDecoder()
+        self._buf = ""
+        self._pos = 0
+        self._eof = False
+
+    def _fill(self) -> bool:
+        if self._eof:
+            return False
+        chunk = self._fp.read(self._chunk_size)
+        if not chunk:
+            self._eof = True
+            return False
+        self._buf = self._buf[self._pos:] + chunk
+        self._pos = 0
+        return True
+
+    def peek(self) -> str:
+        while True:
+            self._pos = _WHITESPACE.match(self._buf, self._pos).end()
+            if self._pos < len(self._buf):
+                return self._buf[self._pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, ch: str) -> None:
+        found = self.peek()
+        if found != ch:
+            raise ValueError(f"expected {ch!r}, found {found!r}")
+        self._pos += 1
+
+    def value(self) -> Any:
+        """Decode the next complete JSON value (object, array or string)."""
+        self.peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buf, self._pos)
+            except json.JSONDecodeError:
+                if not self._fill():
+                    raise
+                continue
+            # A bare number or literal may continue past the buffer end
+            if end == len(self._buf) and not self._eof and self._buf[self._pos] not in '{["':
+                self._fill()
+                continue
+            self._pos = end
+            return value
+
+
+def iter_json_products(fp: IO[str], chunk_size: int = CHUNK_SIZE) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """Yield (vendor, product) from a {"products": {vendor: [...]}} stream."""
+    reader = _IncrementalReader(fp, chunk_size)
+    reader.expect("{")
+    while reader.peek() != "}":
+        key = reader.value()
+        reader.expect(":")
+        if key != "products":
+            reader.value()
+        else:
+            reader.expect("{")
+            while reader.peek() != "}":
+                vendor = reader.value()
+                reader.expect(":")
+                reader.expect("[")
+                while reader.peek() != "]":
+                    yield vendor, reader.value()
+                    if reader.peek() == ",":
+                        reader.expect(",")
+                reader.expect("]")
+                if reader.peek() == ",":
+                    reader.expect(",")
+            reader.expect("}")
+        if reader.peek() == ",":
+            reader.expect(",")
+    reader.expect("}")
+
+
+def iter_ndjson_products(fp: IO[str], vendor: str = DEFAULT_VENDOR) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """Yield (vendor, product) from NDJSON; a "vendor" field overrides the default."""
+    for line in fp:
+        if line.strip():
+            product = json.loads(line)
+            yield product.pop("vendor", vendor), product
+
+
+def is_ndjson(path: Path) -> bool:
+    return Path(path).suffix in (".ndjson", ".jsonl")
+
+
+def iter_products(path: Path, vendor: str = DEFAULT_VENDOR) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """Stream (vendor, product) pairs from a JSON or NDJSON catalog file."""
+    with open(path, encoding="utf-8") as fp:
+        if is_ndjson(path):
+            yield from iter_ndjson_products(fp, vendor)
+        else:
+            yield from iter_json_products(fp)
+
+
+# ---------------------------------------------------
+# Writers
+# ---------------------------------------------------
+
+class NDJSONWriter:
+    """Writes one product per line, tagged with its vendor."""
+
+    def __init__(self, path: Path):
+        self._fp = open(path, "w", encoding="utf-8")
+
+    def add(self, vendor: str, product: Dict[str, Any]) -> None:
+        self._fp.write(json.dumps(dict(product, vendor=vendor)))
+        self._fp.write("\n")
+
+    def close(self) -> None:
+        self._fp.close()
+
+
+class JSONWriter:
+    """Writes the catalog.json layout incrementally (products grouped by vendor in arrival order)."""
+
+    def __init__(self, path: Path):
+        self._fp = open(path, "w", encoding="utf-8")
+        self._fp.write('{\n  "products": {')
+        self._vendor: Optional[str] = None
+        self._first = True
+
+    def add(self, vendor: str, product: Dict[str, Any]) -> None:
+        if vendor != self._vendor:
+            if self._vendor is not None:
+                self._fp.write("\n    ],")
+            self._fp.write(f"\n    {json.dumps(vendor)}: [")
+            self._vendor = vendor
+            self._first = True
+        self._fp.write("\n" if self._first else ",\n")
+        self._fp.write(textwrap.indent(json.dumps(product, indent=2), "      "))
+        self._first = False
+
+    def close(self) -> None:
+        if self._vendor is not None:
+            self._fp.write("\n    ]")
+        self._fp.write("\n  }\n}\n")
+        self._fp.close()
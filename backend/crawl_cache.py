@@ -0,0 +1,164 @@
+"""
+Incremental catalog rebuilds.
+
+ResponseCache stores raw search responses on disk, content-addressed by
+hash, with a per-keyword freshness TTL. Every stored response is appended
+to a journal straight away, so an interrupted crawl resumes from the last
+completed keyword. merge_products then applies only the new, changed and
+removed products to the existing catalog.
+"""
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+DEFAULT_TTL = 24 * 3600  # seconds a cached response stays fresh
+
+
+class ResponseCache:
+    """
+    On-disk cache of search responses keyed by keyword.
+
+    Layout: objects/<sha256>.json holds each distinct response body (identical
+    responses are stored once), and journal.jsonl maps keywords to object
+    hashes with fetch times. Later journal lines win; compact() rewrites the
+    journal down to one line per keyword.
+    """
+
+    def __init__(self, root: Path, ttl: float = DEFAULT_TTL, ttls: Optional[Dict[str, float]] = None):
+        self.root = Path(root)
+        self.ttl = ttl
+        self.ttls = ttls or {}
+        self.hits = 0
+        self.misses = 0
+        self._objects = self.root / "objects"
+        self._journal_path = self.root / "journal.jsonl"
+        self._objects.mkdir(parents=True, exist_ok=True)
+        self._entries: Dict[str, Dict[str, Any]] = self._load_journal()
+        self._journal = open(self._journal_path, "a", encoding="utf-8")
+
+    def _load_journal(self) -> Dict[str, Dict[str, Any]]:
+        entries = {}
+        if self._journal_path.exists():
+            with open(self._journal_path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:  # torn final line from a crash
+                        continue
+                    entries[entry["keyword"]] = entry
+        return entries
+
+    def _object_path(self, digest: str) -> Path:
+        return self._objects / f"{digest}.json"
+
+    def is_fresh(self, keyword: str, now: Optional[float] = None) -> bool:
+        entry = self._entries.get(keyword)
+        if entry is None:
+            return False
+        ttl = self.ttls.get(keyword, self.ttl)
+        return (now or time.time()) - entry["fetched_at"] < ttl
+
+    def get(self, keyword: str) -> Optional[Dict[str, Any]]:
+        """Cached response for keyword if it is still fresh, else None."""
+        if self.is_fresh(keyword):
+            try:
+                with open(self._object_path(self._entries[keyword]["hash"]), encoding="utf-8") as f:
+                    response = json.load(f)
+            except (OSError, json.JSONDecodeError):
+                pass
+            else:
+                self.hits += 1
+                return response
+        self.misses += 1
+        return None
+
+    def put(self, keyword: str, response: Dict[str, Any]) -> str:
+        """Store a response and checkpoint it in the journal. Returns its hash."""
+        data = json.dumps(response, sort_keys=True).encode("utf-8")
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._object_path(digest)
+        if not path.exists():
+            tmp = path.with_suffix(".tmp")
+            tmp.write_bytes(data)
+            os.replace(tmp, path)
+
+        entry = {"keyword": keyword, "hash": digest, "fetched_at": time.time()}
+        self._entries[keyword] = entry
+        self._journal.write(json.dumps(entry) + "\n")
+        self._journal.flush()
+        os.fsync(self._journal.fileno())
+        return digest
+
+    def compact(self) -> None:
+        """Rewrite the journal with one entry per keyword and drop unreferenced objects."""
+        self._journal.close()
+        tmp = self._journal_path.with_suffix(".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            for entry in self._entries.values():
+                f.write(json.dumps(entry) + "\n")
+        os.replace(tmp, self._journal_path)
+        self._journal = open(self._journal_path, "a", encoding="utf-8")
+
+        live = {entry["hash"] for entry in self._entries.values()}
+        for path in self._objects.glob("*.json"):
+            if path.stem not in live:
+                path.unlink()
+
+    def close(self) -> None:
+        self._journal.close()
+
+
+# ---------------------------------------------------
+# Merge
+# ---------------------------------------------------
+
+def _variant_ids(product: Dict[str, Any]) -> List[str]:
+    return [variant["id"] for variant in product.get("variants", [])]
+
+
+def merge_products(
+    existing: List[Dict[str, Any]],
+    fresh: List[Dict[str, Any]],
+) -> Tuple[List[Dict[str, Any]], Dict[str, int]]:
+    """
+    Apply a fresh crawl to an existing product list.
+
+    Products whose id and name are unchanged keep their existing record, so
+    enrichment already applied to them (category, price, specs, tags) is
+    preserved. If the crawl collapsed a different set of duplicates into
+    such a product, its variants follow the crawl, again keeping existing
+    variant records by id. New or renamed products take the fresh record,
+    and products missing from the crawl are dropped. The result follows the
+    crawl order.
+    """
+    by_id: Dict[str, Dict[str, Any]] = {}
+    for product in existing:
+        by_id.setdefault(product["id"], product)
+
+    stats = {"added": 0, "changed": 0, "removed": 0, "unchanged": 0}
+    merged = []
+    seen = set()
+    for product in fresh:
+        seen.add(product["id"])
+        old = by_id.get(product["id"])
+        if old is None:
+            stats["added"] += 1
+            merged.append(product)
+        elif old.get("name") != product.get("name"):
+            stats["changed"] += 1
+            merged.append(product)
+        elif _variant_ids(old) != _variant_ids(product):
+            stats["changed"] += 1
+            kept = {variant["id"]: variant for variant in old.get("variants", [])}
+            record = {key: value for key, value in old.items() if key != "variants"}
+            if product.get("variants"):
+                record["variants"] = [kept.get(variant["id"], variant) for variant in product["variants"]]
+            merged.append(record)
+        else:
+            stats["unchanged"] += 1
+            merged.append(old)
+    stats["removed"] = sum(1 for product in existing if product["id"] not in seen)
+    return merged, stats
@@ -0,0 +1,240 @@
+"""
+Ingest-time product deduplication.
+
+Scraped ids are raw URL tails, so a category page shows up once per filter
+query string. canonical_id strips the query and fragment, and Deduplicator
+clusters records sharing a canonical id or vendor item number, or with
+near-duplicate names (MinHash signatures over name tokens, bucketed by LSH
+banding, so only candidate pairs are compared). A name match alone never
+merges two records with item numbers: scraped titles are often truncated,
+so distinct SKUs share them. Each cluster collapses into one canonical
+record carrying the others, in full, as "variants".
+"""
+import re
+from itertools import chain
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import unquote
+
+import numpy as np
+
+NUM_PERM = 64
+BANDS = 8  # 8 bands x 8 rows: pairs above ~0.77 Jaccard become candidates
+THRESHOLD = 0.85  # name token Jaccard needed to merge two products
+VERIFY_MARGIN = 0.15  # candidates this far below THRESHOLD by estimate are checked exactly
+BATCH_SIZE = 1024
+
+# Boilerplate that scraped titles carry regardless of the product
+_NAME_SUFFIXES = (" - grainger industrial supply", "...", "…")
+_NON_WORD = re.compile(r"[\W_]+")
+# Vendor item number at the end of a product slug, e.g. ...-Oscilloscope-Portable-780AY5
+_ITEM_NUMBER = re.compile(r"-((?=[0-9A-Z]*[0-9])(?=[0-9A-Z]*[A-Z])[0-9A-Z]{4,})$")
+
+
+def canonical_id(raw_id: str) -> str:
+    """Path part of a scraped id: no query string or fragment, percent-decoded."""
+    path = raw_id.split("#", 1)[0].split("?", 1)[0]
+    return unquote(path).strip().strip("/") or raw_id
+
+
+def item_number(product_id: str) -> Optional[str]:
+    """Trailing vendor item number of a canonical id, or None for listing pages."""
+    match = _ITEM_NUMBER.search(product_id)
+    return match.group(1) if match else None
+
+
+def normalize_name(name: str) -> str:
+    name = name.lower()
+    for suffix in _NAME_SUFFIXES:
+        if name.endswith(suffix):
+            name = name[: -len(suffix)]
+    return " ".join(_NON_WORD.sub(" ", name).split())
+
+
+class _DisjointSet:
+    def __init__(self):
+        self.parent: List[int] = []
+
+    def add(self) -> None:
+        self.parent.append(len(self.parent))
+
+    def find(self, x: int) -> int:
+        parent = self.parent
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    def union(self, a: int, b: int) -> None:
+        a, b = self.find(a), self.find(b)
+        if a != b:
+            # Lower row wins so clusters are rooted at their first record
+            if b < a:
+                a, b = b, a
+            self.parent[b] = a
+
+
+class Deduplicator:
+    """
+    Incremental near-duplicate detector.
+
+    add() records one product's id and name; signatures are computed in
+    NumPy batches, keeping roughly NUM_PERM * 4 bytes per row plus the id and
+    name strings. clusters() then groups rows without any pairwise pass.
+    """
+
+    def __init__(self, num_perm: int = NUM_PERM, bands: int = BANDS, threshold: float = THRESHOLD, seed: int = 1):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        rng = np.random.default_rng(seed)
+        # Multiply-shift hashing: h(x) = ((a * x + b) mod 2**64) >> 32, a odd
+        self._a = rng.integers(0, 2**63, num_perm, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+        self._b = rng.integers(0, 2**63, num_perm, dtype=np.uint64)
+        self.num_perm = num_perm
+        self.bands = bands
+        self.threshold = threshold
+        self.ids: List[str] = []
+        self.names: List[str] = []
+        self.canonical: List[str] = []
+        self.items: List[Optional[str]] = []
+        self.groups: List[int] = []
+        self._group_codes: Dict[str, int] = {}
+        self._vocab: Dict[str, int] = {}
+        self._pending: List[List[int]] = []
+        self._signatures: List[np.ndarray] = []
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def add(self, product: Dict[str, Any], group: str = "") -> None:
+        """Record a product; only products of the same group (vendor) are ever merged."""
+        self.ids.append(product["id"])
+        self.names.append(product.get("name", ""))
+        self.canonical.append(canonical_id(product["id"]))
+        self.items.append(item_number(self.canonical[-1]))
+        self.groups.append(self._group_codes.setdefault(group, len(self._group_codes)))
+        vocab = self._vocab
+        # Empty names still need one shingle for a signature
+        tokens = normalize_name(self.names[-1]).split() or [""]
+        self._pending.append([vocab.setdefault(token, len(vocab)) for token in tokens])
+        if len(self._pending) >= BATCH_SIZE:
+            self._flush()
+
+    def _flush(self) -> None:
+        if not self._pending:
+            return
+        lengths = np.fromiter((len(t) for t in self._pending), dtype=np.int64, count=len(self._pending))
+        offsets = np.cumsum(lengths) - lengths
+        shingles = np.fromiter(chain.from_iterable(self._pending), dtype=np.uint64, count=int(lengths.sum()))
+
+        hashed = (self._a[:, None] * shingles[None, :] + self._b[:, None]) >> np.uint64(32)
+        self._signatures.append(np.minimum.reduceat(hashed, offsets, axis=1).T.astype(np.uint32))
+        self._pending.clear()
+
+    def signatures(self) -> np.ndarray:
+        """MinHash signature matrix, one row per added product."""
+        self._flush()
+        if len(self._signatures) > 1:
+            self._signatures = [np.concatenate(self._signatures)]
+        return self._signatures[0] if self._signatures else np.zeros((0, self.num_perm), dtype=np.uint32)
+
+    def candidate_pairs(self, sig: np.ndarray, groups: Optional[np.ndarray] = None) -> np.ndarray:
+        """(row, representative) pairs of the same group sharing at least one LSH band bucket."""
+        r = self.num_perm // self.bands
+        # Bucket key: group code followed by the band's signature values
+        keyed = np.zeros((len(sig), r + 1), dtype=np.uint32)
+        if groups is not None:
+            keyed[:, 0] = groups
+        pairs = []
+        for band in range(self.bands):
+            keyed[:, 1:] = sig[:, band * r:(band + 1) * r]
+            keys = keyed.view(f"V{4 * (r + 1)}").ravel()
+            order = np.argsort(keys, kind="stable")
+            sorted_keys = keys[order]
+            new_bucket = np.ones(len(order), dtype=bool)
+            new_bucket[1:] = sorted_keys[1:] != sorted_keys[:-1]
+            # Link every row to the first row of its bucket
+            first = order[np.maximum.accumulate(np.where(new_bucket, np.arange(len(order)), 0))]
+            linked = first != order
+            pairs.append(np.stack([order[linked], first[linked]], axis=1))
+        if not pairs:
+            return np.zeros((0, 2), dtype=np.int64)
+        return np.unique(np.concatenate(pairs), axis=0)
+
+    def clusters(self) -> List[List[int]]:
+        """Rows grouped into duplicate clusters, each in ascending row order."""
+        sig = self.signatures()
+        sets = _DisjointSet()
+        for _ in range(len(self)):
+            sets.add()
+
+        first_by_id: Dict[Tuple[int, str], int] = {}
+        for row, key in enumerate(zip(self.groups, self.canonical)):
+            sets.union(first_by_id.setdefault(key, row), row)
+        first_by_item: Dict[Tuple[int, str], int] = {}
+        for row, key in enumerate(zip(self.groups, self.items)):
+            if key[1] is not None:
+                sets.union(first_by_item.setdefault(key, row), row)
+
+        # Names decide only between records without item numbers, so only
+        # those are bucketed (a bucket representative must be mergeable)
+        unnumbered = np.flatnonzero(np.fromiter((item is None for item in self.items), dtype=bool, count=len(self)))
+        pairs = self.candidate_pairs(sig[unnumbered], np.asarray(self.groups, dtype=np.uint32)[unnumbered])
+        if len(pairs):
+            pairs = unnumbered[pairs]
+            # Signature agreement pre-filters; the exact token Jaccard decides
+            similarity = (sig[pairs[:, 0]] == sig[pairs[:, 1]]).mean(axis=1)
+            for a, b in pairs[similarity >= self.threshold - VERIFY_MARGIN].tolist():
+                if sets.find(a) != sets.find(b) and self.jaccard(a, b) >= self.threshold:
+                    sets.union(a, b)
+
+        groups: Dict[int, List[int]] = {}
+        for row in range(len(self)):
+            groups.setdefault(sets.find(row), []).append(row)
+        return list(groups.values())
+
+    def jaccard(self, a: int, b: int) -> float:
+        """Exact Jaccard similarity of two rows' name tokens."""
+        x = set(normalize_name(self.names[a]).split())
+        y = set(normalize_name(self.names[b]).split())
+        return len(x & y) / len(x | y) if x or y else 1.0
+
+    def plan(self) -> Dict[int, List[int]]:
+        """
+        Map each canonical row to the rows collapsed into it. The canonical row
+        is the first one whose raw id is already canonical, else the first row.
+        """
+        result = {}
+        for rows in self.clusters():
+            head = next((row for row in rows if self.ids[row] == self.canonical[row]), rows[0])
+            result[head] = [row for row in rows if row != head]
+        return result
+
+
+def variant_record(product: Dict[str, Any]) -> Dict[str, Any]:
+    """A collapsed duplicate as kept under its canonical record: the full product, raw id included."""
+    return {key: value for key, value in product.items() if key != "variants"}
+
+
+def canonical_record(product: Dict[str, Any], variants: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Product with its canonical id and collapsed duplicates attached."""
+    record = dict(product, id=canonical_id(product["id"]))
+    if variants:
+        record["variants"] = list(product.get("variants", [])) + variants
+    return record
+
+
+def collapse(products: Iterable[Dict[str, Any]], dedup: Optional[Deduplicator] = None) -> Tuple[List[Dict[str, Any]], int]:
+    """
+    Collapse duplicates in a product list, preserving the order of canonical
+    records. Returns (products, number of rows collapsed away).
+    """
+    products = list(products)
+    dedup = Deduplicator() if dedup is None else dedup
+    for product in products:
+        dedup.add(product)
+    plan = dedup.plan()
+    result = [
+        canonical_record(products[row], [variant_record(products[v]) for v in plan[row]])
+        for row in range(len(products)) if row in plan
+    ]
+    return result, len(products) - len(result)
@@ -1,7 +1,13 @@
+import argparse
+import asyncio
 import json
-import time
+import os
 from serpapi import GoogleSearch
 
+from crawl_cache import ResponseCache, merge_products
+from dedup import collapse
+from scraper import Crawler, SerpApiTransport, parse_results
+
 # 🔑 PASTE YOUR SERPAPI KEY HERE
 SERP_API_KEY = "c491683ad2faaf4524132f048258cf1399a5917717767dd026df79fb347b4c7d"
 
@@ -26,6 +32,10 @@ PRODUCT_KEYWORDS = [
     "sound level meter","tachometer","data logger","inspection camera",
 ]
 
+# Response cache for incremental rebuilds; keywords default to crawl_cache.DEFAULT_TTL
+CACHE_DIR = "crawl_cache"
+KEYWORD_TTLS = {}  # keyword -> seconds, for keywords that need faster or slower refresh
+
 def search_grainger_products(keyword):
     """Search Google via SerpAPI"""
     params = {
@@ -36,50 +46,66 @@ def search_grainger_products(keyword):
     }
 
     search = GoogleSearch(params)
-    results = search.get_dict()
-
-    products = []
-
-    if "organic_results" in results:
-        for r in results["organic_results"]:
-            link = r.get("link", "")
-            title = r.get("title", keyword)
-
-            if "grainger.com" in link:
-                product = {
-                    "id": link.split("/")[-1],
-                    "name": title,
-                    "price": 0.0,
-                    "category": "grainger",
-                    "specs": {},
-                    "compatibility_tags": []
-                }
-                products.append(product)
-
-    return products
-
-
-def build_catalog():
-    all_products = []
-
-    for keyword in PRODUCT_KEYWORDS:
-        print(f"🔎 Searching Grainger for: {keyword}")
-        products = search_grainger_products(keyword)
-        all_products.extend(products)
-        time.sleep(1)  # avoid hitting rate limit
-
-    catalog = {
-        "products": {
-            "grainger": all_products
-        }
-    }
-
-    with open("catalog.json", "w") as f:
+    return parse_results(search.get_dict(), keyword)
+
+
+async def crawl_catalog(transport=None, rate=5.0, concurrency=8, cache=None):
+    """Search all keywords concurrently; rate is requests per second."""
+    if transport is not None:
+        crawler = Crawler(transport, SERP_API_KEY, rate=rate, concurrency=concurrency, cache=cache)
+        return await crawler.crawl(PRODUCT_KEYWORDS)
+    transport = SerpApiTransport()
+    try:
+        crawler = Crawler(transport, SERP_API_KEY, rate=rate, concurrency=concurrency, cache=cache)
+        return await crawler.crawl(PRODUCT_KEYWORDS)
+    finally:
+        await transport.aclose()
+
+
+def build_catalog(transport=None, rate=5.0, concurrency=8, cache_dir=CACHE_DIR, path="catalog.json", dedupe=False):
+    """
+    Refresh the catalog incrementally: only stale keywords are re-queried,
+    completed searches are checkpointed in cache_dir so an interrupted run
+    resumes, and only new, changed or removed products touch the file.
+    With dedupe, duplicate products are collapsed first, as with
+    upgrade_json.py --dedupe.
+    """
+    cache = ResponseCache(cache_dir, ttls=KEYWORD_TTLS)
+    try:
+        fresh = asyncio.run(crawl_catalog(transport, rate, concurrency, cache))
+        cache.compact()
+    finally:
+        cache.close()
+    print(f"📦 {cache.hits} keywords from cache, {cache.misses} searched")
+    if dedupe:
+        fresh, collapsed = collapse(fresh)
+        if collapsed:
+            print(f"🧹 Collapsed {collapsed} duplicate products")
+
+    catalog = {"products": {}}
+    if os.path.exists(path):
+        with open(path) as f:
+            catalog = json.load(f)
+    existing = catalog["products"].get("grainger", [])
+    merged, stats = merge_products(existing, fresh)
+    if not (stats["added"] or stats["changed"] or stats["removed"]) and merged == existing:
+        print(f"\n✅ DONE! {path} is up to date ({len(merged)} Grainger products)")
+        return
+    catalog["products"]["grainger"] = merged
+
+    # Write then rename so a hot-reloading API never reads a partial file
+    with open(f"{path}.tmp", "w") as f:
         json.dump(catalog, f, indent=2)
+    os.replace(f"{path}.tmp", path)
 
-    print(f"\n✅ DONE! Saved {len(all_products)} Grainger products to catalog.json")
+    print(f"\n✅ DONE! Saved {len(merged)} Grainger products to {path} "
+          f"(+{stats['added']} ~{stats['changed']} -{stats['removed']})")
 
 
 if __name__ == "__main__":
-    build_catalog()
+    parser = argparse.ArgumentParser(description="Refresh catalog.json from Grainger search results")
+    parser.add_argument("--dedupe", action="store_true", help="collapse duplicate products before merging")
+    args = parser.parse_args()
+
+    build_catalog(dedupe=args.dedupe)
 
@@ -0,0 +1,160 @@
+"""
+Confidence-tiered intent classification.
+
+The rule matcher answers when its top scenario's confidence clears the
+threshold. Otherwise the local vector classifier (if any) answers when its
+similarity clears its own threshold, and only the remaining goals are
+escalated to the LLM under a short deadline; if the LLM is unavailable the
+rule answer stands. Every goal is counted against the tier that answered,
+with its latency.
+"""
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional, Sequence
+
+from matcher import IntentMatcher
+from intent_vectors import CentroidClassifier
+from ollama_client import LLMUnavailable
+
+TIERS = ("rules", "vector", "llm", "fallback")
+
+
+class IntentCascade:
+    """
+    classify_batch(goals) returns one parsed_intent dict per goal: scenario,
+    the rule confidence, the rule candidates, and the tier that answered
+    ("rules", "vector", "llm", or "fallback" when escalation failed). Each
+    tier handles all of its goals in one pass. threshold 0 disables
+    escalation past the rules. load_vectors() returns the vector classifier
+    (called once, on the first escalation); llm(goals, scenarios, timeout)
+    defaults to ollama_llm.llm_intents.
+
+    matcher, default and load_vectors may instead be passed to each
+    classify_batch call, so one cascade (and its stats) can serve several
+    rule versions; a per-call load_vectors is called on every escalation
+    and should cache its classifier.
+
+    Latency per goal is amortized: its share of every stage it went through.
+    """
+
+    def __init__(
+        self,
+        matcher: Optional[IntentMatcher] = None,
+        default: Optional[str] = None,
+        threshold: float = 0.5,
+        timeout: float = 3.0,
+        llm: Optional[Callable[..., List[Any]]] = None,
+        load_vectors: Optional[Callable[[], CentroidClassifier]] = None,
+        vector_threshold: float = 0.25,
+        window: int = 1024,
+    ):
+        self.matcher = matcher
+        self.default = default
+        self.threshold = threshold
+        self.timeout = timeout
+        self._load_vectors = load_vectors
+        self._vectors: Optional[CentroidClassifier] = None
+        self.vector_threshold = vector_threshold
+        self._llm = llm
+        self._counts = {tier: 0 for tier in TIERS}
+        self._total_ms = {tier: 0.0 for tier in TIERS}
+        self._recent: Dict[str, Deque[float]] = {tier: deque(maxlen=window) for tier in TIERS}
+        self._lock = threading.Lock()
+
+    @property
+    def llm(self) -> Callable[..., List[Any]]:
+        if self._llm is None:
+            from ollama_llm import llm_intents  # deferred: opens the client only when escalating
+
+            self._llm = llm_intents
+        return self._llm
+
+    @property
+    def vectors(self) -> Optional[CentroidClassifier]:
+        if self._vectors is None and self._load_vectors is not None:
+            with self._lock:
+                if self._vectors is None:
+                    self._vectors = self._load_vectors()
+        return self._vectors
+
+    def classify(self, goal: str, **model: Any) -> Dict[str, Any]:
+        return self.classify_batch([goal], **model)[0]
+
+    def classify_batch(
+        self,
+        goals: Sequence[str],
+        matcher: Optional[IntentMatcher] = None,
+        default: Optional[str] = None,
+        load_vectors: Optional[Callable[[], CentroidClassifier]] = None,
+    ) -> List[Dict[str, Any]]:
+        matcher = matcher or self.matcher
+        default = default or self.default
+        start = time.perf_counter()
+        intents = []
+        for goal in goals:
+            candidates = [
+                {"scenario": scenario, "score": score, "confidence": round(confidence, 3), "keywords": keywords}
+                for scenario, score, confidence, keywords in matcher.score(goal)
+            ]
+            if candidates:
+                scenario, confidence = candidates[0]["scenario"], candidates[0]["confidence"]
+            else:
+                scenario, confidence = default, 0.0
+            intents.append({"scenario": scenario, "confidence": confidence, "candidates": candidates, "tier": "rules"})
+        latency = [(time.perf_counter() - start) * 1000 / max(len(goals), 1)] * len(goals)
+
+        pending = [i for i, intent in enumerate(intents) if intent["confidence"] < self.threshold]
+        if pending and (load_vectors or self._load_vectors) is not None:
+            start = time.perf_counter()
+            vectors = load_vectors() if load_vectors is not None else self.vectors
+            answers = vectors.classify([goals[i] for i in pending])
+            stage_ms = (time.perf_counter() - start) * 1000 / len(pending)
+            unresolved = []
+            for i, (scenario, similarity) in zip(pending, answers):
+                latency[i] += stage_ms
+                if similarity >= self.vector_threshold:
+                    intents[i].update(scenario=scenario, tier="vector", similarity=round(similarity, 3))
+                else:
+                    unresolved.append(i)
+            pending = unresolved
+
+        if pending:
+            start = time.perf_counter()
+            scenarios = list(matcher.labels) + [default]
+            answers = self.llm([goals[i] for i in pending], scenarios, timeout=self.timeout)
+            stage_ms = (time.perf_counter() - start) * 1000
+            for i, answer in zip(pending, answers):
+                latency[i] += stage_ms
+                if isinstance(answer, LLMUnavailable):
+                    intents[i]["tier"] = "fallback"
+                else:
+                    intents[i].update(scenario=answer, tier="llm")
+
+        with self._lock:
+            for intent, ms in zip(intents, latency):
+                tier = intent["tier"]
+                self._counts[tier] += 1
+                self._total_ms[tier] += ms
+                self._recent[tier].append(ms)
+        return intents
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = sum(self._counts.values())
+            tiers = {}
+            for tier in TIERS:
+                recent = sorted(self._recent[tier])
+                tiers[tier] = {
+                    "count": self._counts[tier],
+                    "mean_ms": round(self._total_ms[tier] / self._counts[tier], 3) if self._counts[tier] else 0.0,
+                    "p95_ms": round(recent[int(len(recent) * 0.95)], 3) if recent else 0.0,
+                }
+        escalated = total - tiers["rules"]["count"]
+        return {
+            "requests": total,
+            "escalation_rate": round(escalated / total, 4) if total else 0.0,
+            "llm_rate": round((tiers["llm"]["count"] + tiers["fallback"]["count"]) / total, 4) if total else 0.0,
+            "threshold": self.threshold,
+            "tiers": tiers,
+        }
@@ -1,15 +1,218 @@
-import requests
+import asyncio
+import concurrent.futures
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple, Union
 
-def ask_llama(prompt: str) -> str:
-    url = "http://localhost:11434/api/generate"
+from llm_cache import LLMCache
+from ollama_client import LLMUnavailable, MicroBatcher, OllamaClient
 
-    response = requests.post(
-        url,
-        json={
-            "model": "llama3.2",
-            "prompt": prompt,
-            "stream": False
-        }
-    )
+MODEL = "llama3.2"
 
-    return response.json()["response"]
+# Ollama client: base URL, max in-flight generations, per-call deadline (s),
+# and an optional hedge delay (s) after which a slow call is duplicated
+OLLAMA_URL = os.environ.get("CARTPILOT_OLLAMA_URL", "http://localhost:11434")
+LLM_CONCURRENCY = int(os.environ.get("CARTPILOT_LLM_CONCURRENCY", "2"))
+LLM_TIMEOUT = float(os.environ.get("CARTPILOT_LLM_TIMEOUT", "20"))
+LLM_HEDGE_AFTER = os.environ.get("CARTPILOT_LLM_HEDGE_AFTER", "")
+
+# Micro-batching of intent prompts: collection window (ms) and max goals per prompt
+LLM_BATCH_WINDOW_MS = float(os.environ.get("CARTPILOT_LLM_BATCH_WINDOW_MS", "5"))
+LLM_BATCH_MAX = int(os.environ.get("CARTPILOT_LLM_BATCH_MAX", "16"))
+
+# Response cache: CARTPILOT_LLM_CACHE is the journal path ("" keeps it in memory only);
+# CARTPILOT_LLM_CACHE_SIMILARITY enables the near-duplicate tier at that token Jaccard
+LLM_CACHE_PATH = os.environ.get("CARTPILOT_LLM_CACHE", str(Path(__file__).parent / "llm_cache.jsonl"))
+LLM_CACHE_SIMILARITY = os.environ.get("CARTPILOT_LLM_CACHE_SIMILARITY", "")
+
+_llm_cache: Optional[LLMCache] = None
+_llm_cache_lock = threading.Lock()
+
+
+def get_llm_cache() -> LLMCache:
+    """Process-wide response cache, opened (and its journal loaded) on first use."""
+    global _llm_cache
+    if _llm_cache is None:
+        with _llm_cache_lock:
+            if _llm_cache is None:
+                _llm_cache = LLMCache(
+                    path=LLM_CACHE_PATH or None,
+                    similarity=float(LLM_CACHE_SIMILARITY) if LLM_CACHE_SIMILARITY else None,
+                )
+    return _llm_cache
+
+
+_llm_client: Optional[OllamaClient] = None
+_llm_loop: Optional[asyncio.AbstractEventLoop] = None
+_llm_client_lock = threading.Lock()
+
+
+def get_llm_client() -> OllamaClient:
+    """
+    Process-wide Ollama client. It lives on a dedicated event-loop thread so
+    sync callers (agents, threadpool endpoints) share one connection pool,
+    semaphore and circuit breaker.
+    """
+    global _llm_client, _llm_loop
+    if _llm_client is None:
+        with _llm_client_lock:
+            if _llm_client is None:
+                _llm_loop = asyncio.new_event_loop()
+                threading.Thread(target=_llm_loop.run_forever, name="ollama-client", daemon=True).start()
+                _llm_client = OllamaClient(
+                    base_url=OLLAMA_URL,
+                    model=MODEL,
+                    max_concurrency=LLM_CONCURRENCY,
+                    timeout=LLM_TIMEOUT,
+                    hedge_after=float(LLM_HEDGE_AFTER) if LLM_HEDGE_AFTER else None,
+                )
+    return _llm_client
+
+
+def _generate(prompt: str, timeout: Optional[float] = None) -> str:
+    """Blocking generate on the shared client; raises LLMUnavailable."""
+    client = get_llm_client()
+    future = asyncio.run_coroutine_threadsafe(client.generate(prompt, timeout), _llm_loop)
+    return future.result()
+
+
+def ask_llama(prompt: str, goal: Optional[str] = None) -> str:
+    """
+    Generate a response, served from the cache when possible.
+
+    Pass the user goal the prompt was built from to cache per goal: entries
+    are then keyed by the prompt template and the normalized goal, and the
+    similarity tier (if enabled) can answer near-duplicate goals. Without a
+    goal the whole prompt is the (exact-tier) key.
+
+    Raises LLMUnavailable when Ollama misses the deadline, errors, or the
+    circuit breaker is open; callers should fall back to the rule-based path.
+    """
+    if goal is not None and goal in prompt:
+        template = prompt.replace(goal, "{goal}")
+        text = goal
+    else:
+        template, text = "", prompt
+    namespace = f"{MODEL}:{hashlib.sha256(template.encode('utf-8')).hexdigest()[:12]}"
+
+    cache = get_llm_cache()
+    cached = cache.get(namespace, text, similar=goal is not None)
+    if cached is not None:
+        return cached
+
+    response = _generate(prompt)
+    cache.put(namespace, text, response)
+    return response
+
+
+# ---------------------------------------------------
+# Batched intent classification
+# ---------------------------------------------------
+
+INTENT_PROMPT = """Classify each industrial procurement goal into exactly one scenario.
+Scenarios: {scenarios}
+Goals:
+{goals}
+Answer with only a JSON array, one object per goal: [{{"id": 1, "scenario": "<scenario>"}}]"""
+
+
+def build_intent_prompt(goals: Sequence[str], scenarios: Sequence[str]) -> str:
+    numbered = "\n".join(f"{i}. {' '.join(goal.split())}" for i, goal in enumerate(goals, 1))
+    return INTENT_PROMPT.format(scenarios=", ".join(scenarios), goals=numbered)
+
+
+def parse_intent_batch(
+    text: str, count: int, scenarios: Sequence[str]
+) -> List[Union[str, LLMUnavailable]]:
+    """
+    Split a batched answer back into one scenario per goal. Goals the model
+    skipped or answered with an unknown scenario get LLMUnavailable.
+    """
+    answers: Dict[int, str] = {}
+    start, end = text.find("["), text.rfind("]")
+    try:
+        items = json.loads(text[start:end + 1]) if 0 <= start < end else []
+    except json.JSONDecodeError:
+        items = []
+    for item in items if isinstance(items, list) else []:
+        if isinstance(item, dict) and item.get("scenario") in scenarios:
+            try:
+                answers.setdefault(int(item.get("id")), item["scenario"])
+            except (TypeError, ValueError):
+                continue
+    return [
+        answers.get(i) or LLMUnavailable(f"no usable answer for goal {i}")
+        for i in range(1, count + 1)
+    ]
+
+
+_intent_batchers: Dict[Tuple[str, ...], MicroBatcher] = {}
+
+
+def get_intent_batcher(scenarios: Sequence[str]) -> MicroBatcher:
+    """One batcher per scenario set, sharing the process-wide client."""
+    key = tuple(scenarios)
+    if key not in _intent_batchers:
+        client = get_llm_client()
+        with _llm_client_lock:
+            if key not in _intent_batchers:
+                async def run_batch(goals: List[str]) -> List[Union[str, LLMUnavailable]]:
+                    text = await client.generate(build_intent_prompt(goals, key))
+                    return parse_intent_batch(text, len(goals), key)
+
+                _intent_batchers[key] = MicroBatcher(
+                    run_batch, window=LLM_BATCH_WINDOW_MS / 1000, max_batch=LLM_BATCH_MAX
+                )
+    return _intent_batchers[key]
+
+
+def llm_batch_stats() -> Dict[str, float]:
+    batches = sum(b.batches for b in _intent_batchers.values())
+    items = sum(b.items for b in _intent_batchers.values())
+    return {"batches": batches, "items": items, "mean_batch": round(items / batches, 2) if batches else 0.0}
+
+
+def llm_intents(
+    goals: Sequence[str], scenarios: Sequence[str], timeout: Optional[float] = None
+) -> List[Union[str, LLMUnavailable]]:
+    """
+    Scenario for each goal according to the LLM, cached per normalized goal.
+
+    Uncached goals are submitted together, so they (and any concurrent
+    callers) are micro-batched into as few prompts as possible. timeout caps
+    the total wait; the batches themselves run under the client deadline.
+    A goal that times out, hits an outage, or gets an unusable answer yields
+    an LLMUnavailable in its slot.
+    """
+    namespace = f"{MODEL}:intent:{hashlib.sha256(','.join(scenarios).encode('utf-8')).hexdigest()[:12]}"
+    cache = get_llm_cache()
+    results: List[Union[str, LLMUnavailable, None]] = [cache.get(namespace, goal) for goal in goals]
+    pending = [i for i, cached in enumerate(results) if cached is None]
+    if not pending:
+        return results
+
+    batcher = get_intent_batcher(scenarios)
+    futures = {i: asyncio.run_coroutine_threadsafe(batcher.submit(goals[i]), _llm_loop) for i in pending}
+    done, not_done = concurrent.futures.wait(futures.values(), timeout)
+    for future in not_done:
+        future.cancel()
+    for i, future in futures.items():
+        if future in not_done:
+            results[i] = LLMUnavailable(f"no answer within {timeout:g} s")
+        elif isinstance(future.exception(), LLMUnavailable):
+            results[i] = future.exception()
+        else:
+            results[i] = future.result()
+            cache.put(namespace, goals[i], results[i])
+    return results
+
+
+def llm_intent(goal: str, scenarios: Sequence[str], timeout: Optional[float] = None) -> str:
+    """Single-goal llm_intents; raises LLMUnavailable instead of returning it."""
+    result = llm_intents([goal], scenarios, timeout)[0]
+    if isinstance(result, LLMUnavailable):
+        raise result
+    return result
@@ -0,0 +1,235 @@
+"""
+Concurrent, rate-limited catalog crawler.
+
+Keywords are searched concurrently under a token-bucket rate limit and a cap
+on in-flight requests, with retry and exponential backoff on transient
+failures. The search transport is pluggable: SerpApiTransport talks HTTP to
+SerpAPI (or to FakeSearchServer, a local stand-in for tests and benchmarks).
+With a crawl_cache.ResponseCache attached, fresh keywords are not re-queried
+and each completed search is checkpointed as it lands.
+"""
+import asyncio
+import json
+import random
+import time
+from typing import Any, Dict, List, Optional, Protocol
+from urllib.parse import parse_qs, urlsplit
+
+import httpx
+
+SERPAPI_URL = "https://serpapi.com/search.json"
+
+# Status codes worth retrying: rate limited or server-side failure
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+
+class TransientSearchError(Exception):
+    """A search failed in a way that may succeed on retry."""
+
+
+class SearchTransport(Protocol):
+    async def search(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        """Run one search and return the SerpAPI-shaped result dict."""
+
+
+# ---------------------------------------------------
+# Rate limiting
+# ---------------------------------------------------
+
+class TokenBucket:
+    """Async token bucket: `rate` tokens per second, bursts up to `capacity`."""
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+# ---------------------------------------------------
+# Transports
+# ---------------------------------------------------
+
+class SerpApiTransport:
+    """HTTP transport with a pooled keep-alive client."""
+
+    def __init__(self, base_url: str = SERPAPI_URL, timeout: float = 30.0, max_connections: int = 32):
+        self.base_url = base_url
+        self._client = httpx.AsyncClient(
+            timeout=timeout,
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+        )
+
+    async def search(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        try:
+            response = await self._client.get(self.base_url, params=params)
+        except httpx.TransportError as e:
+            raise TransientSearchError(str(e)) from e
+        if response.status_code in RETRY_STATUS:
+            raise TransientSearchError(f"HTTP {response.status_code}")
+        response.raise_for_status()
+        return response.json()
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
+
+
+class FakeSearchServer:
+    """
+    Local HTTP server answering SerpAPI-shaped searches for grainger.com.
+
+    Responses are deterministic per query; `latency` adds a delay to each
+    request and `failure_rate` makes that fraction of requests return 503.
+    Use as `async with FakeSearchServer() as server:` and point a
+    SerpApiTransport at `server.url`.
+    """
+
+    def __init__(self, latency: float = 0.0, failure_rate: float = 0.0, results: int = 5, seed: int = 0):
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.results = results
+        self.requests = 0
+        self._rng = random.Random(seed)
+        self._server: Optional[asyncio.AbstractServer] = None
+        self.url = ""
+
+    def respond(self, query: str) -> Dict[str, Any]:
+        keyword = query.replace("site:grainger.com", "").strip()
+        slug = "-".join(keyword.lower().split())
+        return {
+            "organic_results": [
+                {
+                    "title": f"{keyword.title()} {i} - Grainger Industrial Supply",
+                    "link": f"https://www.grainger.com/category/{slug}-{i}",
+                }
+                for i in range(self.results)
+            ]
+        }
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                    pass
+                self.requests += 1
+                if self.latency:
+                    await asyncio.sleep(self.latency)
+
+                target = request_line.decode("latin-1").split(" ")[1]
+                query = parse_qs(urlsplit(target).query).get("q", [""])[0]
+                if self._rng.random() < self.failure_rate:
+                    status, body = "503 Service Unavailable", b"{}"
+                else:
+                    status, body = "200 OK", json.dumps(self.respond(query)).encode("utf-8")
+                writer.write(
+                    f"HTTP/1.1 {status}\r\nContent-Type: application/json\r\n"
+                    f"Content-Length: {len(body)}\r\n\r\n".encode("latin-1") + body
+                )
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def __aenter__(self) -> "FakeSearchServer":
+        self._server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        host, port = self._server.sockets[0].getsockname()[:2]
+        self.url = f"http://{host}:{port}/search.json"
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        self._server.close()
+        await self._server.wait_closed()
+
+
+# ---------------------------------------------------
+# Crawler
+# ---------------------------------------------------
+
+def parse_results(results: Dict[str, Any], keyword: str) -> List[Dict[str, Any]]:
+    """Turn a SerpAPI result dict into raw catalog products."""
+    products = []
+    for r in results.get("organic_results", []):
+        link = r.get("link", "")
+        title = r.get("title", keyword)
+        if "grainger.com" in link:
+            products.append({
+                "id": link.split("/")[-1],
+                "name": title,
+                "price": 0.0,
+                "category": "grainger",
+                "specs": {},
+                "compatibility_tags": []
+            })
+    return products
+
+
+class Crawler:
+    """Searches many keywords concurrently within a rate limit."""
+
+    def __init__(
+        self,
+        transport: SearchTransport,
+        api_key: str = "",
+        rate: float = 5.0,
+        concurrency: int = 8,
+        retries: int = 4,
+        backoff: float = 0.5,
+        cache=None,
+    ):
+        self.transport = transport
+        self.cache = cache
+        self.api_key = api_key
+        self.bucket = TokenBucket(rate)
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.retries = retries
+        self.backoff = backoff
+
+    async def search(self, keyword: str) -> Dict[str, Any]:
+        """Raw result dict for one keyword, retrying transient failures."""
+        params = {
+            "engine": "google",
+            "q": f"site:grainger.com {keyword}",
+            "api_key": self.api_key,
+            "num": 5
+        }
+        for attempt in range(self.retries + 1):
+            await self.bucket.acquire()
+            try:
+                async with self.semaphore:
+                    return await self.transport.search(params)
+            except TransientSearchError:
+                if attempt == self.retries:
+                    raise
+                # Exponential backoff with full jitter
+                await asyncio.sleep(random.uniform(0, self.backoff * 2 ** attempt))
+
+    async def search_products(self, keyword: str) -> List[Dict[str, Any]]:
+        """Products for one keyword, served from the response cache while fresh."""
+        results = self.cache.get(keyword) if self.cache is not None else None
+        if results is None:
+            print(f"🔎 Searching Grainger for: {keyword}")
+            results = await self.search(keyword)
+            if self.cache is not None:
+                self.cache.put(keyword, results)
+        return parse_results(results, keyword)
+
+    async def crawl(self, keywords: List[str]) -> List[Dict[str, Any]]:
+        """Products for all keywords, in keyword order."""
+        batches = await asyncio.gather(*(self.search_products(k) for k in keywords))
+        return [product for batch in batches for product in batch]
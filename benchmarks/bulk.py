@@ -0,0 +1,45 @@
+"""
+Audit validation: validate_component_set per cart vs one bulk matrix pass (carts/sec).
+"""
+import json
+import random
+import time
+
+from benchmarks.common import timeit
+from rules import get_rules
+
+
+def bench_bulk(batches=(1_000, 10_000, 100_000), max_size=12, conflicts=30):
+    """Audit validation: validate_component_set per cart vs one bulk matrix pass (carts/sec)."""
+    from bulk_validation import RuleMatrices
+    from rules import RULES_PATH, RuleSet, validate_component_set
+
+    rng = random.Random(0)
+    rules = get_rules()
+    components = rules.components()
+    data = json.loads(RULES_PATH.read_text())
+    data["compatibility"] = data["compatibility"] + [
+        {"components": rng.sample(components, 2), "compatible": False} for _ in range(conflicts)
+    ]
+    rules = RuleSet(data, "benchmark")
+    start = time.perf_counter()
+    matrices = RuleMatrices(rules)
+    compile_ms = (time.perf_counter() - start) * 1000
+
+    print(f"{'carts':>8} {'loop carts/s':>13} {'bulk carts/s':>13} {'speedup':>8} {'with issues':>12}")
+    for n in batches:
+        carts = [rng.sample(components, rng.randint(1, max_size)) for _ in range(n)]
+        results = matrices.validate(carts)
+        expected = [validate_component_set(cart, rules) for cart in carts]
+        assert all(
+            sorted(missing) == sorted(r["missing_dependencies"]) and issues == r["compatibility_issues"]
+            for (missing, issues), r in zip(expected, results)
+        )
+        loop_ms = timeit(lambda: [validate_component_set(cart, rules) for cart in carts], repeat=1)
+        bulk_ms = timeit(lambda: matrices.validate(carts), repeat=3)
+        flagged = sum(1 for r in results if r["compatibility_issues"])
+        print(
+            f"{n:>8,} {n / loop_ms * 1000:>13,.0f} {n / bulk_ms * 1000:>13,.0f} "
+            f"{loop_ms / bulk_ms:>7.1f}x {flagged:>12,}"
+        )
+    print(f"{len(matrices.components)} components, compiled in {compile_ms:.1f} ms")
@@ -0,0 +1,28 @@
+"""
+Per-request product selection latency against the resident catalog.
+"""
+import time
+
+from benchmarks.common import synthetic_products, timeit
+
+
+def bench_catalog(sizes=(1_000, 100_000, 1_000_000)):
+    """Per-request product selection latency against the resident catalog."""
+    from catalog import Catalog, set_catalog
+    from agents import product_selection_agent
+
+    state = {
+        "required_components": ["digital-multimeters", "clamp-meters", "power-drills"],
+        "missing_dependencies": ["safety-goggles", "electrical-insulating-gloves", "safety-gloves"],
+    }
+
+    print(f"{'products':>10} {'build ms':>10} {'request ms':>11}")
+    for n in sizes:
+        products = synthetic_products(n)
+        start = time.perf_counter()
+        catalog = Catalog(products)
+        build_ms = (time.perf_counter() - start) * 1000
+        set_catalog(catalog)
+        request_ms = timeit(lambda: product_selection_agent(dict(state)), repeat=200)
+        print(f"{n:>10,} {build_ms:>10.1f} {request_ms:>11.4f}")
+    set_catalog(None)
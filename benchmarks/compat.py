@@ -0,0 +1,57 @@
+"""
+Cart compatibility: original full-matrix agent loop vs compiled bitset index (issues only).
+"""
+import random
+import time
+
+from benchmarks.common import timeit
+
+
+def bench_compat(sizes=(100, 500, 2_000), cart_sizes=(10, 50), conflict_rate=0.02, carts=200):
+    """Cart compatibility: original full-matrix agent loop vs compiled bitset index (issues only)."""
+    from rules import CompatibilityIndex
+
+    rng = random.Random(0)
+    print(f"{'components':>11} {'cart':>5} {'matrix us':>10} {'bitset us':>10} {'issues':>7}")
+    for n in sizes:
+        names = [f"component-{i}" for i in range(n)]
+        rules = {}
+        for _ in range(int(n * n * conflict_rate / 2)):
+            a, b = rng.sample(names, 2)
+            rules[(a, b)] = False
+        ecosystems = {f"ecosystem-{e}": set(rng.sample(names, n // 10)) for e in range(10)}
+        start = time.perf_counter()
+        index = CompatibilityIndex(rules, ecosystems)
+        compile_ms = (time.perf_counter() - start) * 1000
+
+        def check(a, b):
+            # Original check_compatibility: rule lookups, then an ecosystem scan
+            if (a, b) in rules:
+                return rules[(a, b)]
+            if (b, a) in rules:
+                return rules[(b, a)]
+            for members in ecosystems.values():
+                if a in members and b in members:
+                    return True
+            return True
+
+        for size in cart_sizes:
+            batch = [rng.sample(names, size) for _ in range(carts)]
+
+            def matrix():
+                found = []
+                for cart in batch:
+                    for a in cart:
+                        for b in cart:
+                            if a != b and not check(a, b):
+                                found.append((a, b))
+                return found
+
+            def bitset():
+                return [pair for cart in batch for pair in index.issues(cart)]
+
+            assert matrix() == bitset()
+            matrix_us = timeit(matrix, repeat=1) * 1000 / carts
+            bitset_us = timeit(bitset, repeat=5) * 1000 / carts
+            print(f"{n:>11,} {size:>5} {matrix_us:>10.1f} {bitset_us:>10.1f} {len(bitset()) / carts:>7.1f}")
+        print(f"{'':>11} compiled in {compile_ms:.1f} ms")
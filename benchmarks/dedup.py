@@ -0,0 +1,50 @@
+"""
+Ingest deduplication: rows/s and accuracy on planted query-string and near-duplicate names.
+"""
+import random
+import time
+
+
+def bench_dedup(sizes=(100_000, 1_000_000)):
+    """Ingest deduplication: rows/s and accuracy on planted query-string and near-duplicate names."""
+    from dedup import Deduplicator
+
+    brands = ["MSA", "3M", "FLUKE", "MILWAUKEE", "BRADY", "HONEYWELL", "DEWALT", "KLEIN"]
+    words = ["helmet", "glove", "drill", "meter", "camera", "lock", "harness", "kit", "saw", "gauge",
+             "digital", "portable", "cordless", "industrial", "heavy", "duty", "compact", "clear", "steel", "pro"]
+    for n in sizes:
+        rng = random.Random(0)
+        products, truth, titles = [], [], []
+        for i in range(n):
+            r = rng.random()
+            if i and r < 0.1:  # filtered listing of an earlier product
+                j = rng.randrange(i)
+                products.append({"id": f"{products[j]['id']}?brandName={rng.choice(brands)}&filters=brandName",
+                                 "name": products[j]["name"]})
+                truth.append(truth[j])
+                titles.append(titles[j])
+            elif i and r < 0.2:  # same product title with scraper boilerplate
+                j = rng.randrange(i)
+                products.append({"id": f"listing-{i}", "name": titles[j] + " - Grainger Industrial Supply"})
+                truth.append(truth[j])
+                titles.append(titles[j])
+            else:
+                name = f"{rng.choice(brands)} {' '.join(rng.sample(words, 5))} {rng.randrange(10_000)}"
+                products.append({"id": f"SKU-{i:08d}", "name": name})
+                truth.append(i)
+                titles.append(name)
+
+        start = time.perf_counter()
+        dedup = Deduplicator()
+        for product in products:
+            dedup.add(product)
+        clusters = dedup.clusters()
+        elapsed = time.perf_counter() - start
+
+        # Random titles can share a word set by chance; those merges are correct by name
+        words_of = [frozenset(title.lower().split()) for title in titles]
+        false_merges = sum(len({words_of[row] for row in rows}) - 1 for rows in clusters)
+        expected = len(set(words_of))
+        missed = len(clusters) + false_merges - expected
+        print(f"  {n:>9,} rows  {n / elapsed:>9,.0f} rows/s  {len(clusters):,} clusters "
+              f"(expected {expected:,}; false merges {false_merges}, missed {missed})")
@@ -0,0 +1,36 @@
+"""
+Enrichment throughput: original any() chains vs compiled batch engine.
+"""
+import time
+
+from benchmarks.common import reference_enrich, synthetic_raw_products
+
+
+def bench_enrich(n=1_000_000):
+    """Enrichment throughput: original any() chains vs compiled batch engine."""
+    import copy
+    from enrichment import EnrichmentEngine, enrich_stream
+
+    products = synthetic_raw_products(n)
+    engine = EnrichmentEngine()
+
+    sample = products[:20_000]
+    expected = copy.deepcopy(sample)
+    for p in expected:
+        reference_enrich(p)
+    assert engine.enrich_batch(copy.deepcopy(sample)) == expected, "engine disagrees with reference"
+
+    def run(label, fn):
+        rows = copy.deepcopy(products) if n <= 200_000 else [dict(p) for p in products]
+        start = time.perf_counter()
+        fn(rows)
+        elapsed = time.perf_counter() - start
+        print(f"  {label:<28} {n / elapsed:>12,.0f} rows/s")
+        return elapsed
+
+    print(f"{n:,} products")
+    base = run("reference any() chains", lambda rows: [reference_enrich(p) for p in rows])
+    single = run("engine, per product", lambda rows: [engine.enrich(p) for p in rows])
+    batch = run("engine, batched", engine.enrich_batch)
+    pooled = run("engine, process pool", lambda rows: sum(1 for _ in enrich_stream((("v", p) for p in rows))))
+    print(f"  speedup: per product {base / single:.1f}x, batched {base / batch:.1f}x, pool {base / pooled:.1f}x")
@@ -0,0 +1,40 @@
+"""
+Per-request executor overhead: LangGraph graph vs fast-path executor, real and no-op agents.
+"""
+from benchmarks.common import timeit
+
+
+def bench_executor(goals=("electrical work", "confined space gas", "security warehouse"), repeat=200):
+    """Per-request executor overhead: LangGraph graph vs fast-path executor, real and no-op agents."""
+    import graph
+    from executor import FastPathExecutor, agent
+
+    def noop(fn):
+        # Same name and declared writes as the real agent, no work
+        def run(state):
+            return {}
+
+        run.__name__ = fn.__name__
+        return agent(reads=fn.reads, writes=fn.writes)(run)
+
+    noops = [noop(fn) for fn in graph.PIPELINE]
+    noop_fast = FastPathExecutor(noops, graph.PIPELINE_INPUTS)
+    noop_graph = graph.create_cartpilot_graph(noops)
+    state = graph.run_cartpilot(goals[0], executor="fast")
+
+    executors = ["fast"] + (["langgraph"] if graph.cartpilot_graph is not None else [])
+    print(f"{'pipeline':>10} {'executor':>10} {'us/request':>11}")
+    results = {}
+    for name in executors:
+        us = timeit(lambda: [graph.run_cartpilot(goal, executor=name) for goal in goals], repeat=repeat) * 1000 / len(goals)
+        results[("agents", name)] = us
+        print(f"{'agents':>10} {name:>10} {us:>11.1f}")
+    results[("no-op", "fast")] = timeit(lambda: noop_fast.run(state), repeat=repeat * 5) * 1000
+    print(f"{'no-op':>10} {'fast':>10} {results[('no-op', 'fast')]:>11.1f}")
+    if noop_graph is not None:
+        results[("no-op", "langgraph")] = timeit(lambda: noop_graph.invoke(state), repeat=repeat * 5) * 1000
+        print(f"{'no-op':>10} {'langgraph':>10} {results[('no-op', 'langgraph')]:>11.1f}")
+        overhead = results[("agents", "langgraph")] - results[("agents", "fast")]
+        print(f"LangGraph adds {overhead:.0f} us/request ({overhead / results[('agents', 'langgraph')]:.0%} of the request)")
+    else:
+        print("LangGraph not installed: fast path only")
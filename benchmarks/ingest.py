@@ -0,0 +1,34 @@
+"""
+Streaming enrichment: rows/s and peak traced memory vs input size.
+"""
+from benchmarks.common import synthetic_products
+
+
+def bench_ingest(sizes=(10_000, 100_000, 500_000)):
+    """Streaming enrichment: rows/s and peak traced memory vs input size."""
+    import os
+    import tempfile
+    import tracemalloc
+    from pathlib import Path
+    from catalog_stream import JSONWriter
+    from upgrade_json import upgrade_catalog
+
+    print(f"{'products':>10} {'input MiB':>10} {'format':>9} {'rows/s':>10} {'peak MiB':>9}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in sizes:
+            source = Path(tmp) / f"raw_{n}.json"
+            writer = JSONWriter(source)
+            for product in synthetic_products(n):
+                product["price"] = 0
+                writer.add("grainger", product)
+            writer.close()
+            size_mib = os.path.getsize(source) / 2**20
+
+            for fmt in ("ndjson", "compiled"):
+                tracemalloc.start()
+                _, rate = upgrade_catalog(
+                    source, Path(tmp) / f"out_{n}.{fmt}", fmt=fmt, progress_every=0, dedupe=False
+                )
+                peak = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+                print(f"{n:>10,} {size_mib:>10.1f} {fmt:>9} {rate:>10,.0f} {peak / 2**20:>9.1f}")
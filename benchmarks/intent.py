@@ -0,0 +1,44 @@
+"""
+Intent matching per goal: if/elif-style substring chain vs compiled single-pass matcher.
+"""
+import random
+
+from benchmarks.common import timeit
+
+
+def bench_intent(sizes=(9, 100, 1_000), goals=2_000):
+    """Intent matching per goal: if/elif-style substring chain vs compiled single-pass matcher."""
+    from matcher import IntentMatcher
+    from rules import get_rules
+
+    rng = random.Random(0)
+    syllables = ["ka", "lo", "mi", "ren", "tus", "ver", "zan", "pol", "dex", "qua", "sho", "fin"]
+    print(f"{'scenarios':>10} {'chain us':>9} {'chain+score us':>15} {'compiled us':>12}")
+    for n in sizes:
+        table = list(get_rules().intent_keywords)
+        while len(table) < n:
+            keywords = ["".join(rng.sample(syllables, 3)) for _ in range(3)]
+            table.append((f"scenario_{len(table)}", keywords))
+        vocab = [k for _, keywords in table for k in keywords] + ["need", "kit", "for", "the", "site", "crew"]
+        texts = [" ".join(rng.choice(vocab) for _ in range(6)) for _ in range(goals)]
+
+        def chain():
+            # Original intent_agent: first scenario with any keyword wins
+            for text in texts:
+                goal = text.lower()
+                next((label for label, keywords in table if any(k in goal for k in keywords)), None)
+
+        def chain_scored():
+            # Chain extended to score every scenario, as the compiled matcher does
+            for text in texts:
+                goal = text.lower()
+                [(label, sum(k in goal for k in keywords)) for label, keywords in table]
+
+        matcher = IntentMatcher(table)
+
+        def compiled():
+            for text in texts:
+                matcher.score(text)
+
+        per_goal = [timeit(fn, repeat=3) * 1000 / goals for fn in (chain, chain_scored, compiled)]
+        print(f"{n:>10,} {per_goal[0]:>9.2f} {per_goal[1]:>15.2f} {per_goal[2]:>12.2f}")
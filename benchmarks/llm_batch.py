@@ -0,0 +1,66 @@
+"""
+Burst of intent prompts against a fake server: one prompt per goal vs micro-batched prompts.
+"""
+import json
+import time
+
+
+def bench_llm_batch(goals=64, base_ms=200.0, per_goal_ms=10.0, window_ms=5.0, max_batch=16, concurrency=2):
+    """Burst of intent prompts against a fake server: one prompt per goal vs micro-batched prompts."""
+    import asyncio
+    import re
+    from ollama_client import FakeOllamaServer, MicroBatcher, OllamaClient
+    from ollama_llm import build_intent_prompt, parse_intent_batch
+
+    scenarios = ["electrical_work", "confined_space", "chemical_environment", "tool_usage"]
+    texts = [f"need gear for {scenarios[i % len(scenarios)].replace('_', ' ')} job {i}" for i in range(goals)]
+    goal_line = re.compile(r"^(\d+)\. (.*)$", re.M)
+
+    def latency(prompt):
+        # Prefill-dominated cost: fixed overhead plus a little per goal in the prompt
+        return (base_ms + per_goal_ms * len(goal_line.findall(prompt))) / 1000
+
+    def respond(prompt):
+        answers = []
+        for number, goal in goal_line.findall(prompt):
+            scenario = next((s for s in scenarios if s.replace("_", " ") in goal), "tool_usage")
+            answers.append({"id": int(number), "scenario": scenario})
+        return json.dumps(answers)
+
+    async def run(batch_size, load, rounds):
+        async with FakeOllamaServer(latency=latency, respond=respond) as server:
+            client = OllamaClient(server.url, max_concurrency=concurrency, timeout=60)
+
+            async def run_batch(items):
+                text = await client.generate(build_intent_prompt(items, scenarios))
+                return parse_intent_batch(text, len(items), scenarios)
+
+            batcher = MicroBatcher(run_batch, window=window_ms / 1000, max_batch=batch_size)
+
+            async def timed(goal):
+                start = time.perf_counter()
+                scenario = await batcher.submit(goal)
+                return (time.perf_counter() - start) * 1000, scenario
+
+            results = []
+            start = time.perf_counter()
+            for _ in range(rounds):
+                results.extend(await asyncio.gather(*(timed(goal) for goal in texts[:load])))
+            elapsed = time.perf_counter() - start
+            await client.aclose()
+            latencies = sorted(ms for ms, _ in results)
+            return [s for _, s in results], len(results) / elapsed, latencies[len(latencies) // 2], server.requests
+
+    print(f"  {'mode':<26} {'goals/s':>8} {'p50 ms':>8} {'requests':>9}")
+    answers = {}
+    for label, batch_size, load, rounds in (
+        ("single goal, unbatched", 1, 1, 10),
+        (f"single goal, {window_ms:g} ms window", max_batch, 1, 10),
+        (f"burst of {goals}, unbatched", 1, goals, 1),
+        (f"burst of {goals}, batched x{max_batch}", max_batch, goals, 1),
+    ):
+        scenarios_out, rate, p50, requests = asyncio.run(run(batch_size, load, rounds))
+        answers[label] = scenarios_out
+        print(f"  {label:<26} {rate:>8.1f} {p50:>8.1f} {requests:>9}")
+    unbatched, batched = list(answers.values())[2:]
+    assert unbatched == batched, "batched answers disagree with per-goal answers"
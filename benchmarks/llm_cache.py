@@ -0,0 +1,46 @@
+"""
+LLM cache on a skewed goal stream: hit rates per tier and lookup cost vs a simulated generation.
+"""
+import random
+import time
+
+
+def bench_llm_cache(requests=5_000, distinct=500, llm_ms=800.0):
+    """LLM cache on a skewed goal stream: hit rates per tier and lookup cost vs a simulated generation."""
+    import tempfile
+    from pathlib import Path
+    from llm_cache import LLMCache
+
+    rng = random.Random(0)
+    topics = ["electrical ppe", "gas detector", "spill kit", "fall harness", "security camera",
+              "thermal camera", "drill set", "fire extinguisher", "hard hats", "lockout kit"]
+    extras = ["for my crew", "for the site", "asap", "urgently", "for night shift", "for warehouse b"]
+    bases = [f"need {rng.choice(topics)} {rng.choice(extras)} {i}" for i in range(distinct)]
+    # Zipf-like popularity plus surface variation (case, punctuation, filler words)
+    weights = [1 / (rank + 1) for rank in range(distinct)]
+    stream = []
+    for base in rng.choices(bases, weights, k=requests):
+        variant = rng.random()
+        if variant < 0.3:
+            base = base.upper() + "!"
+        elif variant < 0.45:
+            base = base.replace("need ", "we need ")
+        stream.append(base)
+
+    for label, similarity in (("exact tier", None), ("exact + similarity 0.8", 0.8)):
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = LLMCache(Path(tmp) / "llm.jsonl", similarity=similarity)
+            start = time.perf_counter()
+            for goal in stream:
+                if cache.get("bench", goal) is None:
+                    cache.put("bench", goal, "{}")
+            lookup_us = (time.perf_counter() - start) / requests * 1e6
+            stats = cache.stats()
+            cache.close()
+            restarted = LLMCache(Path(tmp) / "llm.jsonl")
+            reloaded = len(restarted._entries)
+            restarted.close()
+        misses = stats["misses"]
+        print(f"  {label:<24} hit rate {stats['hit_rate']:.1%} (similar {stats['similar_hits']}), "
+              f"{lookup_us:.1f} us/lookup, simulated LLM time {misses * llm_ms / 1000:,.0f} s "
+              f"vs {requests * llm_ms / 1000:,.0f} s uncached; {reloaded} entries reloaded")
@@ -0,0 +1,34 @@
+"""
+Resident memory of the columnar catalog vs a plain list of product dicts.
+"""
+import json
+import time
+
+from benchmarks.common import synthetic_products
+
+
+def bench_memory(n=200_000):
+    """Resident memory of the columnar catalog vs a plain list of product dicts."""
+    import gc
+    import tracemalloc
+    from catalog import Catalog
+
+    def measure(build):
+        gc.collect()
+        tracemalloc.start()
+        obj = build()
+        size = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        return obj, size
+
+    # Build the rows via JSON so each dict owns its specs/tags like json.load does
+    payload = json.dumps(synthetic_products(n))
+    dicts, dict_bytes = measure(lambda: json.loads(payload))
+    catalog, col_bytes = measure(lambda: Catalog(json.loads(payload), components=[]))
+    print(f"{n:,} products")
+    print(f"  list of dicts: {dict_bytes / 2**20:8.1f} MiB")
+    print(f"  columnar:      {col_bytes / 2**20:8.1f} MiB  ({dict_bytes / col_bytes:.1f}x smaller)")
+
+    start = time.perf_counter()
+    rows = catalog.filter(category="tools", max_price=100.0)
+    print(f"  vectorized filter: {(time.perf_counter() - start) * 1000:.2f} ms ({len(rows):,} rows)")
@@ -0,0 +1,39 @@
+"""
+Nightly refresh: full re-crawl vs incremental rebuild with some keywords stale.
+"""
+import time
+
+
+def bench_rebuild(keywords=200, stale=0.1, latency=0.05, rate=20.0):
+    """Nightly refresh: full re-crawl vs incremental rebuild with 10% of keywords stale."""
+    import asyncio
+    import tempfile
+    from crawl_cache import ResponseCache, merge_products
+    from scraper import Crawler, FakeSearchServer, SerpApiTransport
+
+    words = [f"keyword {i}" for i in range(keywords)]
+
+    async def crawl(cache):
+        async with FakeSearchServer(latency=latency) as server:
+            transport = SerpApiTransport(server.url)
+            products = await Crawler(transport, rate=rate, concurrency=16, cache=cache).crawl(words)
+            await transport.aclose()
+            return products, server.requests
+
+    with tempfile.TemporaryDirectory() as tmp:
+        start = time.perf_counter()
+        cache = ResponseCache(tmp)
+        existing, requests = asyncio.run(crawl(cache))
+        full = time.perf_counter() - start
+        cache.close()
+        print(f"  {'full crawl':<28} {full:>7.2f} s  {requests} requests")
+
+        # Expire a fraction of keywords as if their TTL had run out
+        cache = ResponseCache(tmp, ttls={w: 0 for w in words[: int(keywords * stale)]})
+        start = time.perf_counter()
+        fresh, requests = asyncio.run(crawl(cache))
+        merged, stats = merge_products(existing, fresh)
+        incremental = time.perf_counter() - start
+        cache.close()
+        print(f"  {'incremental rebuild':<28} {incremental:>7.2f} s  {requests} requests, {stats}")
+        print(f"  speedup: {full / incremental:.1f}x")
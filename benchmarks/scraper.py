@@ -0,0 +1,43 @@
+"""
+Crawl wall time: original sequential loop vs concurrent rate-limited crawler.
+"""
+import time
+
+
+def bench_scraper(keywords=40, latency=0.2, rate=10.0, concurrency=8, failure_rate=0.1):
+    """Crawl wall time: original sequential loop vs concurrent rate-limited crawler (local fake server)."""
+    import asyncio
+    from scraper import Crawler, FakeSearchServer, SerpApiTransport
+
+    words = [f"keyword {i}" for i in range(keywords)]
+
+    async def sequential():
+        # Original build_catalog: one request at a time plus a 1 s sleep
+        async with FakeSearchServer(latency=latency) as server:
+            transport = SerpApiTransport(server.url)
+            crawler = Crawler(transport, rate=1e9, concurrency=1, retries=0)
+            products = []
+            for word in words:
+                products.extend(await crawler.search_products(word))
+                await asyncio.sleep(1)
+            await transport.aclose()
+            return products, server.requests
+
+    async def concurrent():
+        async with FakeSearchServer(latency=latency, failure_rate=failure_rate) as server:
+            transport = SerpApiTransport(server.url)
+            crawler = Crawler(transport, rate=rate, concurrency=concurrency, backoff=0.1)
+            products = await crawler.crawl(words)
+            await transport.aclose()
+            return products, server.requests
+
+    results = {}
+    for label, fn in (("sequential + sleep(1)", sequential), (f"concurrent, {rate:g} req/s", concurrent)):
+        start = time.perf_counter()
+        products, requests = asyncio.run(fn())
+        elapsed = time.perf_counter() - start
+        results[label] = products
+        print(f"  {label:<28} {elapsed:>7.2f} s  {len(products)} products, {requests} requests")
+    baseline, crawled = results.values()
+    assert baseline == crawled, "concurrent crawl disagrees with sequential"
+    print(f"  rate-limit floor: {max(keywords - rate, 0) / rate:.2f} s after the initial burst of {rate:g}")
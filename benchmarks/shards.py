@@ -0,0 +1,36 @@
+"""
+Fan-out selection wall time vs number of vendor shards.
+"""
+from benchmarks.common import synthetic_products, timeit
+
+
+def bench_shards(vendors=(1, 2, 4, 8), n=100_000):
+    """Fan-out selection wall time vs number of vendor shards (in-memory inline, SQLite uncached in the pool)."""
+    import tempfile
+    from pathlib import Path
+    from catalog import Catalog, ShardedCatalog, fan_out
+    from catalog_sqlite import SQLiteCatalog, build_sqlite_catalog
+
+    components = ["digital-multimeters", "clamp-meters", "safety-goggles", "power-drills", "locks", "respirators"]
+    print(f"{n:,} products per vendor, {len(components)} components")
+    print(f"{'backend':>8} {'vendors':>8} {'wall ms':>9} {'sum of shards ms':>17}")
+    with tempfile.TemporaryDirectory() as tmp:
+        backends = {"memory": {}, "sqlite": {}}
+        for v in range(max(vendors)):
+            vendor = f"vendor{v}"
+            path = Path(tmp) / f"{vendor}.db"
+            build_sqlite_catalog(synthetic_products(n, seed=v), path, vendor=vendor)
+            backends["sqlite"][vendor] = SQLiteCatalog(path, cache_size=0)
+            backends["memory"][vendor] = Catalog(synthetic_products(n, seed=v), vendor=vendor)
+
+        for backend, shards in backends.items():
+            for count in vendors:
+                catalog = ShardedCatalog(dict(list(shards.items())[:count]))
+                fan_out(catalog, components)  # warm pool and page cache
+                timings = {}
+
+                def run():
+                    timings.update(fan_out(catalog, components)[1])
+
+                wall_ms = timeit(run, repeat=10)
+                print(f"{backend:>8} {count:>8} {wall_ms:>9.2f} {sum(timings.values()):>17.2f}")
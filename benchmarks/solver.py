@@ -0,0 +1,30 @@
+"""
+Constrained cart solver: nodes, time, and cart total vs time limit, on random tag sets.
+"""
+import random
+
+
+def bench_solver(shapes=((5, 16), (10, 32), (25, 64)), tags=40, required=6, conflicts=20, time_limits=(0.05, 1.0)):
+    """Constrained cart solver: nodes, time, and cart total vs time limit, on random tag sets."""
+    from rules import TagConflictIndex
+    from solver import solve
+
+    rng = random.Random(0)
+    names = [f"tag-{i}" for i in range(tags)]
+    index = TagConflictIndex(tuple(rng.sample(names, 2)) for _ in range(conflicts))
+    print(f"{'components':>11} {'cands':>6} {'limit ms':>9} {'nodes':>8} {'ms':>8} {'total':>9} {'optimal':>8}")
+    for components, per in shapes:
+        candidates = {
+            f"component-{c}": [
+                {"id": f"{c}-{i}", "price": round(rng.uniform(5, 500), 2), "compatibility_tags": rng.sample(names, 3)}
+                for i in range(per)
+            ]
+            for c in range(components)
+        }
+        for limit in time_limits:
+            result = solve(candidates, required_tags=names[:required], tag_conflicts=index, time_limit=limit)
+            total = f"{result['total']:.2f}" if result["feasible"] else "-"
+            print(
+                f"{components:>11} {per:>6} {limit * 1000:>9.0f} {result['nodes']:>8,} "
+                f"{result['elapsed_ms']:>8.1f} {total:>9} {str(result['optimal']):>8}"
+            )
@@ -0,0 +1,142 @@
+"""
+Bulk cart validation for audits.
+
+Re-checks many stored component sets against one rule set at once. The
+rule set is compiled into two component × component matrices:
+
+- requires[c, d]: d is in c's transitive dependency closure
+- conflicts[a, b]: check_compatibility(a, b) is False
+
+A batch of carts becomes one cart × component presence matrix X. Missing
+dependencies are (X @ requires > 0) & ~X, and carts with an incompatible
+pair are those where X & (X @ conflicts > 0) is set anywhere; only those
+carts are expanded into candidate pairs, grouped by cart length. Matrices
+are compiled once per rules version.
+"""
+import weakref
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from rules import RuleSet, get_rules
+
+# Carts encoded per block; the presence matrix is also capped at BLOCK_CELLS entries
+BLOCK = 8192
+BLOCK_CELLS = 1 << 22
+
+
+class RuleMatrices:
+    """
+    A rule set compiled for batch validation. components lists every
+    component the rules mention in dependency order (dependencies before
+    the components needing them); missing dependencies are reported in
+    that order. Components the rules never mention have no dependencies or
+    conflicts and are ignored.
+    """
+
+    def __init__(self, rules: RuleSet):
+        self.version = rules.version
+        names = dict.fromkeys(rules.dependencies.order)
+        names.update(dict.fromkeys(rules.components()))
+        names.update(dict.fromkeys(rules.compatibility.bit))
+        self.components: List[str] = list(names)
+        self.index: Dict[str, int] = {name: i for i, name in enumerate(self.components)}
+        n = len(self.components)
+
+        self.requires = np.zeros((n, n), dtype=np.float32)
+        for component in rules.dependency_rules:
+            for dep in rules.dependencies.closure(component):
+                self.requires[self.index[component], self.index[dep]] = 1.0
+
+        self.conflicts = np.zeros((n, n), dtype=np.float32)
+        for component, mask in rules.compatibility.conflicts.items():
+            for other, bit in rules.compatibility.bit.items():
+                if mask & bit:
+                    self.conflicts[self.index[component], self.index[other]] = 1.0
+
+    def encode(self, carts: Sequence[Sequence[str]]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Presence matrix for carts, plus the flattened (cart row, component
+        column) of every known component, in cart order.
+        """
+        lengths = np.fromiter(map(len, carts), dtype=np.int64, count=len(carts))
+        column = self.index.get
+        flat = np.array([column(c, -1) for cart in carts for c in cart], dtype=np.int64)
+        rows = np.repeat(np.arange(len(carts)), lengths)
+        known = flat >= 0
+        rows, flat = rows[known], flat[known]
+        present = np.zeros((len(carts), len(self.components)), dtype=np.float32)
+        present[rows, flat] = 1.0
+        return present, rows, flat
+
+    def _pairs(self, rows: np.ndarray, cols: np.ndarray, carts: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Flat positions (first, second) of every conflicting pair within the
+        given carts, first earlier in its cart, ordered by cart then position.
+        """
+        starts = np.searchsorted(rows, carts)
+        lengths = np.searchsorted(rows, carts, side="right") - starts
+        firsts, seconds = [], []
+        for length in np.unique(lengths).tolist():
+            i, j = np.triu_indices(length, 1)
+            base = starts[lengths == length][:, None]
+            firsts.append((base + i).ravel())
+            seconds.append((base + j).ravel())
+        first, second = np.concatenate(firsts), np.concatenate(seconds)
+        hit = self.conflicts[cols[first], cols[second]] > 0
+        first, second = first[hit], second[hit]
+        order = np.lexsort((second, first))
+        return first[order], second[order]
+
+    def validate(self, carts: Sequence[Sequence[str]]) -> List[Dict[str, Any]]:
+        """
+        One result per cart, in order: {"missing_dependencies": [...],
+        "compatibility_issues": [(a, b, issue), ...]}, the same findings as
+        rules.validate_component_set.
+        """
+        results: List[Dict[str, Any]] = []
+        names = np.array(self.components, dtype=object)
+        block_size = max(1, min(BLOCK, BLOCK_CELLS // max(len(self.components), 1)))
+        for start in range(0, len(carts), block_size):
+            block = carts[start:start + block_size]
+            present, rows, cols = self.encode(block)
+            held = present > 0
+            cart_rows = np.arange(len(block) + 1)
+
+            missing_rows, missing_cols = np.nonzero(((present @ self.requires) > 0) & ~held)
+            missing_bounds = np.searchsorted(missing_rows, cart_rows).tolist()
+            missing = names[missing_cols].tolist()
+
+            issues: List[Tuple[str, str, str]] = []
+            issue_bounds = [0] * len(cart_rows)
+            clashing = np.flatnonzero((held & ((present @ self.conflicts) > 0)).any(axis=1))
+            if len(clashing):
+                first, second = self._pairs(rows, cols, clashing)
+                issue_bounds = np.searchsorted(rows[first], cart_rows).tolist()
+                issues = [
+                    (a, b, "Incompatible components")
+                    for a, b in zip(names[cols[first]].tolist(), names[cols[second]].tolist())
+                ]
+
+            results.extend(
+                {"missing_dependencies": missing[m0:m1], "compatibility_issues": issues[i0:i1]}
+                for m0, m1, i0, i1 in zip(missing_bounds, missing_bounds[1:], issue_bounds, issue_bounds[1:])
+            )
+        return results
+
+
+_matrices: "weakref.WeakKeyDictionary[RuleSet, RuleMatrices]" = weakref.WeakKeyDictionary()
+
+
+def get_rule_matrices(rules: Optional[RuleSet] = None) -> RuleMatrices:
+    """The compiled matrices for rules (default: the current rule set), built on first use."""
+    rules = rules or get_rules()
+    matrices = _matrices.get(rules)
+    if matrices is None:
+        matrices = _matrices[rules] = RuleMatrices(rules)
+    return matrices
+
+
+def validate_carts(carts: Sequence[Sequence[str]], rules: Optional[RuleSet] = None) -> List[Dict[str, Any]]:
+    """Validate many component sets at once; see RuleMatrices.validate."""
+    return get_rule_matrices(rules).validate(carts)
@@ -0,0 +1,790 @@
+"""
+Resident product catalog for CartPilot.
+Loads catalog.json once per process and keeps a component -> products index
+so product selection never re-reads or re-scans the catalog per request.
+
+Each loaded catalog is an immutable, versioned snapshot. A CatalogWatcher can
+rebuild the snapshot in the background when catalog.json changes and swap it
+in atomically; requests pin the snapshot they started with.
+
+Every vendor under catalog["products"] is its own shard; product selection
+fans out to all shards (I/O-bound ones concurrently) and merges the offers.
+"""
+
+import base64
+import binascii
+import hashlib
+import heapq
+import json
+import mmap
+import os
+import re
+import struct
+import threading
+import sys
+import time
+import weakref
+from collections import OrderedDict
+from collections.abc import Sequence
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from pathlib import Path
+from types import MappingProxyType
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from rules import get_rules
+from matcher import ComponentMatcher
+
+# JSON, compiled (catalog_compiler.py) or SQLite (catalog_sqlite.py) catalog
+# files, separated by os.pathsep; vendors from all files become shards
+CATALOG_PATHS = [
+    Path(p) for p in os.environ.get("CARTPILOT_CATALOG", str(Path(__file__).parent / "catalog.json")).split(os.pathsep)
+]
+DEFAULT_VENDOR = "grainger"
+
+# Alternatives kept per component, and the numeric field ranking them
+# ("-field" for descending); further alternatives are paged by cursor
+ALTERNATIVES_K = int(os.environ.get("CARTPILOT_ALTERNATIVES_K", "5"))
+ALTERNATIVES_RANK = os.environ.get("CARTPILOT_ALTERNATIVES_RANK", "price")
+
+# Numeric product fields alternatives may be ranked by (comma-separated)
+RANK_FIELDS = frozenset(
+    field.strip() for field in os.environ.get("CARTPILOT_RANK_FIELDS", "price").split(",") if field.strip()
+)
+
+# Lookups of components outside the prebuilt index, kept per catalog (LRU)
+SCAN_CACHE_SIZE = 1024
+
+# Product fields stored as columns; anything else is kept per row as-is
+_COLUMNS = frozenset(("id", "name", "price", "category", "specs", "compatibility_tags"))
+
+
+def default_components() -> List[str]:
+    """Component keys known to the planner and rules engine (pre-indexed at load)."""
+    return get_rules().components()
+
+
+def check_rank(rank: str) -> str:
+    """Return rank ("field" or "-field") if field is in RANK_FIELDS; raise ValueError otherwise."""
+    if rank.removeprefix("-") not in RANK_FIELDS:
+        raise ValueError(f"cannot rank by {rank!r}; rankable fields: {', '.join(sorted(RANK_FIELDS))}")
+    return rank
+
+
+check_rank(ALTERNATIVES_RANK)
+
+
+def _number(value: Any) -> float:
+    """Numeric ranking value; missing or non-numeric values rank last."""
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+    return np.inf
+
+
+class ProductView(Sequence):
+    """
+    Lazy, read-only sequence of catalog products at the given row positions.
+
+    Product dicts are only materialized when an item is accessed, so carrying
+    a view of thousands of matches costs one integer array, not thousands of
+    dicts. Slicing returns another view.
+    """
+
+    __slots__ = ("_catalog", "_rows")
+
+    def __init__(self, catalog: "Catalog", rows: np.ndarray):
+        self._catalog = catalog
+        self._rows = rows
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return ProductView(self._catalog, self._rows[i])
+        return self._catalog.product(int(self._rows[i]))
+
+    def __repr__(self) -> str:
+        return f"<ProductView {len(self)} products>"
+
+    @property
+    def rows(self) -> np.ndarray:
+        return self._rows
+
+    def values(self, field: str) -> np.ndarray:
+        """Numeric field of every product in the view (missing or non-numeric -> +inf)."""
+        column = self._catalog.column(field, self._rows)
+        if column is None:
+            column = np.fromiter(
+                (_number(product.get(field)) for product in self), dtype=np.float64, count=len(self)
+            )
+        return np.where(np.isnan(column), np.inf, column)
+
+
+class Catalog:
+    """
+    Columnar in-memory catalog with a prebuilt component -> rows index.
+
+    Products are stored column-wise: interned id/name strings, a float price
+    array, integer category codes and a code into a table of shared
+    (specs, compatibility_tags) flyweights. Product dicts are built on demand
+    only for the rows a caller actually reads.
+
+    A component matches a product when the component key is a substring of
+    the lowercased product id (same rule the selection agent always used).
+    Known components are indexed in a single matcher pass over all ids;
+    components not indexed up front are scanned on demand, and the most
+    recently used SCAN_CACHE_SIZE of those results are kept.
+    """
+
+    # Lookups are pure Python/NumPy work under the GIL; fan_out runs them inline
+    io_bound = False
+
+    def __init__(
+        self,
+        products: Iterable[Dict[str, Any]],
+        components: Optional[Iterable[str]] = None,
+        vendor: str = DEFAULT_VENDOR,
+        version: str = "inline",
+    ):
+        self.vendor = vendor
+        self.version = version
+
+        self.ids: List[str] = []
+        self.names: List[str] = []
+        prices: List[float] = []
+        category_codes: List[int] = []
+        profile_codes: List[int] = []
+
+        self.categories: List[str] = []
+        category_lookup: Dict[str, int] = {}
+        # Flyweights: one read-only (specs, tags) pair per distinct combination
+        self.profiles: List[Tuple[MappingProxyType, Tuple[str, ...]]] = []
+        profile_lookup: Dict[Tuple, int] = {}
+        # Fields outside the standard schema, kept sparsely by row
+        self._extras: Dict[int, Dict[str, Any]] = {}
+
+        for row, p in enumerate(products):
+            self.ids.append(sys.intern(p["id"]))
+            self.names.append(sys.intern(p.get("name", "")))
+            prices.append(p.get("price", 0.0))
+
+            category = p.get("category", "")
+            code = category_lookup.get(category)
+            if code is None:
+                code = category_lookup[category] = len(self.categories)
+                self.categories.append(sys.intern(category))
+            category_codes.append(code)
+
+            specs = p.get("specs") or {}
+            tags = tuple(p.get("compatibility_tags") or ())
+            try:
+                key = (tuple(sorted(specs.items())), tags)
+                hash(key)
+            except TypeError:  # nested spec values
+                key = (json.dumps(specs, sort_keys=True), tags)
+            code = profile_lookup.get(key)
+            if code is None:
+                code = profile_lookup[key] = len(self.profiles)
+                self.profiles.append((
+                    MappingProxyType({sys.intern(k): v for k, v in specs.items()}),
+                    tuple(sys.intern(t) for t in tags),
+                ))
+            profile_codes.append(code)
+
+            if not _COLUMNS.issuperset(p):
+                self._extras[row] = {k: v for k, v in p.items() if k not in _COLUMNS}
+
+        self.prices = np.asarray(prices, dtype=np.float64)
+        self.category_codes = np.asarray(category_codes, dtype=np.int32)
+        self.profile_codes = np.asarray(profile_codes, dtype=np.int32)
+        self._category_lookup = category_lookup
+
+        self._index: Dict[str, np.ndarray] = {}
+        self._lock = threading.Lock()
+        self._scanned: "OrderedDict[str, np.ndarray]" = OrderedDict()
+
+        matcher = ComponentMatcher(components if components is not None else default_components())
+        for component, rows in matcher.index([pid.lower() for pid in self.ids]).items():
+            self._index[component] = np.asarray(rows, dtype=np.int64)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any], vendor: str = DEFAULT_VENDOR, **kwargs) -> "Catalog":
+        return cls(data["products"][vendor], vendor=vendor, **kwargs)
+
+    @classmethod
+    def from_file(cls, path: Path, vendor: str = DEFAULT_VENDOR, **kwargs) -> "Catalog":
+        with open(path, "rb") as f:
+            raw = f.read()
+        data = json.loads(raw)
+        kwargs.setdefault("version", hashlib.sha256(raw).hexdigest()[:12])
+        return cls.from_dict(data, vendor=vendor, **kwargs)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @property
+    def shards(self) -> Dict[str, "Catalog"]:
+        return {self.vendor: self}
+
+    @property
+    def products(self) -> ProductView:
+        """All products, in catalog order."""
+        return ProductView(self, np.arange(len(self)))
+
+    def product(self, row: int) -> Dict[str, Any]:
+        """Materialize the product dict stored at a row."""
+        specs, tags = self.profiles[self.profile_codes[row]]
+        product = {
+            "id": self.ids[row],
+            "name": self.names[row],
+            "price": float(self.prices[row]),
+            "category": self.categories[self.category_codes[row]],
+            "specs": dict(specs),
+            "compatibility_tags": list(tags),
+        }
+        extra = self._extras.get(row)
+        if extra:
+            product.update(extra)
+        return product
+
+    def column(self, field: str, rows: np.ndarray) -> Optional[np.ndarray]:
+        """Values of a columnar numeric field at rows, or None if not a column."""
+        return self.prices[rows] if field == "price" else None
+
+    def _scan(self, key: str) -> np.ndarray:
+        return np.asarray([i for i, pid in enumerate(self.ids) if key in pid.lower()], dtype=np.int64)
+
+    def rows(self, component: str) -> np.ndarray:
+        """Row positions of all products matching a component, ascending."""
+        key = component.lower()
+        rows = self._index.get(key)
+        if rows is not None:
+            return rows
+        with self._lock:
+            rows = self._scanned.get(key)
+            if rows is not None:
+                self._scanned.move_to_end(key)
+                return rows
+        rows = self._scan(key)
+        with self._lock:
+            self._scanned[key] = rows
+            if len(self._scanned) > SCAN_CACHE_SIZE:
+                self._scanned.popitem(last=False)
+        return rows
+
+    def find(self, component: str) -> ProductView:
+        """Return all products matching a component, in catalog order."""
+        return ProductView(self, self.rows(component))
+
+    def filter(
+        self,
+        rows: Optional[np.ndarray] = None,
+        category: Optional[str] = None,
+        min_price: Optional[float] = None,
+        max_price: Optional[float] = None,
+    ) -> np.ndarray:
+        """Vectorized category / price filter over rows (default: all rows)."""
+        rows = np.arange(len(self)) if rows is None else rows
+        mask = np.ones(len(rows), dtype=bool)
+        if category is not None:
+            code = self._category_lookup.get(category)
+            if code is None:
+                return rows[:0]
+            mask &= self.category_codes[rows] == code
+        if min_price is not None:
+            mask &= self.prices[rows] >= min_price
+        if max_price is not None:
+            mask &= self.prices[rows] <= max_price
+        return rows[mask]
+
+
+# ---------------------------------------------------
+# Compiled (binary, memory-mapped) catalogs
+# ---------------------------------------------------
+#
+# Layout, all little-endian, sections 8-byte aligned:
+#   header    COMPILED_HEADER: magic, product count, then (offset, length)
+#             of each section below
+#   records   COMPILED_RECORD x N: string offsets/lengths, price, codes
+#   strings   UTF-8 string table holding ids and names
+#   ids       lowercased ids joined by newlines (substring scans)
+#   starts    uint64 x N: offset of each row in the ids section
+#   index     int64 row positions, one run per indexed component
+#   meta      JSON: vendor, version, categories, profiles, extras, index runs
+
+COMPILED_MAGIC = b"CPCAT\x00\x01\x00"
+COMPILED_HEADER = struct.Struct("<8sQ" + "QQ" * 6)
+COMPILED_RECORD = np.dtype([
+    ("id_off", "<u8"),
+    ("name_off", "<u8"),
+    ("id_len", "<u4"),
+    ("name_len", "<u4"),
+    ("price", "<f8"),
+    ("category", "<i4"),
+    ("profile", "<i4"),
+])
+
+
+class _StringColumn(Sequence):
+    """Read-only column of strings decoded on access from a mapped string table."""
+
+    __slots__ = ("_buf", "_offsets", "_lengths")
+
+    def __init__(self, buf, offsets: np.ndarray, lengths: np.ndarray):
+        self._buf = buf
+        self._offsets = offsets
+        self._lengths = lengths
+
+    def __len__(self) -> int:
+        return len(self._offsets)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        start = int(self._offsets[i])
+        return str(self._buf[start:start + int(self._lengths[i])], "utf-8")
+
+
+class CompiledCatalog(Catalog):
+    """
+    Catalog backed by a memory-mapped file written by catalog_compiler.
+
+    Numeric columns and component index runs are NumPy views straight into
+    the mapping, so opening the file costs the same at any catalog size and
+    workers mapping the same file share one copy in the page cache.
+    """
+
+    # Unindexed lookups fault pages in from disk
+    io_bound = True
+
+    def __init__(self, path: Path):
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        mm = self._mm
+
+        magic, count, *fields = COMPILED_HEADER.unpack_from(mm, 0)
+        if magic != COMPILED_MAGIC:
+            raise ValueError(f"{path} is not a compiled catalog")
+        sections = list(zip(fields[0::2], fields[1::2]))
+        (rec_off, _), (str_off, str_len), (ids_off, ids_len) = sections[:3]
+        (starts_off, _), (idx_off, _), (meta_off, meta_len) = sections[3:]
+        meta = json.loads(mm[meta_off:meta_off + meta_len])
+
+        self.vendor = meta["vendor"]
+        self.version = meta["version"]
+        self.categories = meta["categories"]
+        self._category_lookup = {c: i for i, c in enumerate(self.categories)}
+        self.profiles = [(MappingProxyType(specs), tuple(tags)) for specs, tags in meta["profiles"]]
+        self._extras = {int(row): extra for row, extra in meta["extras"].items()}
+
+        records = np.frombuffer(mm, dtype=COMPILED_RECORD, count=count, offset=rec_off)
+        strings = memoryview(mm)[str_off:str_off + str_len]
+        self.ids = _StringColumn(strings, records["id_off"], records["id_len"])
+        self.names = _StringColumn(strings, records["name_off"], records["name_len"])
+        self.prices = records["price"]
+        self.category_codes = records["category"]
+        self.profile_codes = records["profile"]
+
+        self._id_text = (ids_off, ids_len)
+        self._id_starts = np.frombuffer(mm, dtype="<u8", count=count, offset=starts_off)
+        self._index = {
+            component: np.frombuffer(mm, dtype="<i8", count=n, offset=idx_off + 8 * start)
+            for component, (start, n) in meta["index"].items()
+        }
+        self._lock = threading.Lock()
+        self._scanned: "OrderedDict[str, np.ndarray]" = OrderedDict()
+
+    def _scan(self, key: str) -> np.ndarray:
+        # Find every occurrence in the mapped lowercase id text, then map
+        # byte offsets back to rows; nothing is decoded or copied.
+        needle = key.encode("utf-8")
+        start, length = self._id_text
+        end = start + length
+        rows = []
+        pos = self._mm.find(needle, start, end)
+        while pos != -1:
+            row = int(np.searchsorted(self._id_starts, pos - start, side="right")) - 1
+            if not rows or rows[-1] != row:
+                rows.append(row)
+            pos = self._mm.find(needle, pos + 1, end)
+        return np.asarray(rows, dtype=np.int64)
+
+
+def _load_file(path: Path) -> List[Catalog]:
+    """Load one catalog file as a list of vendor shards."""
+    with open(path, "rb") as f:
+        magic = f.read(16)
+    if magic.startswith(COMPILED_MAGIC):
+        return [CompiledCatalog(path)]
+    if magic == b"SQLite format 3\x00":
+        from catalog_sqlite import SQLiteCatalog  # deferred: imports this module
+
+        return [SQLiteCatalog(path)]
+    if Path(path).suffix in (".ndjson", ".jsonl"):
+        from catalog_stream import iter_products  # deferred: imports this module
+
+        by_vendor: Dict[str, List[Dict[str, Any]]] = {}
+        for vendor, product in iter_products(path):
+            by_vendor.setdefault(vendor, []).append(product)
+        hasher = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                hasher.update(chunk)
+        version = hasher.hexdigest()[:12]
+        return [Catalog(products, vendor=vendor, version=version) for vendor, products in by_vendor.items()]
+
+    with open(path, "rb") as f:
+        raw = f.read()
+    data = json.loads(raw)
+    version = hashlib.sha256(raw).hexdigest()[:12]
+    return [Catalog.from_dict(data, vendor=vendor, version=version) for vendor in data["products"]]
+
+
+def load_catalog(*paths: Path) -> Catalog:
+    """
+    Load catalog files, choosing the backend per file by its magic bytes:
+    compiled binary, SQLite database (catalog_sqlite), NDJSON (by suffix)
+    or JSON. Several vendors are returned as a ShardedCatalog.
+    """
+    shards: Dict[str, Catalog] = {}
+    for path in paths or CATALOG_PATHS:
+        for shard in _load_file(path):
+            if shard.vendor in shards:
+                raise ValueError(f"vendor {shard.vendor!r} appears in more than one catalog file")
+            shards[shard.vendor] = shard
+    if len(shards) == 1:
+        return next(iter(shards.values()))
+    return ShardedCatalog(shards)
+
+
+# ---------------------------------------------------
+# Vendor shards
+# ---------------------------------------------------
+
+class ShardedCatalog:
+    """Catalog made of one shard per vendor, each with any backend."""
+
+    def __init__(self, shards: Dict[str, Catalog]):
+        self.shards = dict(shards)
+        versions = "|".join(f"{vendor}={shard.version}" for vendor, shard in sorted(self.shards.items()))
+        self.version = hashlib.sha256(versions.encode("utf-8")).hexdigest()[:12]
+
+    def __len__(self) -> int:
+        return sum(len(shard) for shard in self.shards.values())
+
+
+_fanout_pool: Optional[ThreadPoolExecutor] = None
+_fanout_lock = threading.Lock()
+
+
+def _fanout_executor() -> ThreadPoolExecutor:
+    global _fanout_pool
+    if _fanout_pool is None:
+        with _fanout_lock:
+            if _fanout_pool is None:
+                _fanout_pool = ThreadPoolExecutor(max_workers=16, thread_name_prefix="catalog-shard")
+    return _fanout_pool
+
+
+def _lookup_shard(shard: Catalog, components: List[str]) -> Tuple[Dict[str, ProductView], float]:
+    start = time.perf_counter()
+    found = {component: shard.find(component) for component in components}
+    return found, (time.perf_counter() - start) * 1000
+
+
+def fan_out(
+    catalog: Catalog, components: List[str]
+) -> Tuple[Dict[str, Dict[str, ProductView]], Dict[str, float]]:
+    """
+    Look up components in every vendor shard.
+
+    In-memory shards are GIL-bound, so they are queried inline; only shards
+    whose lookups wait on I/O (io_bound: SQLite, memory-mapped files) go to
+    the thread pool, and they run while the inline shards are queried.
+
+    Returns (vendor -> component -> matches, vendor -> lookup ms).
+    """
+    shards = catalog.shards
+    pooled = [vendor for vendor, shard in shards.items() if getattr(shard, "io_bound", False)]
+    futures = {}
+    if len(shards) > 1:
+        futures = {vendor: _fanout_executor().submit(_lookup_shard, shards[vendor], components) for vendor in pooled}
+    results, timings = {}, {}
+    for vendor, shard in shards.items():
+        if vendor not in futures:
+            results[vendor], timings[vendor] = _lookup_shard(shard, components)
+    for vendor, future in futures.items():
+        results[vendor], timings[vendor] = future.result()
+    return {vendor: results[vendor] for vendor in shards}, {vendor: timings[vendor] for vendor in shards}
+
+
+def equivalence_key(product: Dict[str, Any]) -> str:
+    """Key under which offers from different vendors count as the same item."""
+    return product.get("mpn") or re.sub(r"[^a-z0-9]+", " ", product.get("name", "").lower()).strip()
+
+
+def _select(
+    offers: List[Tuple[str, ProductView]],
+    selected: Optional[Tuple[str, int]] = None,
+) -> Tuple[Tuple[str, int], Dict[str, Any]]:
+    """
+    Each vendor proposes its first match; the cheapest proposal wins.
+    Returns ((vendor, position), product). selected instead names the
+    (vendor, position) of the product in the cart, e.g. a solver's pick.
+    """
+    if selected is not None:
+        vendor, position = selected
+        views = dict(offers)
+        if vendor not in views or not 0 <= position < len(views[vendor]):
+            raise ValueError(f"no {vendor!r} offer at position {position}")
+        return (vendor, position), dict(views[vendor][position], vendor=vendor)
+    proposals = [((vendor, 0), dict(matches[0], vendor=vendor)) for vendor, matches in offers]
+    return min(proposals, key=lambda proposal: proposal[1].get("price", 0.0))
+
+
+def _ranked(matches: ProductView, values: np.ndarray, vendor: str, chunk: int) -> Iterator[Tuple[float, str, int]]:
+    """
+    Yield (value, vendor, position) for matches in ascending (value, position)
+    order. Each round partitions out the next, doubling, chunk of smallest
+    values, so taking the first k costs O(n) rather than a full sort.
+    """
+    remaining = np.arange(len(values))
+    while len(remaining):
+        if len(remaining) > chunk:
+            kth = np.partition(values[remaining], chunk - 1)[chunk - 1]
+            below = values[remaining] <= kth
+            batch, remaining = remaining[below], remaining[~below]
+        else:
+            batch, remaining = remaining, remaining[:0]
+        batch = batch[np.argsort(values[batch], kind="stable")]
+        for value, position in zip(values[batch].tolist(), batch.tolist()):
+            yield value, vendor, position
+        chunk *= 2
+
+
+def ranked_offers(
+    offers: List[Tuple[str, ProductView]],
+    rank: str = ALTERNATIVES_RANK,
+    chunk: int = 16,
+    selected: Optional[Tuple[str, int]] = None,
+) -> Iterator[Tuple[Tuple[str, int], Dict[str, Any]]]:
+    """
+    Alternatives to the selected offer, best ranked first, each with its
+    (vendor, position) in the vendor's matches.
+
+    rank names a numeric product field, ascending, or descending with a
+    leading "-". Vendor streams are merged through a heap; with several
+    vendors, equivalent items appear once at their best-ranked offer.
+    selected is the product in the cart (default: see _select); it and its
+    equivalents are never listed.
+    """
+    field, sign = (rank[1:], -1.0) if rank.startswith("-") else (rank, 1.0)
+    selected, chosen = _select(offers, selected)
+    views = dict(offers)
+    streams = [_ranked(matches, matches.values(field) * sign, vendor, chunk) for vendor, matches in offers]
+
+    dedupe = len(offers) > 1
+    seen = {equivalence_key(chosen)}
+    for _, vendor, position in heapq.merge(*streams):
+        if (vendor, position) == selected:
+            continue
+        product = dict(views[vendor][position], vendor=vendor)
+        if dedupe:
+            key = equivalence_key(product)
+            if key in seen:
+                continue
+            seen.add(key)
+        yield (vendor, position), product
+
+
+def ranked_alternatives(
+    offers: List[Tuple[str, ProductView]],
+    rank: str = ALTERNATIVES_RANK,
+    chunk: int = 16,
+    selected: Optional[Tuple[str, int]] = None,
+) -> Iterator[Dict[str, Any]]:
+    """The products of ranked_offers."""
+    return (product for _, product in ranked_offers(offers, rank, chunk, selected))
+
+
+def merge_offers(
+    offers: List[Tuple[str, ProductView]],
+    k: int = ALTERNATIVES_K,
+    rank: str = ALTERNATIVES_RANK,
+    selected: Optional[Tuple[str, int]] = None,
+) -> Tuple[Dict[str, Any], List[Dict[str, Any]], bool]:
+    """
+    Merge one component's matches from several vendors.
+
+    Returns (selected product, top-k alternatives, whether more exist). The
+    cheapest vendor's first match is selected unless selected names another
+    (vendor, position); alternatives are bounded by k and ranked by `rank`
+    (see ranked_offers).
+    """
+    _, product = _select(offers, selected)
+    alternatives = list(islice(ranked_alternatives(offers, rank, selected=selected), k + 1))
+    return product, alternatives[:k], len(alternatives) > k
+
+
+def alternatives_page(
+    catalog: Catalog,
+    component: str,
+    offset: int,
+    limit: int,
+    rank: str = ALTERNATIVES_RANK,
+    selected: Optional[Tuple[str, int]] = None,
+) -> Tuple[List[Dict[str, Any]], bool]:
+    """
+    One page of a component's ranked alternatives: (products, whether more
+    exist). Raises ValueError if selected names no offer.
+    """
+    vendor_matches, _ = fan_out(catalog, [component])
+    offers = [(vendor, found[component]) for vendor, found in vendor_matches.items() if found[component]]
+    if not offers:
+        return [], False
+    page = list(islice(ranked_alternatives(offers, rank, selected=selected), offset, offset + limit + 1))
+    return page[:limit], len(page) > limit
+
+
+def encode_cursor(
+    version: str,
+    component: str,
+    offset: int,
+    rank: str = ALTERNATIVES_RANK,
+    selected: Optional[Tuple[str, int]] = None,
+) -> str:
+    """
+    Opaque cursor for the alternatives after `offset`, pinned to a catalog
+    version. selected is the (vendor, position) the alternatives were listed
+    around, when that is not the default selection.
+    """
+    data = {"v": version, "c": component, "o": offset, "r": rank}
+    if selected is not None:
+        data["s"] = list(selected)
+    raw = json.dumps(data, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[str, str, int, str, Optional[Tuple[str, int]]]:
+    """
+    Inverse of encode_cursor: (version, component, offset, rank, selected).
+    Raises ValueError for a malformed cursor, a negative offset or an
+    unrankable field.
+    """
+    try:
+        data = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        version, component, offset, rank = str(data["v"]), str(data["c"]), int(data["o"]), str(data["r"])
+        selected = (str(data["s"][0]), int(data["s"][1])) if "s" in data else None
+    except (TypeError, KeyError, IndexError, ValueError, UnicodeDecodeError, binascii.Error) as e:
+        raise ValueError(f"invalid cursor: {cursor!r}") from e
+    if offset < 0:
+        raise ValueError(f"invalid cursor: negative offset {offset}")
+    return version, component, offset, check_rank(rank), selected
+
+
+# ---------------------------------------------------
+# Process-wide snapshot
+# ---------------------------------------------------
+
+_catalog: Optional[Catalog] = None
+_catalog_lock = threading.Lock()
+
+# Snapshots still referenced by in-flight requests, keyed by version
+_snapshots: "weakref.WeakValueDictionary[str, Catalog]" = weakref.WeakValueDictionary()
+
+
+def get_catalog(version: Optional[str] = None) -> Catalog:
+    """
+    Return the current catalog snapshot, loading it on first use.
+
+    If version is given and that snapshot is still pinned by a request, it is
+    returned instead, so a request never sees a catalog swapped mid-pipeline.
+    """
+    global _catalog
+    if version is not None:
+        pinned = _snapshots.get(version)
+        if pinned is not None:
+            return pinned
+    if _catalog is None:
+        with _catalog_lock:
+            if _catalog is None:
+                _catalog = load_catalog()
+                _snapshots[_catalog.version] = _catalog
+    return _catalog
+
+
+def set_catalog(catalog: Optional[Catalog]) -> None:
+    """Atomically replace the current snapshot (None forces a reload on next use)."""
+    global _catalog
+    with _catalog_lock:
+        if catalog is not None:
+            _snapshots[catalog.version] = catalog
+        _catalog = catalog
+
+
+# ---------------------------------------------------
+# Hot reload
+# ---------------------------------------------------
+
+class CatalogWatcher:
+    """
+    Polls the catalog files and swaps in a freshly indexed snapshot on change.
+
+    The new snapshot is fully built on the watcher thread before the swap, so
+    readers only ever see the old or the new catalog. A file that fails to
+    parse (e.g. caught mid-write) leaves the current snapshot in place and is
+    retried on the next poll.
+    """
+
+    def __init__(self, paths: Optional[Iterable[Path]] = None, interval: float = 2.0):
+        self.paths = [Path(p) for p in (paths or CATALOG_PATHS)]
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._stamp = self._file_stamp()
+
+    def _file_stamp(self):
+        stamps = []
+        for path in self.paths:
+            try:
+                st = os.stat(path)
+            except FileNotFoundError:
+                return None
+            stamps.append((st.st_mtime_ns, st.st_size))
+        return tuple(stamps)
+
+    def check(self) -> bool:
+        """Reload if any file changed since the last check. Returns True on swap."""
+        stamp = self._file_stamp()
+        if stamp is None or stamp == self._stamp:
+            return False
+        try:
+            catalog = load_catalog(*self.paths)
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Warning: catalog reload failed ({type(e).__name__}), keeping current snapshot")
+            return False
+        self._stamp = stamp
+        if _catalog is not None and catalog.version == _catalog.version:
+            return False
+        set_catalog(catalog)
+        print(f"Catalog reloaded: version {catalog.version} ({len(catalog)} products)")
+        return True
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.check()
+
+    def start(self) -> "CatalogWatcher":
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="catalog-watcher", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
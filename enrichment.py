@@ -0,0 +1,173 @@
+"""
+Precompiled catalog enrichment engine.
+
+The category keyword tables are compiled once into trie-shaped regexes.
+Products are classified in batches (one C-level scan per category over all
+names of a batch) and batches can be spread across a process pool.
+"""
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain, islice
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from matcher import trie_pattern
+
+# ---------------------------------------------------
+# 🏷️ CATEGORY KEYWORDS (checked in priority order)
+# ---------------------------------------------------
+
+CATEGORY_KEYWORDS = [
+    ("safety", ["helmet", "glove", "respirator", "goggles", "hearing", "fall", "first aid", "fire", "gas", "spill", "lockout"]),
+    ("security", ["camera", "metal detector", "safe", "lock", "gate", "security"]),
+    ("tools", ["hammer", "pliers", "wrench", "screwdriver", "drill", "grinder", "saw", "tool", "socket", "bit"]),
+    ("test_instruments", ["multimeter", "clamp", "oscilloscope", "thermal", "thermometer", "air quality", "pressure", "sound", "tachometer", "data logger", "inspection"]),
+]
+
+GUIDE_MARKER = "kh-"
+DEFAULT_CATEGORY = "safety"
+
+# Defaults applied to unpriced products: category -> (price, specs, compatibility_tags)
+CATEGORY_DEFAULTS = {
+    "safety": (49.99, {"type": "ppe"}, ["ppe", "workplace_safety"]),
+    "security": (299.99, {"type": "facility_security"}, ["security", "access_control"]),
+    "tools": (59.99, {"material": "steel"}, ["hand_tool"]),
+    "test_instruments": (249.99, {"usage": "diagnostics"}, ["testing"]),
+    "guide": (0, {"type": "knowledge_article"}, ["guide", "documentation"]),
+}
+
+BATCH_SIZE = 10_000
+
+Pair = Tuple[str, Dict[str, Any]]  # (vendor, product)
+
+
+class EnrichmentEngine:
+    """
+    Classifies and fills defaults for scraped products.
+
+    Each category's keywords are compiled into one trie-shaped regex. A
+    product's category is the first category (in priority order) with any
+    keyword in its lowercased name, exactly as the original any() chains.
+    """
+
+    def __init__(self, category_keywords=CATEGORY_KEYWORDS):
+        self.categories = [category for category, _ in category_keywords]
+        self._regexes = [re.compile(trie_pattern(keywords)) for _, keywords in category_keywords]
+
+    def _fallback(self, product_id: str) -> str:
+        return "guide" if GUIDE_MARKER in product_id else DEFAULT_CATEGORY
+
+    def classify(self, product: Dict[str, Any]) -> str:
+        """Category of a single product."""
+        name = product["name"].lower()
+        for category, regex in zip(self.categories, self._regexes):
+            if regex.search(name):
+                return category
+        return self._fallback(product["id"])
+
+    def classify_batch(self, products: List[Dict[str, Any]]) -> List[str]:
+        """
+        Categories for a batch: one regex pass per category over the joined
+        names, with match offsets mapped back to rows in NumPy.
+        """
+        names = [p["name"].lower() for p in products]
+        lengths = np.fromiter((len(n) + 1 for n in names), dtype=np.int64, count=len(names))
+        starts = np.cumsum(lengths) - lengths
+        text = "\n".join(names)
+
+        # rank[row] = first matching category, len(categories) if none
+        none = len(self.categories)
+        rank = np.full(len(products), none, dtype=np.int64)
+        for r in range(none - 1, -1, -1):
+            hits = np.fromiter((m.start() for m in self._regexes[r].finditer(text)), dtype=np.int64)
+            if len(hits):
+                rank[np.searchsorted(starts, hits, side="right") - 1] = r
+
+        return [
+            self.categories[r] if r < none else self._fallback(p["id"])
+            for r, p in zip(rank.tolist(), products)
+        ]
+
+    @staticmethod
+    def apply(product: Dict[str, Any], category: str) -> Dict[str, Any]:
+        """
+        Set the category and, for unpriced products, default price/specs/tags.
+        Each product gets its own copy of the defaults.
+        """
+        product["category"] = category
+        if product["price"] == 0:
+            price, specs, tags = CATEGORY_DEFAULTS[category]
+            product["price"], product["specs"], product["compatibility_tags"] = price, dict(specs), list(tags)
+        return product
+
+    def enrich(self, product: Dict[str, Any]) -> Dict[str, Any]:
+        return self.apply(product, self.classify(product))
+
+    def enrich_batch(self, products: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        apply = self.apply
+        for product, category in zip(products, self.classify_batch(products)):
+            apply(product, category)
+        return products
+
+
+# ---------------------------------------------------
+# Process pool
+# ---------------------------------------------------
+
+_engine: Optional[EnrichmentEngine] = None
+
+
+def get_engine() -> EnrichmentEngine:
+    """Per-process engine, compiled on first use."""
+    global _engine
+    if _engine is None:
+        _engine = EnrichmentEngine()
+    return _engine
+
+
+def _enrich_batch(pairs: List[Pair]) -> List[Pair]:
+    get_engine().enrich_batch([product for _, product in pairs])
+    return pairs
+
+
+def _batches(pairs: Iterable[Pair], size: int) -> Iterator[List[Pair]]:
+    it = iter(pairs)
+    while True:
+        batch = list(islice(it, size))
+        if not batch:
+            return
+        yield batch
+
+
+def enrich_stream(
+    pairs: Iterable[Pair],
+    workers: Optional[int] = None,
+    batch_size: int = BATCH_SIZE,
+) -> Iterator[Pair]:
+    """
+    Enrich a stream of (vendor, product) pairs in batches, preserving order.
+
+    With more than one worker, batches run in a process pool with a bounded
+    number in flight, so memory stays proportional to workers x batch size.
+    The pool never has more workers than the stream has batches; a stream
+    of one batch is enriched in-process, since spawning the pool would cost
+    more than the work.
+    """
+    batches = _batches(pairs, batch_size)
+    head = list(islice(batches, workers or os.cpu_count() or 1))
+    workers = len(head)
+    if workers <= 1:
+        for batch in chain(head, batches):
+            yield from _enrich_batch(batch)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = []
+        for batch in chain(head, batches):
+            pending.append(pool.submit(_enrich_batch, batch))
+            if len(pending) >= 2 * workers:
+                yield from pending.pop(0).result()
+        for future in pending:
+            yield from future.result()
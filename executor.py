@@ -0,0 +1,62 @@
+"""
+Fast-path pipeline executor.
+
+Each agent declares the state keys it reads and writes (@agent) and returns
+a partial update instead of the whole state. The executor checks the data
+flow once, when the pipeline is built (every read is an input or written
+by an earlier agent), then runs the agents in order, merging each update
+into one dict. An update with a key the agent did not declare is an error.
+
+The same agents run unchanged as LangGraph nodes, which also accept
+partial updates; graph.py picks the executor per deployment.
+"""
+from typing import Any, Callable, Dict, FrozenSet, Iterable, Sequence
+
+Agent = Callable[[Dict[str, Any]], Dict[str, Any]]
+
+
+def agent(reads: Iterable[str], writes: Iterable[str]) -> Callable[[Agent], Agent]:
+    """Declare the state keys an agent reads and the keys its update may contain."""
+
+    def declare(fn: Agent) -> Agent:
+        fn.reads = frozenset(reads)
+        fn.writes = frozenset(writes)
+        return fn
+
+    return declare
+
+
+def node_name(fn: Agent) -> str:
+    """Graph node name for an agent: intent_agent -> intent."""
+    return fn.__name__[:-len("_agent")] if fn.__name__.endswith("_agent") else fn.__name__
+
+
+class FastPathExecutor:
+    """
+    Runs a linear pipeline of declared agents over a plain dict. inputs are
+    the keys the caller provides; construction raises ValueError if an
+    agent reads a key nothing before it provides.
+    """
+
+    def __init__(self, pipeline: Sequence[Agent], inputs: Iterable[str]):
+        self.pipeline = list(pipeline)
+        available = set(inputs)
+        for fn in self.pipeline:
+            if not hasattr(fn, "reads"):
+                raise ValueError(f"{fn.__name__} does not declare its reads and writes")
+            unread = fn.reads - available
+            if unread:
+                raise ValueError(f"{fn.__name__} reads {', '.join(sorted(unread))} before anything writes it")
+            available |= fn.writes
+        self.outputs: FrozenSet[str] = frozenset(available)
+
+    def run(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        """Run the pipeline on a copy of state and return the final state."""
+        state = dict(state)
+        for fn in self.pipeline:
+            update = fn(state)
+            if not fn.writes.issuperset(update):
+                undeclared = sorted(set(update) - fn.writes)
+                raise ValueError(f"{fn.__name__} wrote undeclared keys: {', '.join(undeclared)}")
+            state.update(update)
+        return state
@@ -1,9 +1,16 @@
 """
 LangGraph orchestration for CartPilot multi-agent pipeline.
 Defines the graph structure and agent execution flow.
+
+The same pipeline also runs on the fast-path executor (executor.py), which
+skips LangGraph's channel bookkeeping; CARTPILOT_EXECUTOR=fast selects it.
 """
-from typing import TypedDict
+import os
+from typing import Any, Dict, Optional, TypedDict
 from state import CartPilotState
+from catalog import get_catalog
+from rules import get_rules
+from executor import FastPathExecutor, node_name
 from agents import (
     intent_agent,
     planner_agent,
@@ -24,13 +31,29 @@ except (ImportError, AttributeError) as e:
     END = None
     print(f"Warning: LangGraph import failed ({type(e).__name__}), using sequential execution")
 
+# Intent -> Planner -> Dependency -> Compatibility -> Product Selection -> Cart Composer
+PIPELINE = (
+    intent_agent,
+    planner_agent,
+    dependency_agent,
+    compatibility_agent,
+    product_selection_agent,
+    cart_composer_agent,
+)
+
+# Keys run_cartpilot provides; everything else is written by an agent
+PIPELINE_INPUTS = ("user_goal", "catalog_version", "rules_version", "constraints")
+
+# "langgraph" (default) or "fast"; langgraph falls back to fast when unavailable
+EXECUTOR = os.environ.get("CARTPILOT_EXECUTOR", "langgraph")
+if EXECUTOR not in ("langgraph", "fast"):
+    raise ValueError(f"CARTPILOT_EXECUTOR must be 'langgraph' or 'fast', not {EXECUTOR!r}")
 
-def create_cartpilot_graph():
+
+def create_cartpilot_graph(pipeline=PIPELINE):
     """
-    Create and wire the CartPilot multi-agent graph.
-    
-    Flow:
-    Intent -> Planner -> Dependency -> Compatibility -> Product Selection -> Cart Composer
+    Create and wire the CartPilot multi-agent graph: one node per agent,
+    named after it (intent_agent -> "intent"), in pipeline order.
     """
     if not LANGGRAPH_AVAILABLE:
         # Return a simple sequential runner
@@ -40,21 +63,15 @@ def create_cartpilot_graph():
     workflow = StateGraph(CartPilotState)
     
     # Add nodes (agents)
-    workflow.add_node("intent", intent_agent)
-    workflow.add_node("planner", planner_agent)
-    workflow.add_node("dependency", dependency_agent)
-    workflow.add_node("compatibility", compatibility_agent)
-    workflow.add_node("product_selection", product_selection_agent)
-    workflow.add_node("cart_composer", cart_composer_agent)
+    names = [node_name(fn) for fn in pipeline]
+    for name, fn in zip(names, pipeline):
+        workflow.add_node(name, fn)
     
     # Define edges (linear pipeline)
-    workflow.set_entry_point("intent")
-    workflow.add_edge("intent", "planner")
-    workflow.add_edge("planner", "dependency")
-    workflow.add_edge("dependency", "compatibility")
-    workflow.add_edge("compatibility", "product_selection")
-    workflow.add_edge("product_selection", "cart_composer")
-    workflow.add_edge("cart_composer", END)
+    workflow.set_entry_point(names[0])
+    for current, following in zip(names, names[1:]):
+        workflow.add_edge(current, following)
+    workflow.add_edge(names[-1], END)
     
     # Compile graph
     app = workflow.compile()
@@ -62,28 +79,32 @@ def create_cartpilot_graph():
     return app
 
 
-def run_sequential(state: CartPilotState) -> CartPilotState:
-    """Fallback sequential execution if LangGraph is unavailable."""
-    state = intent_agent(state)
-    state = planner_agent(state)
-    state = dependency_agent(state)
-    state = compatibility_agent(state)
-    state = product_selection_agent(state)
-    state = cart_composer_agent(state)
-    return state
-
-
-# Global graph instance
+# Global graph instance and fast-path executor (checks the declared data flow once)
 cartpilot_graph = create_cartpilot_graph()
+fast_path = FastPathExecutor(PIPELINE, PIPELINE_INPUTS)
 
 
-def run_cartpilot(user_goal: str) -> CartPilotState:
+def run_cartpilot(
+    user_goal: str,
+    constraints: Optional[Dict[str, Any]] = None,
+    executor: Optional[str] = None,
+) -> CartPilotState:
     """
     Execute the CartPilot pipeline with a user goal.
+    constraints (budget, required_tags, forbidden_tags) switch product
+    selection to the solver. executor overrides CARTPILOT_EXECUTOR.
     Returns the final state with complete cart.
     """
+    # Pin the current catalog snapshot and rule set; holding the references keeps
+    # them resolvable by version until this request finishes, even across a reload.
+    catalog = get_catalog()
+    rules = get_rules()
+
     initial_state: CartPilotState = {
         "user_goal": user_goal,
+        "catalog_version": catalog.version,
+        "rules_version": rules.version,
+        "constraints": constraints or {},
         "parsed_intent": {},
         "required_components": [],
         "component_dependencies": {},
@@ -92,17 +113,21 @@ def run_cartpilot(user_goal: str) -> CartPilotState:
         "compatibility_issues": [],
         "selected_products": {},
         "product_alternatives": {},
+        "alternatives_cursor": {},
+        "shard_timings": {},
+        "solver": {},
         "final_cart": [],
+        "total_price": 0.0,
         "completeness_score": 0.0,
         "cart_summary": "",
         "validation_errors": []
     }
     
-    # Execute graph or use sequential fallback
-    if cartpilot_graph is not None:
+    # Execute graph or the fast path (also the fallback without LangGraph)
+    if (executor or EXECUTOR) == "langgraph" and cartpilot_graph is not None:
         final_state = cartpilot_graph.invoke(initial_state)
     else:
-        final_state = run_sequential(initial_state)
+        final_state = fast_path.run(initial_state)
     
     return final_state
 
@@ -0,0 +1,188 @@
+"""
+Local intent classifier: hashed n-gram vectors vs scenario centroids.
+
+Goals are turned into L2-normalized bags of hashed features (word unigrams
+and bigrams plus character 3-5 grams, so misspellings and inflections still
+overlap) and scored against one centroid per scenario with a single sparse
+matrix product per batch. Only features that occur in some centroid are
+stored, so a model is tens of KB and loads in milliseconds. Centroids are
+built from the rules' intent keywords and component names, or trained
+from labelled goals:
+
+    python intent_vectors.py train labelled.jsonl --out intent_model.npz
+
+where each line is {"goal": "...", "scenario": "..."}.
+"""
+import argparse
+import json
+import re
+import zlib
+from itertools import chain
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+DIM = 1 << 20
+CHAR_NGRAMS = (3, 5)
+_WORD = re.compile(r"[a-z0-9]+")
+
+
+class HashingVectorizer:
+    """
+    Stateless text → sparse feature ids (crc32 mod DIM). A word's own
+    features (unigram and character n-grams) are memoized per word, so a
+    goal costs one lookup per word plus one hash per bigram.
+    """
+
+    def __init__(self, dim: int = DIM, char_ngrams: Tuple[int, int] = CHAR_NGRAMS, memo: int = 100_000):
+        self.dim = dim
+        self.char_ngrams = char_ngrams
+        self._words: Dict[str, Tuple[int, ...]] = {}
+        self._memo_limit = memo
+
+    def _hash(self, feature: str) -> int:
+        return zlib.crc32(feature.encode("utf-8")) % self.dim
+
+    def _word(self, word: str) -> Tuple[int, ...]:
+        feats = self._words.get(word)
+        if feats is None:
+            padded = f" {word} "
+            low, high = self.char_ngrams
+            grams = [padded[i:i + n] for n in range(low, high + 1) for i in range(len(padded) - n + 1)]
+            feats = tuple(self._hash(f) for f in [f"w:{word}", *grams])
+            if len(self._words) < self._memo_limit:
+                self._words[word] = feats
+        return feats
+
+    def features(self, text: str) -> List[int]:
+        words = _WORD.findall(text.lower())
+        feats: List[int] = []
+        for w in words:
+            feats.extend(self._word(w))
+        feats.extend(self._hash(f"b:{a} {b}") for a, b in zip(words, words[1:]))
+        return feats
+
+    def transform(self, texts: Sequence[str]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """CSR triple (indptr, indices, values) of L2-normalized binary rows."""
+        rows = [self.features(t) for t in texts]
+        lengths = [len(r) for r in rows]
+        flat = np.fromiter(chain.from_iterable(rows), dtype=np.int64, count=sum(lengths))
+        # One unique over (row, feature) keys dedupes every row and keeps rows in order
+        keys = np.unique(np.repeat(np.arange(len(texts), dtype=np.int64), lengths) * self.dim + flat)
+        row_ids, indices = np.divmod(keys, self.dim)
+        counts = np.bincount(row_ids, minlength=len(texts))
+        indptr = np.zeros(len(texts) + 1, dtype=np.int64)
+        np.cumsum(counts, out=indptr[1:])
+        values = np.repeat(1.0 / np.sqrt(np.maximum(counts, 1)), counts).astype(np.float32)
+        return indptr, indices, values
+
+
+class CentroidClassifier:
+    """
+    Cosine similarity of each goal to each scenario centroid.
+
+    features is the sorted array of feature ids any centroid uses, weights
+    the matching (F, n_labels) block of the centroid matrix.
+    """
+
+    def __init__(self, labels: Sequence[str], features: np.ndarray, weights: np.ndarray,
+                 vectorizer: Optional[HashingVectorizer] = None):
+        self.labels = list(labels)
+        self.features = features
+        self.weights = weights
+        self.vectorizer = vectorizer or HashingVectorizer()
+
+    @classmethod
+    def fit(cls, texts: Sequence[str], labels: Sequence[str],
+            vectorizer: Optional[HashingVectorizer] = None) -> "CentroidClassifier":
+        """Centroid per label: the normalized mean of its documents' vectors."""
+        vectorizer = vectorizer or HashingVectorizer()
+        names = list(dict.fromkeys(labels))
+        column = {name: i for i, name in enumerate(names)}
+        indptr, indices, values = vectorizer.transform(texts)
+        features, inverse = np.unique(indices, return_inverse=True)
+        weights = np.zeros((len(features), len(names)), dtype=np.float64)
+        doc_columns = np.repeat([column[label] for label in labels], np.diff(indptr))
+        np.add.at(weights, (inverse, doc_columns), values)
+        weights /= np.maximum(np.linalg.norm(weights, axis=0), 1e-12)
+        return cls(names, features, weights.astype(np.float32), vectorizer)
+
+    def scores(self, texts: Sequence[str]) -> np.ndarray:
+        """(len(texts), n_labels) cosine similarities."""
+        indptr, indices, values = self.vectorizer.transform(texts)
+        out = np.zeros((len(texts), len(self.labels)), dtype=np.float32)
+        if not len(self.features) or not len(indices):
+            return out
+        pos = np.minimum(np.searchsorted(self.features, indices), len(self.features) - 1)
+        hit = self.features[pos] == indices
+        rows = np.repeat(np.arange(len(texts)), np.diff(indptr))[hit]
+        if not len(rows):
+            return out
+        # rows is sorted, so each goal's contributions are one contiguous run
+        counts = np.bincount(rows, minlength=len(texts))
+        starts = np.cumsum(counts) - counts
+        nonempty = counts > 0
+        out[nonempty] = np.add.reduceat(self.weights[pos[hit]] * values[hit, None], starts[nonempty])
+        return out
+
+    def classify(self, texts: Sequence[str]) -> List[Tuple[str, float]]:
+        """Best label and its similarity for each text."""
+        scores = self.scores(texts)
+        best = scores.argmax(axis=1)
+        return [(self.labels[i], float(s)) for i, s in zip(best.tolist(), scores[np.arange(len(texts)), best].tolist())]
+
+    def save(self, path: Path) -> None:
+        np.savez(path, labels=np.array(self.labels), features=self.features, weights=self.weights,
+                 dim=self.vectorizer.dim, char_ngrams=np.array(self.vectorizer.char_ngrams))
+
+    @classmethod
+    def load(cls, path: Path) -> "CentroidClassifier":
+        with np.load(path) as data:
+            vectorizer = HashingVectorizer(int(data["dim"]), tuple(int(n) for n in data["char_ngrams"]))
+            return cls(data["labels"].tolist(), data["features"], data["weights"], vectorizer)
+
+
+def seed_documents(
+    keyword_table: Iterable[Tuple[str, Sequence[str]]],
+    scenario_components: Dict[str, Sequence[str]],
+) -> Tuple[List[str], List[str]]:
+    """(texts, labels) from scenario names, their keywords and their component names."""
+    texts, labels = [], []
+    keywords = dict(keyword_table)
+    for scenario in dict.fromkeys([*keywords, *scenario_components]):
+        docs = [scenario.replace("_", " "), *keywords.get(scenario, [])]
+        docs += [component.replace("-", " ") for component in scenario_components.get(scenario, [])]
+        texts += docs
+        labels += [scenario] * len(docs)
+    return texts, labels
+
+
+def _read_labelled(path: Path) -> Tuple[List[str], List[str]]:
+    texts, labels = [], []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                entry = json.loads(line)
+                texts.append(entry["goal"])
+                labels.append(entry["scenario"])
+    return texts, labels
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Train scenario centroids from labelled goals.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    train = sub.add_parser("train")
+    train.add_argument("labelled", type=Path, help="JSONL of {goal, scenario}")
+    train.add_argument("--out", type=Path, default=Path("intent_model.npz"))
+    args = parser.parse_args()
+
+    from rules import get_rules
+
+    rules = get_rules()
+    seed_texts, seed_labels = seed_documents(rules.intent_keywords, rules.scenarios)
+    texts, labels = _read_labelled(args.labelled)
+    model = CentroidClassifier.fit(seed_texts + texts, seed_labels + labels)
+    model.save(args.out)
+    print(f"✅ {len(model.labels)} centroids over {len(model.features)} features from "
+          f"{len(texts)} labelled goals -> {args.out}")
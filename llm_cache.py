@@ -0,0 +1,247 @@
+"""
+Persistent cache for LLM responses.
+
+Entries are keyed by a namespace (model + prompt template) and the
+normalized goal text, so "Need electrical PPE" and "need electrical ppe!"
+share one entry. An optional similarity tier also serves near-duplicate
+goals (token Jaccard above a threshold). Entries are evicted LRU and by
+TTL, and every insert is appended to a JSONL journal so hits survive
+restarts. Several worker processes may share one journal: appends and
+compaction hold an exclusive lock on a sidecar ".lock" file, and a worker
+reopens the journal when another one has compacted it. Before compacting,
+a worker replays only the lines other workers appended since it last read
+the journal, and never revives an entry it evicted itself.
+"""
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, FrozenSet, Iterator, Optional, Set, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process locking, one worker per journal
+    fcntl = None
+
+_NON_WORD = re.compile(r"[\W_]+")
+
+
+def normalize_goal(text: str) -> str:
+    """Lowercase, drop punctuation and collapse whitespace."""
+    return " ".join(_NON_WORD.sub(" ", text.lower()).split())
+
+
+class LLMCache:
+    """
+    Thread-safe LRU/TTL cache with an exact tier and an optional similarity tier.
+
+    similarity is the minimum token Jaccard for a near-duplicate hit, or None
+    to disable that tier. With a path, entries are loaded at start-up and
+    every put is journaled; the journal is compacted once it holds twice as
+    many lines as live entries.
+    """
+
+    def __init__(
+        self,
+        path: Optional[Path] = None,
+        capacity: int = 10_000,
+        ttl: float = 7 * 24 * 3600,
+        similarity: Optional[float] = None,
+    ):
+        self.path = Path(path) if path else None
+        self.capacity = capacity
+        self.ttl = ttl
+        self.similarity = similarity
+        self.hits = 0
+        self.similar_hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[str, float]]" = OrderedDict()
+        self._tokens: Dict[Tuple[str, str], FrozenSet[str]] = {}
+        self._postings: Dict[Tuple[str, str], Set[Tuple[str, str]]] = {}
+        self._lock = threading.Lock()
+        self._journal = None
+        self._journal_lines = 0
+        # Bytes of the journal already read, offsets of this process's own
+        # lines past that point, and creation times of entries it evicted
+        self._offset = 0
+        self._own: Set[int] = set()
+        self._evicted: Dict[Tuple[str, str], float] = {}
+        self._lockfile = None
+        if self.path is not None:
+            self._lockfile = open(self.path.with_name(self.path.name + ".lock"), "a")
+            with self._journal_lock():
+                self._replay()
+                self._journal = open(self.path, "a", encoding="utf-8")
+
+    # -- persistence --------------------------------------------------
+
+    def _replay(self) -> None:
+        """Apply journal lines past the last offset read, skipping this process's own lines."""
+        if not self.path.exists():
+            return
+        now = time.time()
+        with open(self.path, "rb") as f:
+            f.seek(self._offset)
+            offset = self._offset
+            for line in f:
+                start, offset = offset, offset + len(line)
+                if start in self._own:
+                    continue
+                try:
+                    entry = json.loads(line)
+                except (json.JSONDecodeError, UnicodeDecodeError):  # torn final line from a crash
+                    continue
+                self._journal_lines += 1
+                key, created = (entry["ns"], entry["text"]), entry["at"]
+                if now - created >= self.ttl or self._evicted.get(key, -1.0) >= created:
+                    continue
+                current = self._entries.get(key)
+                if current is None or current[1] < created:
+                    self._insert(key, entry["response"], created)
+        self._offset = offset
+        self._own.clear()
+
+    @contextmanager
+    def _journal_lock(self) -> Iterator[None]:
+        """Exclusive lock on the journal across processes."""
+        if fcntl is None:
+            yield
+            return
+        fcntl.flock(self._lockfile, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(self._lockfile, fcntl.LOCK_UN)
+
+    def _reopen_if_replaced(self) -> None:
+        """After another process compacted the journal, append to the new file."""
+        try:
+            replaced = os.stat(self.path).st_ino != os.fstat(self._journal.fileno()).st_ino
+        except FileNotFoundError:
+            replaced = True
+        if replaced:
+            self._journal.close()
+            self._journal = open(self.path, "a", encoding="utf-8")
+            self._offset, self._journal_lines = 0, 0
+            self._own.clear()
+
+    def _compact(self) -> None:
+        # Fold in entries other workers appended, so compaction keeps them
+        self._replay()
+        if self._journal_lines <= 2 * max(len(self._entries), 1):
+            return
+        self._journal.close()
+        tmp = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            for (namespace, text), (response, created) in self._entries.items():
+                f.write(json.dumps({"ns": namespace, "text": text, "response": response, "at": created}) + "\n")
+        os.replace(tmp, self.path)
+        self._journal = open(self.path, "a", encoding="utf-8")
+        self._journal_lines = len(self._entries)
+        self._offset = os.fstat(self._journal.fileno()).st_size
+        self._evicted.clear()
+
+    # -- index maintenance --------------------------------------------
+
+    def _insert(self, key: Tuple[str, str], response: str, created: float) -> None:
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = (response, created)
+        if self.similarity is not None:
+            tokens = frozenset(key[1].split())
+            self._tokens[key] = tokens
+            for token in tokens:
+                self._postings.setdefault((key[0], token), set()).add(key)
+        while len(self._entries) > self.capacity:
+            oldest = next(iter(self._entries))
+            if self.path is not None:
+                self._evicted[oldest] = self._entries[oldest][1]
+            self._remove(oldest)
+
+    def _remove(self, key: Tuple[str, str]) -> None:
+        del self._entries[key]
+        for token in self._tokens.pop(key, ()):
+            posting = self._postings[(key[0], token)]
+            posting.discard(key)
+            if not posting:
+                del self._postings[(key[0], token)]
+
+    def _similar(self, namespace: str, text: str) -> Optional[Tuple[str, str]]:
+        """Best cached key in namespace whose token Jaccard clears the threshold."""
+        tokens = frozenset(text.split())
+        overlap: Dict[Tuple[str, str], int] = {}
+        for token in tokens:
+            for key in self._postings.get((namespace, token), ()):
+                overlap[key] = overlap.get(key, 0) + 1
+        best, best_score = None, self.similarity
+        for key, shared in overlap.items():
+            score = shared / (len(tokens) + len(self._tokens[key]) - shared)
+            if score >= best_score:
+                best, best_score = key, score
+        return best
+
+    # -- public API ---------------------------------------------------
+
+    def get(self, namespace: str, text: str, similar: bool = True) -> Optional[str]:
+        """Cached response for text in namespace, or None. similar=False skips the similarity tier."""
+        key = (namespace, normalize_goal(text))
+        now = time.time()
+        with self._lock:
+            tier = "exact"
+            if key not in self._entries and similar and self.similarity is not None:
+                key = self._similar(*key) or key
+                tier = "similar"
+            entry = self._entries.get(key)
+            if entry is not None and now - entry[1] >= self.ttl:
+                self._remove(key)
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            if tier == "exact":
+                self.hits += 1
+            else:
+                self.similar_hits += 1
+            return entry[0]
+
+    def put(self, namespace: str, text: str, response: str) -> None:
+        key = (namespace, normalize_goal(text))
+        created = time.time()
+        with self._lock:
+            self._insert(key, response, created)
+            if self._journal is not None:
+                line = json.dumps({"ns": key[0], "text": key[1], "response": response, "at": created}) + "\n"
+                with self._journal_lock():
+                    self._reopen_if_replaced()
+                    start = os.fstat(self._journal.fileno()).st_size
+                    self._journal.write(line)
+                    self._journal.flush()
+                    if start == self._offset:  # nothing unread before it
+                        self._offset += len(line.encode("utf-8"))
+                    else:
+                        self._own.add(start)
+                    self._journal_lines += 1
+                    if self._journal_lines > 2 * max(len(self._entries), 1):
+                        self._compact()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.similar_hits + self.misses
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "similar_hits": self.similar_hits,
+            "misses": self.misses,
+            "hit_rate": round((self.hits + self.similar_hits) / lookups, 4) if lookups else 0.0,
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            if self._journal is not None:
+                self._journal.close()
+                self._journal = None
+                self._lockfile.close()
@@ -0,0 +1,139 @@
+"""
+Multi-pattern substring matcher for component -> product resolution.
+
+All component keys are compiled once into a trie-shaped regular expression,
+so a single left-to-right pass over the text reports every key it contains
+instead of running one substring test per key. IntentMatcher builds on it
+to score a whole keyword -> label table in one pass.
+"""
+
+import re
+from bisect import bisect_right
+from typing import Dict, Iterable, List, Sequence, Set, Tuple
+
+
+def trie_pattern(words: Iterable[str]) -> str:
+    """Compile words into a regex whose alternation follows a prefix trie."""
+    trie: Dict[str, dict] = {}
+    for word in words:
+        node = trie
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def build(node: dict) -> str:
+        terminal = "" in node
+        branches = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        # Greedy optional: prefer the longest key, shorter keys via prefix closure
+        if terminal:
+            return "(?:" + body + ")?"
+        return body
+
+    return build(trie)
+
+
+class ComponentMatcher:
+    """
+    Compiled matcher over a fixed set of lowercase component keys.
+
+    At each text position the regex reports the longest key starting there;
+    any shorter key matching at the same position is necessarily a prefix of
+    it, so overlapping matches are recovered from a precomputed prefix closure.
+    """
+
+    def __init__(self, patterns: Iterable[str]):
+        self.patterns: List[str] = sorted({p.lower() for p in patterns if p})
+        self._closure: Dict[str, List[str]] = {
+            p: [q for q in self.patterns if p.startswith(q)] for p in self.patterns
+        }
+        self._regex = re.compile("(?=(" + trie_pattern(self.patterns) + "))") if self.patterns else None
+
+    def scan(self, text: str) -> Set[str]:
+        """Distinct longest keys reported at some position of text (see expand)."""
+        if self._regex is None:
+            return set()
+        return set(self._regex.findall(text.lower()))
+
+    def expand(self, key: str) -> List[str]:
+        """A longest key reported by scan, with every key that is a prefix of it."""
+        return self._closure[key]
+
+    def match(self, text: str) -> Set[str]:
+        """Return every key that occurs in text."""
+        found: Set[str] = set()
+        for key in self.scan(text):
+            found.update(self._closure[key])
+        return found
+
+    def index(self, texts: List[str]) -> Dict[str, List[int]]:
+        """
+        Map each key to the ascending positions of the texts containing it.
+
+        Texts are joined with newlines and scanned in one pass; texts must
+        already be lowercase and keys never contain a newline.
+        """
+        result: Dict[str, List[int]] = {p: [] for p in self.patterns}
+        if self._regex is None or not texts:
+            return result
+
+        starts = []
+        offset = 0
+        for text in texts:
+            starts.append(offset)
+            offset += len(text) + 1
+
+        for m in self._regex.finditer("\n".join(texts)):
+            i = bisect_right(starts, m.start()) - 1
+            for key in self._closure[m.group(1)]:
+                hits = result[key]
+                if not hits or hits[-1] != i:
+                    hits.append(i)
+        return result
+
+
+class IntentMatcher:
+    """
+    Scores every label of a keyword table in one scan of the text.
+
+    The table is an ordered list of (label, keywords). A label scores one
+    point per distinct keyword found in the text; ties keep table order, so
+    the first label of the table wins when evidence is equal.
+    """
+
+    def __init__(self, table: Sequence[Tuple[str, Iterable[str]]]):
+        self.labels: List[str] = [label for label, _ in table]
+        labels_of: Dict[str, List[int]] = {}
+        for i, (_, keywords) in enumerate(table):
+            for keyword in keywords:
+                labels_of.setdefault(keyword.lower(), []).append(i)
+        self._matcher = ComponentMatcher(labels_of)
+        # Longest keyword reported at a position -> (label, keyword) for it and its prefixes
+        self._expand: Dict[str, List[Tuple[int, str]]] = {
+            key: [(i, k) for k in self._matcher.expand(key) for i in labels_of[k]]
+            for key in self._matcher.patterns
+        }
+
+    def score(self, text: str) -> List[Tuple[str, int, float, List[str]]]:
+        """
+        Ranked (label, score, confidence, keywords) for every label with a hit.
+        Confidence is the label's share of all keyword hits.
+        """
+        hits: Dict[int, Set[str]] = {}
+        expand = self._expand
+        for key in self._matcher.scan(text):
+            for i, keyword in expand[key]:
+                if i in hits:
+                    hits[i].add(keyword)
+                else:
+                    hits[i] = {keyword}
+        if not hits:
+            return []
+        total = sum(len(keywords) for keywords in hits.values())
+        ranked = sorted(hits.items(), key=lambda item: (-len(item[1]), item[0]))
+        return [
+            (self.labels[i], len(keywords), len(keywords) / total, sorted(keywords))
+            for i, keywords in ranked
+        ]
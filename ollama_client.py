@@ -0,0 +1,343 @@
+"""
+Async Ollama client for the intent/planner path.
+
+One pooled keep-alive HTTP client per process, a per-call deadline, a
+semaphore capping in-flight generations, and a circuit breaker that fails
+fast with LLMUnavailable while Ollama is unhealthy so callers fall back to
+the rule-based agents. Slow calls can optionally be hedged with a second
+request. MicroBatcher folds concurrent prompts into one batched call.
+FakeOllamaServer is a local stand-in for tests and benchmarks.
+"""
+import asyncio
+import json
+import random
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+import httpx
+
+
+class LLMUnavailable(Exception):
+    """The LLM could not answer in time (timeout, error, or circuit open)."""
+
+
+# ---------------------------------------------------
+# Circuit breaker
+# ---------------------------------------------------
+
+class CircuitBreaker:
+    """
+    Opens after `failure_threshold` consecutive failures and rejects calls for
+    `reset_timeout` seconds; then lets a single probe through (half-open),
+    closing again if it succeeds.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self.failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+
+    def allow(self) -> bool:
+        if self.state == "closed":
+            return True
+        if self.state == "open" and time.monotonic() - self._opened_at >= self.reset_timeout:
+            self.state = "half_open"
+        if self.state == "half_open" and not self._probing:
+            self._probing = True
+            return True
+        return False
+
+    def success(self) -> None:
+        self.state = "closed"
+        self.failures = 0
+        self._probing = False
+
+    def failure(self) -> None:
+        self.failures += 1
+        self._probing = False
+        if self.state == "half_open" or self.failures >= self.failure_threshold:
+            self.state = "open"
+            self._opened_at = time.monotonic()
+
+    def release(self) -> None:
+        """A call ended without a verdict (cancelled); let another probe through."""
+        self._probing = False
+
+
+# ---------------------------------------------------
+# Client
+# ---------------------------------------------------
+
+class OllamaClient:
+    """
+    Pooled async client for /api/generate.
+
+    Must be used from a single event loop. timeout bounds each call end to
+    end, including the wait for a concurrency slot. With hedge_after, a call
+    still running after that many seconds gets a duplicate request if a slot
+    is free; the first answer wins and the other is cancelled.
+    """
+
+    def __init__(
+        self,
+        base_url: str = "http://localhost:11434",
+        model: str = "llama3.2",
+        max_concurrency: int = 2,
+        timeout: float = 20.0,
+        hedge_after: Optional[float] = None,
+        breaker: Optional[CircuitBreaker] = None,
+    ):
+        self.url = base_url.rstrip("/") + "/api/generate"
+        self.model = model
+        self.timeout = timeout
+        self.hedge_after = hedge_after
+        self.breaker = breaker or CircuitBreaker()
+        self.max_concurrency = max_concurrency
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._client = httpx.AsyncClient(
+            timeout=httpx.Timeout(timeout, connect=min(timeout, 2.0)),
+            limits=httpx.Limits(max_connections=2 * max_concurrency, max_keepalive_connections=2 * max_concurrency),
+        )
+        self.in_flight = 0
+        self.calls = 0
+        self.failures = 0
+        self.rejected = 0
+        self.hedges = 0
+
+    @property
+    def semaphore(self) -> asyncio.Semaphore:
+        # Created lazily so it binds to the loop the client is used from
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphore
+
+    async def _call(self, prompt: str) -> str:
+        async with self.semaphore:
+            self.in_flight += 1
+            try:
+                response = await self._client.post(
+                    self.url, json={"model": self.model, "prompt": prompt, "stream": False}
+                )
+                response.raise_for_status()
+                return response.json()["response"]
+            finally:
+                self.in_flight -= 1
+
+    async def _hedged(self, prompt: str) -> str:
+        tasks = [asyncio.ensure_future(self._call(prompt))]
+        try:
+            if self.hedge_after is None:
+                return await tasks[0]
+            done, _ = await asyncio.wait(tasks, timeout=self.hedge_after)
+            if not done and not self.semaphore.locked():
+                self.hedges += 1
+                tasks.append(asyncio.ensure_future(self._call(prompt)))
+            pending = set(tasks)
+            error: Optional[BaseException] = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def generate(self, prompt: str, timeout: Optional[float] = None) -> str:
+        """Generate a response or raise LLMUnavailable within the deadline."""
+        if not self.breaker.allow():
+            self.rejected += 1
+            raise LLMUnavailable("circuit open")
+        self.calls += 1
+        try:
+            result = await asyncio.wait_for(self._hedged(prompt), timeout or self.timeout)
+        except Exception as e:
+            # Any error (HTTP, bad URL, malformed body, ...) counts against Ollama
+            self.failures += 1
+            self.breaker.failure()
+            message = str(e).splitlines()[0] if str(e) else "deadline exceeded"
+            raise LLMUnavailable(f"{type(e).__name__}: {message}") from e
+        except BaseException:
+            self.breaker.release()
+            raise
+        self.breaker.success()
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "breaker": self.breaker.state,
+            "in_flight": self.in_flight,
+            "calls": self.calls,
+            "failures": self.failures,
+            "rejected": self.rejected,
+            "hedges": self.hedges,
+        }
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
+
+
+# ---------------------------------------------------
+# Micro-batching
+# ---------------------------------------------------
+
+class MicroBatcher:
+    """
+    Collects concurrent submits for up to `window` seconds (or until
+    `max_batch` items are waiting) and runs them through one call of
+    run_batch, which returns one result per item in order. A result that is
+    an exception is raised to that item's caller only; if run_batch itself
+    raises, every caller in the batch gets the error.
+
+    Like OllamaClient, must be used from a single event loop.
+    """
+
+    def __init__(
+        self,
+        run_batch: Callable[[List[Any]], Awaitable[List[Any]]],
+        window: float = 0.005,
+        max_batch: int = 16,
+    ):
+        self.run_batch = run_batch
+        self.window = window
+        self.max_batch = max_batch
+        self.batches = 0
+        self.items = 0
+        self._pending: List[Tuple[Any, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._running: Set[asyncio.Task] = set()
+
+    async def submit(self, item: Any) -> Any:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((item, future))
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self._flush)
+        return await future
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.ensure_future(self._run(batch))
+            self._running.add(task)
+            task.add_done_callback(self._running.discard)
+
+    async def _run(self, batch: List[Tuple[Any, asyncio.Future]]) -> None:
+        self.batches += 1
+        self.items += len(batch)
+        try:
+            results = await self.run_batch([item for item, _ in batch])
+        except Exception as e:
+            results = [e] * len(batch)
+        for (_, future), result in zip(batch, results):
+            if future.done():  # caller gave up (deadline)
+                continue
+            if isinstance(result, BaseException):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "batches": self.batches,
+            "items": self.items,
+            "mean_batch": round(self.items / self.batches, 2) if self.batches else 0.0,
+        }
+
+
+# ---------------------------------------------------
+# Local stand-in
+# ---------------------------------------------------
+
+class FakeOllamaServer:
+    """
+    Local HTTP server answering POST /api/generate like Ollama.
+
+    latency is seconds per request (or a callable of the prompt), failure_rate
+    the fraction answered with 500, and healthy=False answers everything with
+    503. respond maps a prompt to the response text. max_in_flight records
+    the peak number of concurrent generations.
+    """
+
+    def __init__(
+        self,
+        latency=0.0,
+        failure_rate: float = 0.0,
+        respond: Optional[Callable[[str], str]] = None,
+        seed: int = 0,
+    ):
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.respond = respond or (lambda prompt: json.dumps({"echo": prompt[-40:]}))
+        self.healthy = True
+        self.requests = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._rng = random.Random(seed)
+        self._server: Optional[asyncio.AbstractServer] = None
+        self.url = ""
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                length = 0
+                while True:
+                    header = await reader.readline()
+                    if header in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = header.decode("latin-1").partition(":")
+                    if name.strip().lower() == "content-length":
+                        length = int(value)
+                body = await reader.readexactly(length) if length else b""
+
+                prompt = json.loads(body or b"{}").get("prompt", "")
+
+                self.requests += 1
+                self.in_flight += 1
+                self.max_in_flight = max(self.max_in_flight, self.in_flight)
+                try:
+                    latency = self.latency(prompt) if callable(self.latency) else self.latency
+                    if latency:
+                        await asyncio.sleep(latency)
+                finally:
+                    self.in_flight -= 1
+
+                if not self.healthy:
+                    status, payload = "503 Service Unavailable", b"{}"
+                elif self._rng.random() < self.failure_rate:
+                    status, payload = "500 Internal Server Error", b'{"error": "injected"}'
+                else:
+                    status = "200 OK"
+                    payload = json.dumps({"model": "fake", "response": self.respond(prompt), "done": True}).encode()
+                writer.write(
+                    f"HTTP/1.1 {status}\r\nContent-Type: application/json\r\n"
+                    f"Content-Length: {len(payload)}\r\n\r\n".encode("latin-1") + payload
+                )
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.CancelledError):
+            pass
+        finally:
+            writer.close()
+
+    async def __aenter__(self) -> "FakeOllamaServer":
+        self._server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        host, port = self._server.sockets[0].getsockname()[:2]
+        self.url = f"http://{host}:{port}"
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        self._server.close()
+        await self._server.wait_closed()
@@ -1,146 +1,406 @@
 """
 Industrial Dependency and Compatibility Rules Engine
 Same architecture as before — but using Grainger product categories
+
+The rules themselves (scenario → components, intent keywords, dependencies,
+compatibility pairs, category ecosystems and product tag conflicts) live in a versioned data file, rules.json
+(CARTPILOT_RULES). It is compiled once into a RuleSet; a reload compiles
+the new file off to the side and swaps it in atomically.
 """
 
-from typing import Dict, List, Set, Tuple
+import hashlib
+import json
+import os
+import threading
+import weakref
+from pathlib import Path
+from typing import Any, Dict, FrozenSet, Iterable, Iterator, List, Mapping, Optional, Set, Tuple
+
+from matcher import IntentMatcher
+
+RULES_PATH = Path(os.environ.get("CARTPILOT_RULES", str(Path(__file__).parent / "rules.json")))
+
 
 # ---------------------------------------------------
-# 🔗 PRODUCT DEPENDENCY RULES (Industrial version)
+# 🧮 COMPILED DEPENDENCY CLOSURE
 # ---------------------------------------------------
 
-DEPENDENCY_RULES: Dict[str, List[str]] = {
+class DependencyCycleError(ValueError):
+    """The dependency rules contain a cycle; the message names it."""
 
-    # Electrical diagnostics kit
-    "digital-multimeters": ["safety-goggles", "electrical-insulating-gloves"],
-    "clamp-meters": ["safety-goggles"],
-    "oscilloscopes": ["safety-goggles"],
 
-    # Working at height
-    "fall-protection": ["hard-hats-and-helmets"],
-    "safety-harnesses-for-general-fall-arrest": ["hard-hats-and-helmets"],
+class DependencyClosure:
+    """
+    Dependency rules compiled once: a topological order (dependencies before
+    the components needing them) and, per component, the full transitive
+    closure as a tuple, direct dependencies first. bundle() unions closures
+    for a component list and caches the result.
+    """
 
-    # Fire safety
-    "fire-extinguishers": ["safety-alarms-warning-lights"],
+    def __init__(self, rules: Dict[str, List[str]], bundle_cache: int = 4096):
+        self.rules = rules
+        self.order: List[str] = self._topological_order(rules)
+        self._closure: Dict[str, Tuple[str, ...]] = {}
+        for component in self.order:
+            deps = rules.get(component, [])
+            expanded = list(deps)
+            for dep in deps:
+                expanded.extend(self._closure[dep])
+            self._closure[component] = tuple(dict.fromkeys(expanded))
+        self._bundles: Dict[Tuple[str, ...], Tuple[str, ...]] = {}
+        self._bundle_cache = bundle_cache
 
-    # Tool usage requires PPE
-    "power-drills": ["safety-goggles", "safety-gloves"],
-    "angle-grinders": ["safety-goggles", "hearing-protection"],
-    "circular-saws": ["safety-goggles", "hearing-protection"],
+    @staticmethod
+    def _topological_order(rules: Dict[str, List[str]]) -> List[str]:
+        order: List[str] = []
+        state: Dict[str, int] = {}  # 1 = on the current path, 2 = done
+        for root in rules:
+            if state.get(root) == 2:
+                continue
+            path = [root]
+            stack = [iter(rules.get(root, []))]
+            state[root] = 1
+            while stack:
+                dep = next(stack[-1], None)
+                if dep is None:
+                    stack.pop()
+                    state[path[-1]] = 2
+                    order.append(path.pop())
+                elif state.get(dep) == 1:
+                    cycle = path[path.index(dep):] + [dep]
+                    raise DependencyCycleError("Dependency cycle: " + " -> ".join(cycle))
+                elif state.get(dep) is None:
+                    state[dep] = 1
+                    path.append(dep)
+                    stack.append(iter(rules.get(dep, [])))
+        return order
 
-    # Gas / confined space
-    "portable-gas-detectors": ["full-face-respirators"],
-    "confined-space": ["portable-gas-detectors", "safety-alarms-warning-lights"],
+    def closure(self, component: str) -> Tuple[str, ...]:
+        return self._closure.get(component, ())
 
-    # Security systems dependencies
-    "video-surveillance": ["video-surveillance-monitors"],
-    "keyless-access-locksets": ["locks"],
-}
+    def bundle(self, components: Iterable[str]) -> Tuple[str, ...]:
+        """Every dependency of components, transitively, in first-seen order."""
+        key = tuple(components)
+        bundle = self._bundles.get(key)
+        if bundle is None:
+            bundle = tuple(dict.fromkeys(dep for component in key for dep in self.closure(component)))
+            if len(self._bundles) >= self._bundle_cache:
+                self._bundles.clear()
+            self._bundles[key] = bundle
+        return bundle
 
 # ---------------------------------------------------
-# 🤝 COMPATIBILITY RULES
+# 🧩 COMPILED COMPATIBILITY INDEX
 # ---------------------------------------------------
 
-COMPATIBILITY_RULES: Dict[Tuple[str, str], bool] = {
+class CompatibilityIndex:
+    """
+    Compatibility rules compiled once into bitsets. Every component named in
+    a rule or ecosystem gets a bit; conflicts[c] has the bit of every b for
+    which check_compatibility(c, b) is False (same (c, b)-then-(b, c) rule
+    precedence). issues() checks a whole cart with one OR over its
+    components and one AND per component, so only the conflicting pairs are
+    ever materialized. ecosystems_of is the reverse component → ecosystem
+    index.
+    """
+
+    def __init__(self, rules: Dict[Tuple[str, str], bool], ecosystems: Dict[str, Set[str]]):
+        self.rules = rules
+        names = dict.fromkeys(c for pair in rules for c in pair)
+        for members in ecosystems.values():
+            names.update(dict.fromkeys(sorted(members)))
+        self.bit: Dict[str, int] = {name: 1 << i for i, name in enumerate(names)}
+
+        self.conflicts: Dict[str, int] = {}
+        for a, b in rules:
+            for first, second in ((a, b), (b, a)):
+                if not rules.get((first, second), rules.get((second, first), True)):
+                    self.conflicts[first] = self.conflicts.get(first, 0) | self.bit[second]
+
+        ecosystems_of: Dict[str, Set[str]] = {}
+        for ecosystem, members in ecosystems.items():
+            for member in members:
+                ecosystems_of.setdefault(member, set()).add(ecosystem)
+        self.ecosystems_of: Dict[str, FrozenSet[str]] = {c: frozenset(e) for c, e in ecosystems_of.items()}
+
+    def compatible(self, component1: str, component2: str) -> bool:
+        return not self.conflicts.get(component1, 0) & self.bit.get(component2, 0)
+
+    def shared_ecosystems(self, component1: str, component2: str) -> FrozenSet[str]:
+        return self.ecosystems_of.get(component1, frozenset()) & self.ecosystems_of.get(component2, frozenset())
+
+    def issues(self, components: List[str]) -> List[Tuple[str, str]]:
+        """Ordered incompatible pairs within components, in cart order."""
+        mask = 0
+        for component in components:
+            mask |= self.bit.get(component, 0)
+        pairs = []
+        for component in components:
+            hits = self.conflicts.get(component, 0) & mask
+            if hits:
+                pairs.extend(
+                    (component, other) for other in components
+                    if other != component and hits & self.bit.get(other, 0)
+                )
+        return pairs
+
+    def pair_issues(self, components: List[str]) -> List[Tuple[str, str]]:
+        """Incompatible (components[i], components[j]) for every i < j, in cart order."""
+        mask = 0
+        for component in components:
+            mask |= self.bit.get(component, 0)
+        pairs = []
+        for i, component in enumerate(components):
+            hits = self.conflicts.get(component, 0) & mask
+            if hits:
+                pairs.extend(
+                    (component, other) for other in components[i + 1:] if hits & self.bit.get(other, 0)
+                )
+        return pairs
+
+    def matrix(self, components: List[str]) -> "CompatibilityMatrix":
+        return CompatibilityMatrix(self, components)
 
-    # Positive compatibilities
-    ("power-drills", "safety-goggles"): True,
-    ("angle-grinders", "hearing-protection"): True,
-    ("fall-protection", "hard-hats-and-helmets"): True,
-    ("video-surveillance", "security-alarms-warnings"): True,
-    ("digital-multimeters", "clamp-meters"): True,
 
-    # Incompatibilities (realistic safety conflicts)
-    ("flammable_environment", "angle-grinders"): False,
-    ("confined-space", "no_gas_detector"): False,
-}
+class CompatibilityMatrix(Mapping):
+    """Read-only component → {other: compatible} view, rows built on access."""
+
+    def __init__(self, index: CompatibilityIndex, components: List[str]):
+        self._index = index
+        self._components = dict.fromkeys(components)
+
+    def __getitem__(self, component: str) -> Dict[str, bool]:
+        if component not in self._components:
+            raise KeyError(component)
+        return {
+            other: self._index.compatible(component, other)
+            for other in self._components if other != component
+        }
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._components)
+
+    def __len__(self) -> int:
+        return len(self._components)
 
 # ---------------------------------------------------
-# 🏭 CATEGORY ECOSYSTEMS
+# 🏷️ COMPILED TAG CONFLICTS
 # ---------------------------------------------------
 
-CATEGORY_COMPATIBILITY: Dict[str, Set[str]] = {
-    "ppe_ecosystem": {
-        "hard-hats-and-helmets",
-        "safety-gloves",
-        "safety-goggles",
-        "hearing-protection",
-        "full-face-respirators",
-        "fall-protection",
-    },
-    "tool_ecosystem": {
-        "power-drills",
-        "angle-grinders",
-        "circular-saws",
-        "hammers",
-        "pliers",
-        "wrenches",
-        "screwdrivers",
-    },
-    "security_ecosystem": {
-        "video-surveillance",
-        "security-alarms-warnings",
-        "keyless-access-locksets",
-        "locks",
-        "security-safes",
-    },
-    "testing_ecosystem": {
-        "digital-multimeters",
-        "clamp-meters",
-        "oscilloscopes",
-        "thermal-cameras",
-        "infrared-thermometers",
-        "air-quality-sensors",
-    }
-}
+class TagConflictIndex:
+    """
+    Product tag conflicts compiled once into bitsets for the cart solver.
+    Every tag named in a conflict gets a bit; conflicts[t] has the bit of
+    every tag that may not share a cart with t. Tags outside the index only
+    get a bit when a request requires or forbids them.
+    """
+
+    def __init__(self, pairs: Iterable[Tuple[str, str]]):
+        self.pairs: List[Tuple[str, str]] = [tuple(pair) for pair in pairs]
+        if any(len(pair) != 2 for pair in self.pairs):
+            raise ValueError("tag conflicts must name exactly two tags")
+        self.bit: Dict[str, int] = {}
+        for tag in (t for pair in self.pairs for t in pair):
+            self.bit.setdefault(tag, 1 << len(self.bit))
+        self.conflicts: Dict[str, int] = {}
+        for a, b in self.pairs:
+            self.conflicts[a] = self.conflicts.get(a, 0) | self.bit[b]
+            self.conflicts[b] = self.conflicts.get(b, 0) | self.bit[a]
 
 # ---------------------------------------------------
-# 🧠 FUNCTIONS (UNCHANGED ARCHITECTURE)
+# 📜 RULE SETS
+# ---------------------------------------------------
+
+class RuleSet:
+    """
+    One compiled version of the rules data file. version is the file's
+    declared version plus a content hash, so an edit that forgets to bump
+    the declared version still gets a new stamp.
+    """
+
+    def __init__(self, data: Dict[str, Any], digest: str):
+        self.version = f"{data['version']}+{digest[:8]}"
+        self.scenarios: Dict[str, List[str]] = {k: list(v) for k, v in data["scenarios"].items()}
+        # Intent keywords, in priority order (earlier scenarios win ties)
+        self.intent_keywords: List[Tuple[str, List[str]]] = [
+            (k, list(v)) for k, v in data["intent_keywords"].items()
+        ]
+        if any(not isinstance(word, str) for _, words in self.intent_keywords for word in words):
+            raise ValueError("intent keywords must be lists of strings")
+        self.default_scenario: str = data["default_scenario"]
+        self.dependency_rules: Dict[str, List[str]] = {k: list(v) for k, v in data["dependencies"].items()}
+        if any(not isinstance(rule["compatible"], bool) for rule in data["compatibility"]):
+            raise ValueError("compatibility rules need a true/false \"compatible\"")
+        self.compatibility_rules: Dict[Tuple[str, str], bool] = {
+            tuple(rule["components"]): rule["compatible"] for rule in data["compatibility"]
+        }
+        if any(len(pair) != 2 for pair in self.compatibility_rules):
+            raise ValueError("compatibility rules must name exactly two components")
+        self.ecosystems: Dict[str, Set[str]] = {k: set(v) for k, v in data["ecosystems"].items()}
+        # Product tags that may not appear together in one cart (enforced by the solver)
+        self.tag_index = TagConflictIndex(data.get("tag_conflicts", []))
+        self.tag_conflicts: List[Tuple[str, str]] = self.tag_index.pairs
+
+        # Compiled once per version; a dependency cycle rejects the whole file
+        self.dependencies = DependencyClosure(self.dependency_rules)
+        self.compatibility = CompatibilityIndex(self.compatibility_rules, self.ecosystems)
+        self.intent_matcher = IntentMatcher(self.intent_keywords)
+
+    def components(self) -> List[str]:
+        """Every component the rules mention."""
+        components = set(self.dependency_rules)
+        for planned in self.scenarios.values():
+            components.update(planned)
+        for deps in self.dependency_rules.values():
+            components.update(deps)
+        for members in self.ecosystems.values():
+            components.update(members)
+        return sorted(components)
+
+
+def load_rules(path: Optional[Path] = None) -> RuleSet:
+    """Read and compile a rules file. Raises ValueError on a malformed or cyclic file."""
+    raw = Path(path or RULES_PATH).read_bytes()
+    try:
+        data = json.loads(raw)
+        return RuleSet(data, hashlib.sha256(raw).hexdigest())
+    except (KeyError, TypeError, AttributeError, UnicodeDecodeError) as e:
+        raise ValueError(f"invalid rules file: {type(e).__name__}: {e}") from e
+
+
 # ---------------------------------------------------
+# 🔄 PROCESS-WIDE RULE SET AND HOT RELOAD
+# ---------------------------------------------------
+
+_rules: Optional[RuleSet] = None
+_rules_lock = threading.Lock()
+
+# Rule sets still referenced by in-flight requests, keyed by version
+_rule_snapshots: "weakref.WeakValueDictionary[str, RuleSet]" = weakref.WeakValueDictionary()
+
+
+def get_rules(version: Optional[str] = None) -> RuleSet:
+    """
+    Return the current rule set, compiling it on first use. If version names
+    a rule set still pinned by a request, that one is returned instead.
+    """
+    global _rules
+    if version is not None:
+        pinned = _rule_snapshots.get(version)
+        if pinned is not None:
+            return pinned
+    if _rules is None:
+        with _rules_lock:
+            if _rules is None:
+                _rules = load_rules()
+                _rule_snapshots[_rules.version] = _rules
+    return _rules
+
+
+def set_rules(rules: Optional[RuleSet]) -> None:
+    """Atomically replace the current rule set (None forces a reload on next use)."""
+    global _rules
+    with _rules_lock:
+        if rules is not None:
+            _rule_snapshots[rules.version] = rules
+        _rules = rules
+
+
+def reload_rules(path: Optional[Path] = None) -> RuleSet:
+    """Compile the rules file and swap it in; the current set stays if it fails."""
+    rules = load_rules(path)
+    set_rules(rules)
+    return rules
 
-def get_dependencies(component: str) -> List[str]:
-    return DEPENDENCY_RULES.get(component, [])
 
+class RulesWatcher:
+    """Polls the rules file and swaps in a freshly compiled rule set on change."""
 
-def check_compatibility(component1: str, component2: str) -> bool:
+    def __init__(self, path: Optional[Path] = None, interval: float = 2.0):
+        self.path = Path(path or RULES_PATH)
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._stamp = self._file_stamp()
 
-    if (component1, component2) in COMPATIBILITY_RULES:
-        return COMPATIBILITY_RULES[(component1, component2)]
-    if (component2, component1) in COMPATIBILITY_RULES:
-        return COMPATIBILITY_RULES[(component2, component1)]
+    def _file_stamp(self):
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
 
-    # ecosystem compatibility
-    for category, components in CATEGORY_COMPATIBILITY.items():
-        if component1 in components and component2 in components:
-            return True
+    def check(self) -> bool:
+        """Reload if the file changed since the last check. Returns True on swap."""
+        stamp = self._file_stamp()
+        if stamp is None or stamp == self._stamp:
+            return False
+        try:
+            rules = load_rules(self.path)
+        except (OSError, ValueError) as e:
+            print(f"Warning: rules reload failed ({e}), keeping version {get_rules().version}")
+            return False
+        self._stamp = stamp
+        if _rules is not None and rules.version == _rules.version:
+            return False
+        set_rules(rules)
+        print(f"Rules reloaded: version {rules.version}")
+        return True
 
-    return True
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.check()
 
+    def start(self) -> "RulesWatcher":
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="rules-watcher", daemon=True)
+            self._thread.start()
+        return self
 
-def validate_component_set(components: List[str]) -> Tuple[List[str], List[Tuple[str, str, str]]]:
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
 
+
+# ---------------------------------------------------
+# 🧠 FUNCTIONS (UNCHANGED ARCHITECTURE)
+# ---------------------------------------------------
+
+def get_dependencies(component: str, rules: Optional[RuleSet] = None) -> List[str]:
+    """Direct dependencies only; see get_all_dependencies for the closure."""
+    return (rules or get_rules()).dependency_rules.get(component, [])
+
+
+def check_compatibility(component1: str, component2: str, rules: Optional[RuleSet] = None) -> bool:
+    # Explicit rules are compiled into the rule set's compatibility index;
+    # components sharing an ecosystem and unknown pairs are compatible
+    return (rules or get_rules()).compatibility.compatible(component1, component2)
+
+
+def validate_component_set(
+    components: List[str], rules: Optional[RuleSet] = None
+) -> Tuple[List[str], List[Tuple[str, str, str]]]:
+
+    rules = rules or get_rules()
     missing_deps = []
     compatibility_issues = []
 
-    # check dependencies
-    all_required = set()
-    for component in components:
-        deps = get_dependencies(component)
-        all_required.update(deps)
-
-    missing_deps = [dep for dep in all_required if dep not in components]
+    # check dependencies (transitively)
+    missing_deps = [dep for dep in rules.dependencies.bundle(components) if dep not in components]
 
-    # check compatibility
-    for i, comp1 in enumerate(components):
-        for comp2 in components[i+1:]:
-            if not check_compatibility(comp1, comp2):
-                compatibility_issues.append((comp1, comp2, "Incompatible components"))
+    # check compatibility: one bitset pass over the whole set, each index pair once
+    for comp1, comp2 in rules.compatibility.pair_issues(components):
+        compatibility_issues.append((comp1, comp2, "Incompatible components"))
 
     return missing_deps, compatibility_issues
 
 
-def get_all_dependencies(components: List[str]) -> Dict[str, List[str]]:
+def get_all_dependencies(components: List[str], rules: Optional[RuleSet] = None) -> Dict[str, List[str]]:
+    """Each component's transitive dependencies, direct ones first."""
+    rules = rules or get_rules()
     result = {}
     for component in components:
-        result[component] = get_dependencies(component)
+        result[component] = list(rules.dependencies.closure(component))
     return result
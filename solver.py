@@ -0,0 +1,168 @@
+"""
+Product-level cart solver.
+
+Picks one product per component from its candidates (the selected product
+plus ranked alternatives) to minimize the cart total, optionally under a
+budget, subject to tag constraints:
+
+- forbidden_tags: no chosen product may carry any of them
+- required_tags: the cart as a whole must carry all of them
+- tag_conflicts: pairs of tags that may not both appear in the cart
+
+Tags are compiled to bits, so each product is one int mask plus the mask of
+tags it conflicts with, and every feasibility check is a bitwise AND. The
+conflict bits are compiled once per rules version (rules.TagConflictIndex);
+only tags a request requires or forbids are added per call, and product tags
+that none of these mention are ignored.
+Search is depth-first branch-and-bound (fewest candidates first, cheapest
+first). Each node forward-checks the remaining components against the tags
+chosen so far: it is pruned when one of them has no compatible product left,
+when the cheapest compatible completion cannot beat the best cart, or when
+they can no longer cover the required tags. A hard time limit
+stops the search and returns the best cart found so far.
+"""
+import time
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+from rules import TagConflictIndex
+
+
+class _TimeUp(Exception):
+    pass
+
+
+def solve(
+    candidates: Dict[str, Sequence[Dict[str, Any]]],
+    budget: Optional[float] = None,
+    required_tags: Iterable[str] = (),
+    forbidden_tags: Iterable[str] = (),
+    tag_conflicts: Union[TagConflictIndex, Iterable[Tuple[str, str]]] = (),
+    time_limit: float = 0.05,
+) -> Dict[str, Any]:
+    """
+    Returns {"choice": component -> product, "total", "feasible", "optimal",
+    "nodes", "elapsed_ms", "reason"}. optimal is False when the time limit
+    cut the search short; choice is then the best cart found so far (empty
+    if none was found). tag_conflicts is a compiled TagConflictIndex or
+    the raw pairs.
+    """
+    start = time.perf_counter()
+    deadline = start + time_limit
+    required_tags, forbidden_tags = list(required_tags), list(forbidden_tags)
+    if not isinstance(tag_conflicts, TagConflictIndex):
+        tag_conflicts = TagConflictIndex(tag_conflicts)
+
+    bit = tag_conflicts.bit
+    extra = [tag for tag in dict.fromkeys([*required_tags, *forbidden_tags]) if tag not in bit]
+    if extra:
+        bit = dict(bit)
+        for tag in extra:
+            bit[tag] = 1 << len(bit)
+    conflicts = tag_conflicts.conflicts
+
+    def masks(product: Dict[str, Any]) -> Tuple[int, int]:
+        mask = excludes = 0
+        for tag in product.get("compatibility_tags", []):
+            mask |= bit.get(tag, 0)
+            excludes |= conflicts.get(tag, 0)
+        return mask, excludes
+
+    forbidden = 0
+    for tag in forbidden_tags:
+        forbidden |= bit[tag]
+    required = 0
+    for tag in required_tags:
+        required |= bit[tag]
+
+    # Per component: feasible-alone candidates as (price, mask, excludes, product), cheapest first
+    options: List[Tuple[str, List[Tuple[float, int, int, Dict[str, Any]]]]] = []
+    for component, products in candidates.items():
+        usable = []
+        for product in products:
+            mask, excludes = masks(product)
+            if not mask & forbidden and not mask & excludes:
+                usable.append((float(product.get("price", 0.0)), mask, excludes, product))
+        if not usable:
+            return _result({}, None, False, True, 0, start, f"no allowed product for {component}")
+        usable.sort(key=lambda option: option[0])
+        options.append((component, usable))
+    options.sort(key=lambda entry: len(entry[1]))
+
+    n = len(options)
+    cover_all = 0
+    for _, usable in options:
+        for _, mask, _, _ in usable:
+            cover_all |= mask
+    if required & ~cover_all:
+        missing = sorted(tag for tag, b in bit.items() if b & required & ~cover_all)
+        return _result({}, None, False, True, 0, start, f"no candidate carries {', '.join(missing)}")
+
+    # Anything over budget is pruned exactly like anything over the incumbent
+    best = {"cost": budget + 1e-9 if budget is not None else float("inf"), "picks": None}
+    picks: List[int] = [0] * n
+    nodes = 0
+
+    def search(i: int, cost: float, union: int, excluded: int) -> None:
+        nonlocal nodes
+        if i == n:
+            if required & ~union:
+                return
+            best["cost"], best["picks"] = cost, list(picks)
+            return
+        if time.perf_counter() > deadline:
+            raise _TimeUp
+        # Forward check: the cheapest product each remaining component can still
+        # take, and which tags the remaining components can still bring
+        floor: List[float] = []
+        cover = 0
+        for _, usable in options[i:]:
+            cheapest = None
+            for price, mask, excludes, _ in usable:
+                if not mask & excluded and not excludes & union:
+                    if cheapest is None:
+                        cheapest = price
+                    cover |= mask
+            if cheapest is None:
+                return
+            floor.append(cheapest)
+        if required & ~(union | cover) or cost + sum(floor) >= best["cost"]:
+            return
+        rest = sum(floor) - floor[0]
+        for j, (price, mask, excludes, _) in enumerate(options[i][1]):
+            nodes += 1
+            total = cost + price
+            if total + rest >= best["cost"]:
+                break  # candidates are sorted by price: the rest are no better
+            if mask & excluded or excludes & union:
+                continue
+            picks[i] = j
+            search(i + 1, total, union | mask, excluded | excludes)
+
+    optimal = True
+    try:
+        search(0, 0.0, 0, 0)
+    except _TimeUp:
+        optimal = False
+
+    if best["picks"] is None:
+        reason = "time limit reached before a feasible cart was found" if not optimal else (
+            f"no cart within budget {budget:.2f}" if budget is not None else "constraints cannot be met together"
+        )
+        return _result({}, None, False, optimal, nodes, start, reason)
+
+    choice = {component: opts[j][3] for (component, opts), j in zip(options, best["picks"])}
+    # Report in the caller's component order
+    choice = {component: choice[component] for component in candidates}
+    return _result(choice, best["cost"], True, optimal, nodes, start, "")
+
+
+def _result(choice, total, feasible, optimal, nodes, start, reason) -> Dict[str, Any]:
+    return {
+        "choice": choice,
+        "total": round(total, 2) if total is not None else None,
+        "feasible": feasible,
+        "optimal": optimal,
+        "nodes": nodes,
+        "elapsed_ms": round((time.perf_counter() - start) * 1000, 3),
+        "reason": reason,
+    }
@@ -1,8 +1,9 @@
 """
 Shared state definition for CartPilot multi-agent system.
-Uses TypedDict for LangGraph state management.
+Uses TypedDict for LangGraph state management; agents return partial
+updates of it (see executor.py).
 """
-from typing import TypedDict, List, Dict, Optional, Any
+from typing import TypedDict, List, Dict, Mapping, Optional, Any
 
 
 class CartPilotState(TypedDict):
@@ -10,6 +11,9 @@ class CartPilotState(TypedDict):
     
     # Input
     user_goal: str
+    catalog_version: str  # catalog snapshot pinned for this request
+    rules_version: str  # rule set pinned for this request
+    constraints: Dict[str, Any]  # {budget, required_tags, forbidden_tags}; empty = cheapest first match
     
     # Intent Agent output
     parsed_intent: Dict[str, Any]  # {category, use_case, constraints}
@@ -22,15 +26,19 @@ class CartPilotState(TypedDict):
     missing_dependencies: List[str]
     
     # Compatibility Agent output
-    compatibility_matrix: Dict[str, Dict[str, bool]]  # component -> {other_component: compatible}
+    compatibility_matrix: Mapping[str, Dict[str, bool]]  # component -> {other_component: compatible}, rows built lazily
     compatibility_issues: List[Dict[str, str]]  # [{component1, component2, issue}]
     
     # Product Selection Agent output
     selected_products: Dict[str, Dict[str, Any]]  # component -> product_data
-    product_alternatives: Dict[str, List[Dict[str, Any]]]  # component -> [alternatives]
+    product_alternatives: Dict[str, List[Dict[str, Any]]]  # component -> top-k [alternatives]
+    alternatives_cursor: Dict[str, Optional[str]]  # component -> cursor for further alternatives
+    shard_timings: Dict[str, float]  # vendor -> catalog lookup ms
+    solver: Dict[str, Any]  # solver outcome when constraints applied (feasible, optimal, nodes, ...)
     
     # Cart Composer output
     final_cart: List[Dict[str, Any]]  # Complete cart items
+    total_price: float
     completeness_score: float  # 0.0 - 1.0
     cart_summary: str
     validation_errors: List[str]
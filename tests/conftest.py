@@ -0,0 +1,37 @@
+"""
+Shared fixtures. The modules live at the repository root, so it goes on
+sys.path; test_api.py there is a manual script and is not collected.
+"""
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+
+@pytest.fixture(scope="session")
+def products():
+    """A few thousand synthetic catalog rows, ~5% matching known components."""
+    from benchmarks.common import synthetic_products
+
+    return synthetic_products(4_000)
+
+
+@pytest.fixture
+def resident_catalog():
+    """Restores the process-wide catalog snapshot after the test."""
+    import catalog
+
+    yield catalog
+    catalog.set_catalog(None)
+
+
+@pytest.fixture
+def resident_rules():
+    """Restores the process-wide rule set after the test."""
+    import rules
+
+    yield rules
+    rules.set_rules(None)
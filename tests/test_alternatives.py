@@ -0,0 +1,121 @@
+"""
+Bounded alternatives: the top-k and every cursor page agree with a full
+sort of all matches, and malformed cursors are rejected.
+"""
+import base64
+import json
+import os
+import random
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+import catalog as catalog_module
+from catalog import Catalog, ShardedCatalog, encode_cursor, equivalence_key, fan_out, merge_offers, ranked_alternatives
+
+COMPONENT = "wrenches"
+
+
+@pytest.fixture(scope="module")
+def sharded():
+    rng = random.Random(0)
+    shards = {}
+    for v in range(3):
+        # Few distinct prices and shared names: ties and cross-vendor duplicates are common
+        products = [{"id": f"wrenches-{v}-{i}", "name": f"Wrench {rng.randrange(40)}", "price": rng.choice([5.0, 7.5, 9.0, 12.0]),
+                     "category": "tools", "specs": {}, "compatibility_tags": []} for i in range(150)]
+        shards[f"vendor{v}"] = Catalog(products, vendor=f"vendor{v}", version=str(v))
+    return ShardedCatalog(shards)
+
+
+@pytest.fixture(scope="module")
+def offers(sharded):
+    found, _ = fan_out(sharded, [COMPONENT])
+    return [(vendor, matches[COMPONENT]) for vendor, matches in found.items()]
+
+
+def full_sort(offers, sign=1.0):
+    """Every match ranked by (price, vendor, position), minus the selection and repeated items."""
+    selected_vendor, selected = min(((v, m[0]) for v, m in offers), key=lambda offer: offer[1]["price"])
+    ranked = sorted((sign * p["price"], v, i) for v, m in offers for i, p in enumerate(m))
+    seen, result = {equivalence_key(selected)}, []
+    for _, vendor, i in ranked:
+        product = dict(dict(offers)[vendor][i], vendor=vendor)
+        if (vendor, i) == (selected_vendor, 0) or equivalence_key(product) in seen:
+            continue
+        seen.add(equivalence_key(product))
+        result.append(product)
+    return result
+
+
+def test_top_k_matches_full_sort(offers):
+    expected = full_sort(offers)
+    for k in (1, 5, len(expected), len(expected) + 1):
+        _, alternatives, more = merge_offers(offers, k=k)
+        assert alternatives == expected[:k]
+        assert more == (len(expected) > k)
+
+
+def test_descending_rank_matches_full_sort(offers):
+    assert list(ranked_alternatives(offers, "-price")) == full_sort(offers, sign=-1.0)
+
+
+def test_cursor_pages_cover_the_rest(sharded, offers, resident_catalog):
+    resident_catalog.set_catalog(sharded)
+    import api
+
+    client = TestClient(api.app)
+    expected = full_sort(offers)
+    pages, cursor = [], encode_cursor(sharded.version, COMPONENT, 5)
+    while cursor:
+        response = client.get("/alternatives", params={"cursor": cursor, "limit": 7})
+        assert response.status_code == 200
+        pages.extend(response.json()["alternatives"])
+        cursor = response.json()["next_cursor"]
+    assert pages == expected[5:]
+
+
+def raw_cursor(**fields):
+    data = json.dumps(fields).encode("utf-8")
+    return base64.urlsafe_b64encode(data).decode("ascii").rstrip("=")
+
+
+def test_bad_cursors_are_rejected(sharded, resident_catalog):
+    resident_catalog.set_catalog(sharded)
+    import api
+
+    client = TestClient(api.app)
+    version = sharded.version
+    for cursor, status in [
+        ("not a cursor", 400),
+        (raw_cursor(v=version, c=COMPONENT, o=-1, r="price"), 400),
+        (raw_cursor(v=version, c=COMPONENT, o="x", r="price"), 400),
+        (raw_cursor(v=version, c=COMPONENT, o=0, r="name"), 400),
+        (raw_cursor(v=version, c=COMPONENT, o=0), 400),
+        (raw_cursor(v=version, c=COMPONENT, o=0, r="price", s=["vendor9", 0]), 400),
+        (raw_cursor(v=version, c=COMPONENT, o=0, r="price", s=["vendor0", 10_000]), 400),
+        (raw_cursor(v=version, c=COMPONENT, o=0, r="price", s=["vendor0"]), 400),
+        (raw_cursor(v="stale", c=COMPONENT, o=0, r="price"), 410),
+    ]:
+        assert client.get("/alternatives", params={"cursor": cursor}).status_code == status, cursor
+
+
+def test_unrankable_default_fails_at_import():
+    env = dict(os.environ, CARTPILOT_ALTERNATIVES_RANK="name")
+    result = subprocess.run(
+        [sys.executable, "-c", "import catalog"],
+        cwd=Path(catalog_module.__file__).parent, env=env, capture_output=True, text=True,
+    )
+    assert result.returncode != 0 and "cannot rank by 'name'" in result.stderr
+
+
+def test_scanned_components_are_bounded(products, monkeypatch):
+    monkeypatch.setattr(catalog_module, "SCAN_CACHE_SIZE", 3)
+    catalog = Catalog(products, components=[])
+    for i in range(10):
+        catalog.find(f"crafted-{i}")
+    catalog.find("crafted-8")
+    assert list(catalog._scanned) == ["crafted-7", "crafted-9", "crafted-8"]
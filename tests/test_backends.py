@@ -0,0 +1,75 @@
+"""
+Backend parity: every catalog backend answers lookups, product reads and
+filters exactly like the in-memory Catalog built from the same rows.
+"""
+import pytest
+
+from catalog import Catalog, default_components, load_catalog
+from catalog_compiler import write_compiled
+from catalog_sqlite import SQLiteCatalog, build_sqlite_catalog
+
+EXTRA_ROWS = [
+    {"id": "digital-multimeters?ünïcode=1", "name": "Multímetro ✓", "price": 12.5, "category": "test_instruments",
+     "specs": {"range": {"v": 600}}, "compatibility_tags": ["testing"]},
+    {"id": "locks-with-extras", "name": "Lock", "price": 0.0, "category": "", "specs": {},
+     "compatibility_tags": [], "mpn": "L-1", "vendor_url": "https://example.com/l-1"},
+]
+LOOKUPS = ["sku-0000012", "-item", "ünïcode", "ab", "no-such-component"]
+
+
+def build_compiled(rows, path):
+    target = path / "catalog.bin"
+    write_compiled(Catalog(rows, version="v1"), target)
+    return load_catalog(target)
+
+
+def build_sqlite(rows, path):
+    target = path / "catalog.db"
+    build_sqlite_catalog(rows, target, version="v1")
+    return load_catalog(target)
+
+
+BACKENDS = {"compiled": build_compiled, "sqlite": build_sqlite}
+
+
+@pytest.fixture(scope="module")
+def rows(products):
+    return products + EXTRA_ROWS
+
+
+@pytest.fixture(scope="module")
+def reference(rows):
+    return Catalog(rows, version="v1")
+
+
+@pytest.fixture(scope="module", params=sorted(BACKENDS))
+def backend(request, rows, tmp_path_factory):
+    return BACKENDS[request.param](rows, tmp_path_factory.mktemp(request.param))
+
+
+def test_metadata(backend, reference):
+    assert (len(backend), backend.vendor, backend.version) == (len(reference), reference.vendor, reference.version)
+
+
+def test_products(backend, rows):
+    assert list(backend.products) == rows
+
+
+def test_find(backend, reference):
+    for component in default_components() + LOOKUPS:
+        assert backend.rows(component).tolist() == reference.rows(component).tolist(), component
+        assert list(backend.find(component)[:3]) == list(reference.find(component)[:3])
+
+
+def test_filter(backend, reference):
+    for kwargs in [{"category": "tools", "max_price": 100.0}, {"min_price": 200.0}, {"category": "nope"}, {}]:
+        assert backend.filter(**kwargs).tolist() == reference.filter(**kwargs).tolist(), kwargs
+
+
+def test_sqlite_row_cache_is_bounded(rows, tmp_path):
+    target = tmp_path / "catalog.db"
+    build_sqlite_catalog(rows, target)
+    catalog = SQLiteCatalog(target, cache_size=2)
+    for component in ["locks", "respirators", "wrenches", "locks"]:
+        catalog.rows(component)
+    assert list(catalog._cache) == ["wrenches", "locks"]
@@ -0,0 +1,83 @@
+"""
+Bulk cart validation against validate_component_set run cart by cart,
+across block boundaries, and through the /validate-carts endpoint.
+"""
+import json
+import random
+
+import pytest
+from fastapi.testclient import TestClient
+
+import bulk_validation
+from bulk_validation import get_rule_matrices, validate_carts
+from rules import RULES_PATH, RuleSet, get_rules, validate_component_set
+
+
+@pytest.fixture(scope="module")
+def rules():
+    """The shipped rules plus random conflicts, so many carts have issues."""
+    rng = random.Random(0)
+    components = get_rules().components()
+    data = json.loads(RULES_PATH.read_text())
+    data["compatibility"] += [{"components": rng.sample(components, 2), "compatible": False} for _ in range(40)]
+    return RuleSet(data, "test")
+
+
+def random_carts(rules, count, seed=0):
+    rng = random.Random(seed)
+    names = rules.components() + ["unknown-widget"]
+    carts = []
+    for _ in range(count):
+        cart = rng.sample(names, rng.randint(0, 12))
+        if cart and rng.random() < 0.3:
+            cart.insert(rng.randrange(len(cart) + 1), rng.choice(cart))  # duplicated component
+        carts.append(cart)
+    return carts
+
+
+def expected(cart, rules):
+    missing, issues = validate_component_set(cart, rules)
+    return sorted(missing), issues
+
+
+def test_bulk_matches_single_cart_validation(rules):
+    carts = random_carts(rules, 2_000)
+    results = validate_carts(carts, rules)
+    assert len(results) == len(carts)
+    assert sum(1 for r in results if r["compatibility_issues"]) > 100
+    for cart, result in zip(carts, results):
+        assert (sorted(result["missing_dependencies"]), result["compatibility_issues"]) == expected(cart, rules), cart
+
+
+def test_missing_dependencies_follow_dependency_order(rules):
+    order = {name: i for i, name in enumerate(get_rule_matrices(rules).components)}
+    for result in validate_carts(random_carts(rules, 500, seed=1), rules):
+        positions = [order[dep] for dep in result["missing_dependencies"]]
+        assert positions == sorted(positions)
+
+
+def test_results_do_not_depend_on_block_size(rules, monkeypatch):
+    carts = random_carts(rules, 300, seed=2)
+    full = validate_carts(carts, rules)
+    monkeypatch.setattr(bulk_validation, "BLOCK", 7)
+    assert validate_carts(carts, rules) == full
+    assert validate_carts([], rules) == []
+
+
+def test_matrices_are_compiled_once_per_rule_set(rules):
+    assert get_rule_matrices(rules) is get_rule_matrices(rules)
+    assert get_rule_matrices(rules) is not get_rule_matrices(get_rules())
+
+
+def test_validate_carts_endpoint():
+    import api
+
+    carts = random_carts(get_rules(), 50, seed=3)
+    response = TestClient(api.app).post("/validate-carts", json={"carts": carts})
+    assert response.status_code == 200
+    body = response.json()
+    assert body["rules_version"] == get_rules().version
+    for cart, result in zip(carts, body["results"]):
+        missing, issues = expected(cart, get_rules())
+        assert sorted(result["missing_dependencies"]) == missing
+        assert [tuple(issue) for issue in result["compatibility_issues"]] == issues
@@ -0,0 +1,115 @@
+"""
+Resident catalog: indexed lookups agree with a linear scan of the ids, the
+process-wide snapshot is loaded once, and reloads swap it atomically.
+"""
+import json
+
+from catalog import Catalog, CatalogWatcher, default_components, get_catalog, load_catalog
+
+
+def scan(products, component):
+    return [p for p in products if component in p["id"].lower()]
+
+
+def test_find_matches_linear_scan(products):
+    catalog = Catalog(products)
+    for component in default_components():
+        assert list(catalog.find(component)) == scan(products, component)
+
+
+def test_unindexed_component_is_scanned(products):
+    catalog = Catalog(products, components=[])
+    assert list(catalog.find("sku-0000012")) == scan(products, "sku-0000012")
+    assert list(catalog.find("no-such-component")) == []
+
+
+def test_lookup_is_case_insensitive(products):
+    catalog = Catalog(products)
+    assert list(catalog.find("SAFETY-GOGGLES")) == list(catalog.find("safety-goggles"))
+
+
+def test_snapshot_is_loaded_once(products, resident_catalog):
+    catalog = Catalog(products, version="test")
+    resident_catalog.set_catalog(catalog)
+    assert get_catalog() is catalog
+    assert get_catalog() is get_catalog()
+
+
+# ---------------------------------------------------
+# Hot reload
+# ---------------------------------------------------
+
+def write_catalog(path, products):
+    path.write_text(json.dumps({"products": {"grainger": products}}))
+
+
+def test_watcher_swaps_snapshot_and_keeps_pinned_one(tmp_path, products, resident_catalog):
+    path = tmp_path / "catalog.json"
+    write_catalog(path, products[:100])
+    old = load_catalog(path)
+    resident_catalog.set_catalog(old)
+    watcher = CatalogWatcher([path])
+
+    assert not watcher.check()
+    write_catalog(path, products[:200])
+    assert watcher.check()
+    new = get_catalog()
+    assert new.version != old.version and len(new) == 200
+    # A request that pinned the old version keeps reading it
+    assert get_catalog(old.version) is old
+
+
+def test_watcher_keeps_snapshot_on_bad_file(tmp_path, products, resident_catalog):
+    path = tmp_path / "catalog.json"
+    write_catalog(path, products[:100])
+    current = load_catalog(path)
+    resident_catalog.set_catalog(current)
+    watcher = CatalogWatcher([path])
+
+    path.write_text('{"products": {"grainger": [')
+    assert not watcher.check()
+    assert get_catalog() is current
+
+
+def test_api_starts_without_catalog_file(tmp_path, monkeypatch, resident_catalog):
+    import api
+
+    resident_catalog.set_catalog(None)
+    monkeypatch.setattr(resident_catalog, "CATALOG_PATHS", [tmp_path / "missing.json"])
+    api.start_catalog()
+    api.stop_catalog()
+
+
+# ---------------------------------------------------
+# Columnar storage
+# ---------------------------------------------------
+
+def test_products_round_trip(products):
+    rows = products[:50] + [
+        {"id": "nested-specs", "name": "N", "price": 1.5, "category": "tools",
+         "specs": {"size": {"w": 1, "h": 2}}, "compatibility_tags": ["a"]},
+        {"id": "extra-fields", "name": "E", "price": 0.0, "category": "", "specs": {},
+         "compatibility_tags": [], "mpn": "X-1", "vendor_url": "https://example.com"},
+    ]
+    catalog = Catalog(rows, components=[])
+    assert list(catalog.products) == rows
+
+
+def test_products_are_copies(products):
+    catalog = Catalog(products[:10], components=[])
+    product = catalog.product(0)
+    product["specs"]["changed"] = True
+    product["compatibility_tags"].append("changed")
+    assert catalog.product(0) == products[0]
+
+
+def test_filter_matches_naive(products):
+    catalog = Catalog(products, components=[])
+    for category, low, high in [("tools", None, 100.0), ("safety", 40.0, None), (None, 60.0, 260.0), ("nope", None, None)]:
+        expected = [
+            i for i, p in enumerate(products)
+            if (category is None or p["category"] == category)
+            and (low is None or p["price"] >= low)
+            and (high is None or p["price"] <= high)
+        ]
+        assert catalog.filter(category=category, min_price=low, max_price=high).tolist() == expected
@@ -0,0 +1,66 @@
+"""
+Compiled dependency closures: closures and bundles against a naive
+depth-first walk on random DAGs, topological order, and cycle detection.
+"""
+import random
+
+import pytest
+
+from rules import DependencyClosure, DependencyCycleError, get_all_dependencies
+
+
+def random_dag(rng, n, fan_out=3):
+    names = [f"component-{i}" for i in range(n)]
+    rng.shuffle(names)
+    # Each component depends on a few later ones, so the graph is acyclic
+    return {
+        name: rng.sample(names[i + 1:], min(rng.randint(0, fan_out), n - i - 1))
+        for i, name in enumerate(names) if rng.random() < 0.7
+    }
+
+
+def walk(rules, components):
+    seen, stack = set(), list(components)
+    while stack:
+        for dep in rules.get(stack.pop(), []):
+            if dep not in seen:
+                seen.add(dep)
+                stack.append(dep)
+    return seen
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_closures_match_naive_walk(seed):
+    rng = random.Random(seed)
+    rules = random_dag(rng, 200)
+    closure = DependencyClosure(rules)
+    for component in rules:
+        deps = closure.closure(component)
+        assert len(deps) == len(set(deps)) and set(deps) == walk(rules, [component])
+        assert list(deps[:len(rules[component])]) == list(dict.fromkeys(rules[component]))
+    for _ in range(50):
+        cart = rng.sample(sorted(rules), 4)
+        assert set(closure.bundle(cart)) == walk(rules, cart)
+        assert closure.bundle(cart) == closure.bundle(tuple(cart))
+
+
+def test_topological_order_puts_dependencies_first():
+    rules = random_dag(random.Random(0), 300)
+    position = {name: i for i, name in enumerate(DependencyClosure(rules).order)}
+    assert all(position[dep] < position[name] for name, deps in rules.items() for dep in deps)
+
+
+@pytest.mark.parametrize("rules, cycle", [
+    ({"a": ["a"]}, "a -> a"),
+    ({"a": ["b"], "b": ["c"], "c": ["a"]}, "a -> b -> c -> a"),
+    ({"x": ["a"], "a": ["b", "d"], "b": ["c"], "c": ["b"]}, "b -> c -> b"),
+])
+def test_cycles_are_named(rules, cycle):
+    with pytest.raises(DependencyCycleError, match=cycle):
+        DependencyClosure(rules)
+
+
+def test_multi_level_chain_in_current_rules():
+    assert get_all_dependencies(["confined-space"]) == {
+        "confined-space": ["portable-gas-detectors", "safety-alarms-warning-lights", "full-face-respirators"],
+    }
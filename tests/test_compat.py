@@ -0,0 +1,61 @@
+"""
+Compiled compatibility index: issues(), pair_issues() and the matrix view
+against the original rule-by-rule check, with duplicates and unknown
+components in the carts.
+"""
+import random
+
+import pytest
+
+from rules import CompatibilityIndex, get_rules, validate_component_set
+
+
+def check(rules, ecosystems, a, b):
+    """Original check_compatibility: rule lookups, then an ecosystem scan."""
+    if (a, b) in rules:
+        return rules[(a, b)]
+    if (b, a) in rules:
+        return rules[(b, a)]
+    for members in ecosystems.values():
+        if a in members and b in members:
+            return True
+    return True
+
+
+def random_rules(rng, names, count):
+    # Mostly conflicts, some explicit compatibilities that take precedence one way
+    rules = {tuple(rng.sample(names, 2)): rng.random() < 0.2 for _ in range(count)}
+    ecosystems = {f"ecosystem-{e}": set(rng.sample(names, len(names) // 10)) for e in range(5)}
+    return rules, ecosystems
+
+
+def random_cart(rng, names, size):
+    cart = rng.sample(names + ["unknown-a", "unknown-b"], size)
+    return cart + rng.sample(cart, 2)  # duplicated components
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_index_matches_rule_by_rule_check(seed):
+    rng = random.Random(seed)
+    names = [f"component-{i}" for i in range(60)]
+    rules, ecosystems = random_rules(rng, names, 300)
+    index = CompatibilityIndex(rules, ecosystems)
+    for _ in range(50):
+        cart = random_cart(rng, names, 12)
+        assert index.issues(cart) == [
+            (a, b) for a in cart for b in cart if a != b and not check(rules, ecosystems, a, b)
+        ]
+        assert index.pair_issues(cart) == [
+            (a, b) for i, a in enumerate(cart) for b in cart[i + 1:] if not check(rules, ecosystems, a, b)
+        ]
+        matrix = index.matrix(cart)
+        assert list(matrix) == list(dict.fromkeys(cart))
+        for a in matrix:
+            assert matrix[a] == {b: check(rules, ecosystems, a, b) for b in matrix if b != a}
+
+
+def test_validate_component_set_reports_each_pair_once():
+    rules = get_rules()
+    a, b = next(pair for pair, ok in rules.compatibility_rules.items() if not ok)
+    _, issues = validate_component_set([a, "wrenches", b, a], rules)
+    assert issues == [(a, b, "Incompatible components"), (b, a, "Incompatible components")]
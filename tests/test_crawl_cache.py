@@ -0,0 +1,104 @@
+"""
+Incremental rebuilds: cached responses survive restarts and torn journals,
+only stale keywords are re-searched, and merges keep enriched records.
+"""
+import asyncio
+
+from crawl_cache import ResponseCache, merge_products
+from scraper import Crawler, FakeSearchServer
+
+WORDS = [f"keyword {i}" for i in range(10)]
+
+
+class CountingTransport:
+    def __init__(self):
+        self.server = FakeSearchServer()
+        self.queries = []
+
+    async def search(self, params):
+        self.queries.append(params["q"])
+        return self.server.respond(params["q"])
+
+
+def crawl(cache):
+    transport = CountingTransport()
+    products = asyncio.run(Crawler(transport, rate=1e6, cache=cache).crawl(WORDS))
+    return products, len(transport.queries)
+
+
+def test_only_stale_keywords_are_searched_again(tmp_path):
+    cache = ResponseCache(tmp_path)
+    full, searched = crawl(cache)
+    cache.close()
+    assert searched == len(WORDS)
+
+    cache = ResponseCache(tmp_path, ttls={WORDS[0]: 0, WORDS[1]: 0})
+    incremental, searched = crawl(cache)
+    cache.close()
+    assert searched == 2 and incremental == full
+
+
+def test_resume_after_torn_journal(tmp_path):
+    cache = ResponseCache(tmp_path)
+    cache.put("a", {"organic_results": []})
+    cache.put("b", {"organic_results": [{"link": "x"}]})
+    cache.close()
+    with open(tmp_path / "journal.jsonl", "a") as f:
+        f.write('{"keyword": "c", "ha')
+
+    cache = ResponseCache(tmp_path)
+    assert cache.get("b") == {"organic_results": [{"link": "x"}]}
+    assert cache.get("c") is None
+
+
+def test_identical_responses_stored_once_and_compacted(tmp_path):
+    cache = ResponseCache(tmp_path)
+    first = cache.put("a", {"r": 1})
+    assert cache.put("b", {"r": 1}) == first
+    cache.put("a", {"r": 2})
+    cache.put("b", {"r": 2})
+    assert len(list((tmp_path / "objects").glob("*.json"))) == 2
+    cache.compact()
+    assert len(list((tmp_path / "objects").glob("*.json"))) == 1
+    assert len((tmp_path / "journal.jsonl").read_text().splitlines()) == 2
+    cache.close()
+    assert ResponseCache(tmp_path).get("a") == {"r": 2}
+
+
+def test_merge_keeps_enriched_records():
+    existing = [
+        {"id": "a", "name": "A", "price": 9.0},
+        {"id": "b", "name": "B", "price": 8.0},
+        {"id": "gone", "name": "G", "price": 7.0},
+    ]
+    fresh = [
+        {"id": "new", "name": "N", "price": 0.0},
+        {"id": "b", "name": "B renamed", "price": 0.0},
+        {"id": "a", "name": "A", "price": 0.0},
+    ]
+    merged, stats = merge_products(existing, fresh)
+    assert merged == [fresh[0], fresh[1], existing[0]]
+    assert stats == {"added": 1, "changed": 1, "removed": 1, "unchanged": 1}
+
+
+def test_merge_follows_changed_variants():
+    existing = [
+        {"id": "a", "name": "A", "price": 9.0, "variants": [{"id": "a?x", "name": "A", "price": 9.0}]},
+        {"id": "b", "name": "B", "price": 8.0, "variants": [{"id": "b?x", "name": "B", "price": 8.0}]},
+        {"id": "c", "name": "C", "price": 7.0},
+    ]
+    fresh = [
+        {"id": "a", "name": "A", "price": 0.0, "variants": [{"id": "a?x", "name": "A", "price": 0.0}]},
+        {"id": "b", "name": "B", "price": 0.0,
+         "variants": [{"id": "b?x", "name": "B", "price": 0.0}, {"id": "b?y", "name": "B", "price": 0.0}]},
+        {"id": "c", "name": "C", "price": 0.0, "variants": [{"id": "c?x", "name": "C", "price": 0.0}]},
+    ]
+    merged, stats = merge_products(existing, fresh)
+    assert merged[0] == existing[0]
+    assert merged[1] == dict(existing[1], variants=[existing[1]["variants"][0], fresh[1]["variants"][1]])
+    assert merged[2] == dict(existing[2], variants=fresh[2]["variants"])
+    assert stats == {"added": 0, "changed": 2, "removed": 0, "unchanged": 1}
+
+    merged, stats = merge_products(merged, [dict(p, variants=[]) for p in fresh])
+    assert merged == [{k: v for k, v in p.items() if k != "variants"} for p in existing]
+    assert stats["changed"] == 3
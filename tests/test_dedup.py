@@ -0,0 +1,107 @@
+"""
+Ingest deduplication: clusters agree with an exhaustive pairwise check,
+item numbers are never merged on a title alone, and collapsed duplicates
+are kept in full.
+"""
+import itertools
+import json
+import random
+
+from dedup import Deduplicator, canonical_id, collapse, item_number
+from upgrade_json import enrich, upgrade_catalog
+
+WORDS = ["helmet", "glove", "drill", "meter", "camera", "lock", "harness", "kit", "saw", "gauge", "digital", "portable"]
+
+
+def naive_clusters(dedup):
+    """Union of every same-group pair sharing a canonical id or item number, or (both unnumbered) a close name."""
+    parent = list(range(len(dedup)))
+
+    def find(x):
+        while parent[x] != x:
+            x = parent[x]
+        return x
+
+    for a, b in itertools.combinations(range(len(dedup)), 2):
+        if dedup.groups[a] != dedup.groups[b]:
+            continue
+        same = dedup.canonical[a] == dedup.canonical[b]
+        if dedup.items[a] is not None and dedup.items[a] == dedup.items[b]:
+            same = True
+        if dedup.items[a] is None and dedup.items[b] is None and dedup.jaccard(a, b) >= dedup.threshold:
+            same = True
+        if same:
+            parent[max(find(a), find(b))] = min(find(a), find(b))
+    groups = {}
+    for row in range(len(dedup)):
+        groups.setdefault(find(row), []).append(row)
+    return sorted(groups.values())
+
+
+def planted_rows(n, seed=0):
+    """Distinct random titles plus exact copies under query-string, boilerplate and item-number variants."""
+    rng = random.Random(seed)
+    rows = []
+    for i in range(n):
+        r = rng.random()
+        if rows and r < 0.15:
+            j = rng.randrange(len(rows))
+            rows.append({"id": f"{rows[j]['id']}?filters=brand{i}", "name": rows[j]["name"]})
+        elif rows and r < 0.3:
+            j = rng.randrange(len(rows))
+            rows.append({"id": f"listing-{i}", "name": rows[j]["name"].upper() + " - Grainger Industrial Supply"})
+        elif r < 0.4:
+            rows.append({"id": f"Scope-Portable-{rng.randrange(20)}AB{rng.randrange(3)}", "name": "Portable Scope"})
+        else:
+            rows.append({"id": f"sku-{i}", "name": " ".join(rng.sample(WORDS, 4)) + f" {i}"})
+    return rows
+
+
+def test_clusters_match_pairwise_check():
+    for seed in range(5):
+        dedup = Deduplicator()
+        for i, row in enumerate(planted_rows(300, seed)):
+            dedup.add(row, group=str(i % 2))
+        assert sorted(dedup.clusters()) == naive_clusters(dedup)
+
+
+def test_item_numbers_are_not_merged_on_title():
+    rows = [
+        {"id": "Oscilloscope-Portable-780AY5", "name": "FLUKE Handheld Oscilloscope..."},
+        {"id": "Oscilloscope-Portable-806NJ4", "name": "FLUKE Handheld Oscilloscope..."},
+        {"id": "Oscilloscope-Portable-806NJ4?attrs=x", "name": "FLUKE Handheld Oscilloscope - Grainger Industrial Supply"},
+        {"id": "handheld-oscilloscopes", "name": "FLUKE Handheld Oscilloscope"},
+    ]
+    assert item_number(canonical_id(rows[2]["id"])) == "806NJ4"
+    assert item_number("handheld-oscilloscopes") is None
+    collapsed, removed = collapse(rows)
+    assert removed == 1
+    assert [p["id"] for p in collapsed] == ["Oscilloscope-Portable-780AY5", "Oscilloscope-Portable-806NJ4", "handheld-oscilloscopes"]
+
+
+def test_variants_are_kept_in_full():
+    rows = [
+        {"id": "gloves?filters=a", "name": "Gloves", "price": 5.0, "specs": {"size": "M"}, "compatibility_tags": ["ppe"]},
+        {"id": "gloves", "name": "Gloves", "price": 4.0, "specs": {}, "compatibility_tags": []},
+    ]
+    collapsed, removed = collapse(json.loads(json.dumps(rows)))
+    assert removed == 1
+    assert collapsed == [dict(rows[1], variants=[rows[0]])]
+
+
+def test_streaming_dedupe_matches_collapse(tmp_path):
+    rows = planted_rows(400)
+    for row in rows:
+        row.update(price=1.0, category="", specs={}, compatibility_tags=[])
+    source = tmp_path / "raw.json"
+    source.write_text(json.dumps({"products": {"grainger": rows}}))
+    target = tmp_path / "out.ndjson"
+    upgrade_catalog(source, target, fmt="ndjson", progress_every=0, workers=1, dedupe=True)
+
+    # Streaming emits a record once its last duplicate is read, so compare by id
+    expected, _ = collapse(json.loads(json.dumps(rows)))
+    expected = [enrich(product) for product in expected]
+    written = [json.loads(line) for line in target.read_text().splitlines()]
+    for product in written:
+        product.pop("vendor")
+    assert sorted(written, key=lambda p: p["id"]) == sorted(expected, key=lambda p: p["id"])
@@ -0,0 +1,74 @@
+"""
+Enrichment parity: the compiled engine, batched or across processes, gives
+exactly what the original any() chains gave.
+"""
+import copy
+
+import pytest
+
+from benchmarks.common import reference_enrich, synthetic_raw_products
+from enrichment import CATEGORY_DEFAULTS, EnrichmentEngine, enrich_stream
+
+
+@pytest.fixture(scope="module")
+def raw():
+    products = synthetic_raw_products(3_000)
+    # Priced rows keep their price/specs/tags; odd casing and empty names still classify
+    products[0].update(price=12.0, specs={"k": "v"}, compatibility_tags=["own"])
+    products[1]["name"] = "FIRST AID Kit"
+    products[2]["name"] = ""
+    return products
+
+
+@pytest.fixture(scope="module")
+def expected(raw):
+    rows = copy.deepcopy(raw)
+    for product in rows:
+        reference_enrich(product)
+    return rows
+
+
+def test_enrich_matches_reference(raw, expected):
+    engine = EnrichmentEngine()
+    assert [engine.enrich(p) for p in copy.deepcopy(raw)] == expected
+
+
+def test_enrich_batch_matches_reference(raw, expected):
+    assert EnrichmentEngine().enrich_batch(copy.deepcopy(raw)) == expected
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_enrich_stream_matches_reference(raw, expected, workers):
+    pairs = [("grainger", p) for p in copy.deepcopy(raw)]
+    result = list(enrich_stream(pairs, workers=workers, batch_size=256))
+    assert [p for _, p in result] == expected
+    assert {vendor for vendor, _ in result} == {"grainger"}
+
+
+def test_pool_is_sized_to_the_stream(raw, expected, monkeypatch):
+    import enrichment
+
+    sizes = []
+
+    class RecordingPool(enrichment.ProcessPoolExecutor):
+        def __init__(self, max_workers):
+            sizes.append(max_workers)
+            super().__init__(max_workers=max_workers)
+
+    monkeypatch.setattr(enrichment, "ProcessPoolExecutor", RecordingPool)
+    pairs = [("grainger", p) for p in copy.deepcopy(raw[:200])]
+    assert [p for _, p in enrich_stream(pairs, workers=8, batch_size=256)] == expected[:200]
+    pairs = [("grainger", p) for p in copy.deepcopy(raw[:600])]
+    assert [p for _, p in enrich_stream(pairs, workers=8, batch_size=256)] == expected[:600]
+    assert sizes == [3]
+
+
+def test_defaults_are_not_shared():
+    engine = EnrichmentEngine()
+    first, second = engine.enrich_batch([
+        {"id": "a", "name": "helmet", "price": 0}, {"id": "b", "name": "helmet", "price": 0},
+    ])
+    first["specs"]["size"] = "L"
+    first["compatibility_tags"].append("custom")
+    assert second["specs"] == CATEGORY_DEFAULTS["safety"][1] == {"type": "ppe"}
+    assert second["compatibility_tags"] == CATEGORY_DEFAULTS["safety"][2] == ["ppe", "workplace_safety"]
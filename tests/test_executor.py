@@ -0,0 +1,91 @@
+"""
+Fast-path executor: data-flow checks when the pipeline is built, undeclared
+writes, and the same final state as running the agents one after another.
+"""
+import pytest
+
+import graph
+from executor import FastPathExecutor, agent, node_name
+from state import CartPilotState
+
+GOALS = ["electrical work", "confined space gas", "chemical spill", "tool usage", "security warehouse"]
+
+
+@agent(reads=["a"], writes=["b"])
+def first_agent(state):
+    return {"b": state["a"] + 1}
+
+
+@agent(reads=["b"], writes=["c"])
+def second_agent(state):
+    return {"c": state["b"] * 2}
+
+
+def test_reads_must_be_provided_earlier():
+    assert FastPathExecutor([first_agent, second_agent], ["a"]).outputs == {"a", "b", "c"}
+    with pytest.raises(ValueError, match="second_agent reads b"):
+        FastPathExecutor([second_agent, first_agent], ["a"])
+    with pytest.raises(ValueError, match="does not declare"):
+        FastPathExecutor([lambda state: {}], ["a"])
+
+
+def test_undeclared_writes_are_rejected():
+    @agent(reads=["a"], writes=["b"])
+    def sloppy_agent(state):
+        return {"b": 1, "extra": 2}
+
+    with pytest.raises(ValueError, match="sloppy_agent wrote undeclared keys: extra"):
+        FastPathExecutor([sloppy_agent], ["a"]).run({"a": 0})
+
+
+def test_run_leaves_the_input_untouched():
+    state = {"a": 1}
+    assert FastPathExecutor([first_agent, second_agent], ["a"]).run(state) == {"a": 1, "b": 2, "c": 4}
+    assert state == {"a": 1}
+    assert node_name(first_agent) == "first" and node_name(lambda s: s) == "<lambda>"
+
+
+def stable(state):
+    """State without wall-clock timings."""
+    state = dict(state, shard_timings=set(state["shard_timings"]))
+    state["solver"] = {key: value for key, value in state["solver"].items() if key != "elapsed_ms"}
+    return state
+
+
+class RecordingState(dict):
+    """State that records every key an agent looks up."""
+
+    def __init__(self, *args):
+        super().__init__(*args)
+        self.read = set()
+
+    def __getitem__(self, key):
+        self.read.add(key)
+        return super().__getitem__(key)
+
+    def get(self, key, default=None):
+        self.read.add(key)
+        return super().get(key, default)
+
+
+@pytest.mark.parametrize("goal", GOALS)
+def test_fast_path_matches_sequential_agents(goal, monkeypatch):
+    # Sequential reference: each agent sees the whole state and only declared keys
+    captured = {}
+    monkeypatch.setattr(graph.fast_path, "run", lambda state: captured.setdefault("initial", dict(state)))
+    graph.run_cartpilot(goal, executor="fast")
+    monkeypatch.undo()
+
+    state = dict(captured["initial"])
+    for fn in graph.PIPELINE:
+        view = RecordingState(state)
+        update = fn(view)
+        assert view.read <= fn.reads, fn.__name__
+        assert set(update) <= fn.writes, fn.__name__
+        state.update(update)
+
+    fast = graph.fast_path.run(captured["initial"])
+    assert stable(fast) == stable(state)
+    assert set(fast) == set(CartPilotState.__annotations__)
+    if graph.cartpilot_graph is not None:
+        assert stable(graph.cartpilot_graph.invoke(captured["initial"])) == stable(fast)
@@ -0,0 +1,70 @@
+"""
+Streaming ingest: the incremental reader and writers round-trip catalogs,
+and upgrade_catalog writes what loading, enriching and dumping the whole
+file would.
+"""
+import io
+import json
+
+import pytest
+
+from benchmarks.common import synthetic_products
+from catalog import load_catalog
+from catalog_stream import JSONWriter, NDJSONWriter, iter_json_products, iter_products
+from upgrade_json import enrich, upgrade_catalog
+
+TRICKY = [
+    {"id": "quote\"brace}{[", "name": "comma, colon: \\ backslash", "price": 0, "category": "", "specs": {}, "compatibility_tags": []},
+    {"id": "unicode-✓", "name": "Ünïcode glove  ", "price": 3.5, "category": "", "specs": {"a": [1, {"b": None}]}, "compatibility_tags": ["x"]},
+]
+
+
+@pytest.fixture(scope="module")
+def data():
+    raw = {"grainger": synthetic_products(500) + TRICKY, "acme": synthetic_products(50, seed=1)}
+    for i, product in enumerate(raw["grainger"][:500]):
+        if i % 2:
+            product["price"] = 0
+    return {"products": raw}
+
+
+def pairs(data):
+    return [(vendor, product) for vendor, products in data["products"].items() for product in products]
+
+
+@pytest.mark.parametrize("chunk_size", [7, 4096])
+def test_incremental_reader_matches_json_load(data, chunk_size):
+    text = json.dumps({"meta": {"products": [1]}, **data, "tail": "}"}, indent=1)
+    assert list(iter_json_products(io.StringIO(text), chunk_size=chunk_size)) == pairs(data)
+
+
+@pytest.mark.parametrize("writer, suffix", [(JSONWriter, ".json"), (NDJSONWriter, ".ndjson")])
+def test_writers_round_trip(tmp_path, data, writer, suffix):
+    path = tmp_path / f"catalog{suffix}"
+    out = writer(path)
+    for vendor, product in pairs(data):
+        out.add(vendor, product)
+    out.close()
+    assert list(iter_products(path)) == pairs(data)
+    if suffix == ".json":
+        assert json.loads(path.read_text()) == data
+
+
+def test_upgrade_matches_in_memory_enrichment(tmp_path, data):
+    source = tmp_path / "raw.json"
+    source.write_text(json.dumps(data))
+    expected = json.loads(json.dumps(data))
+    for products in expected["products"].values():
+        for product in products:
+            enrich(product)
+
+    for fmt in ("json", "ndjson"):
+        target = tmp_path / f"out.{fmt}"
+        rows, _ = upgrade_catalog(source, target, fmt=fmt, progress_every=0, workers=1)
+        assert rows == len(pairs(data))
+        assert list(iter_products(target)) == pairs(expected)
+
+    target = tmp_path / "out.bin"
+    rows, _ = upgrade_catalog(source, target, fmt="compiled", progress_every=0, workers=1)
+    assert rows == len(expected["products"]["grainger"])
+    assert list(load_catalog(target).products) == expected["products"]["grainger"]
@@ -0,0 +1,68 @@
+"""
+Confidence-tiered intent classification: which goals escalate past the
+rules, and what the LLM tier and its fallback answer.
+"""
+from intent_cascade import IntentCascade
+from ollama_client import LLMUnavailable
+from rules import get_rules
+
+INTENT_MATCHER = get_rules().intent_matcher
+DEFAULT_SCENARIO = get_rules().default_scenario
+
+GOALS = ["electrical job", "electrical gas job", "need new gear"]
+
+
+class RecordingLLM:
+    def __init__(self, answer=None):
+        self.answer = answer
+        self.calls = []
+
+    def __call__(self, goals, scenarios, timeout=None):
+        self.calls.append(list(goals))
+        return [LLMUnavailable("down") if self.answer is None else self.answer for _ in goals]
+
+
+def test_confident_goals_stay_with_the_rules():
+    llm = RecordingLLM("chemical_environment")
+    intent = IntentCascade(INTENT_MATCHER, DEFAULT_SCENARIO, threshold=0.6, llm=llm).classify("electrical job")
+    assert intent["scenario"] == "electrical_work" and intent["tier"] == "rules"
+    assert llm.calls == []
+
+
+def test_uncertain_goals_escalate_in_one_batch():
+    llm = RecordingLLM("chemical_environment")
+    cascade = IntentCascade(INTENT_MATCHER, DEFAULT_SCENARIO, threshold=0.6, llm=llm)
+    intents = cascade.classify_batch(GOALS)
+    assert llm.calls == [GOALS[1:]]
+    assert [i["tier"] for i in intents] == ["rules", "llm", "llm"]
+    assert [i["scenario"] for i in intents] == ["electrical_work", "chemical_environment", "chemical_environment"]
+    assert intents[1]["confidence"] == 0.5 and len(intents[1]["candidates"]) == 2
+
+    stats = cascade.stats()
+    assert stats["requests"] == 3 and stats["escalation_rate"] == round(2 / 3, 4)
+    assert stats["tiers"]["llm"]["count"] == 2
+
+
+def test_unavailable_llm_keeps_the_rule_answer():
+    cascade = IntentCascade(INTENT_MATCHER, DEFAULT_SCENARIO, threshold=0.6, llm=RecordingLLM())
+    intents = cascade.classify_batch(GOALS)
+    assert [i["tier"] for i in intents] == ["rules", "fallback", "fallback"]
+    assert [i["scenario"] for i in intents] == ["electrical_work", "electrical_work", DEFAULT_SCENARIO]
+    assert cascade.stats()["llm_rate"] == round(2 / 3, 4)
+
+
+def test_threshold_zero_disables_escalation():
+    llm = RecordingLLM("chemical_environment")
+    intents = IntentCascade(INTENT_MATCHER, DEFAULT_SCENARIO, threshold=0.0, llm=llm).classify_batch(GOALS)
+    assert all(i["tier"] == "rules" for i in intents) and llm.calls == []
+    assert intents[2]["scenario"] == DEFAULT_SCENARIO
+
+
+def test_default_threshold_keeps_two_way_ties():
+    llm = RecordingLLM("chemical_environment")
+    cascade = IntentCascade(INTENT_MATCHER, DEFAULT_SCENARIO, llm=llm)
+    intents = cascade.classify_batch(["electrical construction", "construction electrical", "electrical gas fire"])
+    assert [(i["scenario"], i["tier"]) for i in intents[:2]] == [("electrical_work", "rules")] * 2
+    assert intents[0]["confidence"] == 0.5
+    # Three scenarios tied: the rules are unsure, so the goal escalates
+    assert intents[2]["tier"] == "llm" and llm.calls == [["electrical gas fire"]]
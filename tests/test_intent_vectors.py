@@ -0,0 +1,74 @@
+"""
+Local intent classifier: batched sparse scoring against a per-goal dict
+reference, model save/load, and the batch classification endpoint.
+"""
+import math
+import random
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from agents import INTENT_CASCADE, classify_intents
+from intent_vectors import CentroidClassifier, seed_documents
+from rules import get_rules
+
+
+@pytest.fixture(scope="module")
+def model():
+    return CentroidClassifier.fit(*seed_documents(get_rules().intent_keywords, get_rules().scenarios))
+
+
+@pytest.fixture(scope="module")
+def goals():
+    rng = random.Random(0)
+    vocab = [k for _, ks in get_rules().intent_keywords for k in ks]
+    vocab += [c.replace("-", " ") for cs in get_rules().scenarios.values() for c in cs]
+    vocab += ["need", "kit", "for", "the", "site", "crew", "electrican", "roofing", "zzz"]
+    return [" ".join(rng.choice(vocab) for _ in range(rng.randint(1, 8))) for _ in range(300)] + ["", "!!!"]
+
+
+def reference_scores(model, text):
+    """Cosine similarity of one goal to each centroid, one feature at a time."""
+    features = set(model.vectorizer.features(text))
+    row = {f: i for i, f in enumerate(model.features.tolist())}
+    scores = [0.0] * len(model.labels)
+    for f in features:
+        if f in row:
+            for label in range(len(model.labels)):
+                scores[label] += float(model.weights[row[f], label]) / math.sqrt(len(features))
+    return scores
+
+
+def test_batched_scores_match_reference(model, goals):
+    scores = model.scores(goals)
+    assert scores.shape == (len(goals), len(model.labels))
+    for text, row in zip(goals, scores):
+        assert row.tolist() == pytest.approx(reference_scores(model, text), abs=1e-5)
+    assert not scores[-2:].any()
+
+
+def test_centroids_recognize_their_keywords(model):
+    for scenario, keywords in get_rules().intent_keywords:
+        for keyword in keywords:
+            assert model.classify([keyword])[0][0] == scenario, keyword
+
+
+def test_save_and_load_round_trip(model, goals, tmp_path):
+    path = tmp_path / "intent_model.npz"
+    model.save(path)
+    loaded = CentroidClassifier.load(path)
+    assert loaded.labels == model.labels
+    assert np.array_equal(loaded.scores(goals), model.scores(goals))
+
+
+def test_batch_endpoint_matches_single_goals(goals, monkeypatch):
+    import api
+
+    monkeypatch.setattr(INTENT_CASCADE, "_llm", lambda batch, scenarios, timeout=None: [scenarios[-1]] * len(batch))
+    client = TestClient(api.app)
+    response = client.post("/classify-intent", json={"goals": goals[:50]})
+    assert response.status_code == 200
+    intents = response.json()["intents"]
+    assert [i["scenario"] for i in intents] == [classify_intents([goal])[0]["scenario"] for goal in goals[:50]]
+    assert {i["tier"] for i in intents} <= {"rules", "vector", "llm"}
@@ -0,0 +1,87 @@
+"""
+Micro-batching of intent prompts: batch sizes, per-item errors, and batched
+answers against one prompt per goal.
+"""
+import asyncio
+import json
+import re
+
+import pytest
+
+from ollama_client import FakeOllamaServer, LLMUnavailable, MicroBatcher, OllamaClient
+from ollama_llm import build_intent_prompt, parse_intent_batch
+
+SCENARIOS = ["electrical_work", "confined_space", "chemical_environment", "tool_usage"]
+GOAL_LINE = re.compile(r"^(\d+)\. (.*)$", re.M)
+
+
+def respond(prompt):
+    answers = []
+    for number, goal in GOAL_LINE.findall(prompt):
+        scenario = next((s for s in SCENARIOS if s.replace("_", " ") in goal), "tool_usage")
+        answers.append({"id": int(number), "scenario": scenario})
+    return json.dumps(answers)
+
+
+def test_concurrent_submits_share_batches():
+    async def run():
+        seen = []
+
+        async def run_batch(items):
+            seen.append(list(items))
+            return [item * 2 for item in items]
+
+        batcher = MicroBatcher(run_batch, window=0.01, max_batch=4)
+        results = await asyncio.gather(*(batcher.submit(i) for i in range(10)))
+        return results, seen, batcher.stats()
+
+    results, seen, stats = asyncio.run(run())
+    assert results == [i * 2 for i in range(10)]
+    assert [len(batch) for batch in seen] == [4, 4, 2]
+    assert stats == {"batches": 3, "items": 10, "mean_batch": 3.33}
+
+
+def test_errors_reach_only_their_callers():
+    async def run():
+        async def run_batch(items):
+            if "all" in items:
+                raise LLMUnavailable("outage")
+            return [LLMUnavailable(item) if item == "bad" else item for item in items]
+
+        batcher = MicroBatcher(run_batch, window=0.01, max_batch=8)
+        first = await asyncio.gather(*(batcher.submit(item) for item in ("a", "bad", "b")), return_exceptions=True)
+        second = await asyncio.gather(*(batcher.submit(item) for item in ("all", "c")), return_exceptions=True)
+        return first, second
+
+    first, second = asyncio.run(run())
+    assert first[0] == "a" and first[2] == "b" and isinstance(first[1], LLMUnavailable)
+    assert all(isinstance(result, LLMUnavailable) for result in second)
+
+
+def test_parse_intent_batch_flags_unusable_answers():
+    text = 'Sure: [{"id": 1, "scenario": "tool_usage"}, {"id": 3, "scenario": "cooking"}, {"id": "x"}, 5]'
+    results = parse_intent_batch(text, 3, SCENARIOS)
+    assert results[0] == "tool_usage"
+    assert all(isinstance(result, LLMUnavailable) for result in results[1:])
+    assert all(isinstance(result, LLMUnavailable) for result in parse_intent_batch("not json", 2, SCENARIOS))
+
+
+@pytest.mark.parametrize("max_batch", [1, 16])
+def test_batched_answers_match_per_goal_answers(max_batch):
+    goals = [f"need gear for {SCENARIOS[i % 4].replace('_', ' ')} job {i}" for i in range(20)]
+
+    async def run():
+        async with FakeOllamaServer(respond=respond) as server:
+            client = OllamaClient(server.url, timeout=5.0)
+
+            async def run_batch(items):
+                return parse_intent_batch(await client.generate(build_intent_prompt(items, SCENARIOS)), len(items), SCENARIOS)
+
+            batcher = MicroBatcher(run_batch, window=0.01, max_batch=max_batch)
+            results = await asyncio.gather(*(batcher.submit(goal) for goal in goals))
+            await client.aclose()
+            return results, server.requests
+
+    results, requests = asyncio.run(run())
+    assert results == [SCENARIOS[i % 4] for i in range(20)]
+    assert requests == -(-20 // max_batch)
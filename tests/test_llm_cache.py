@@ -0,0 +1,112 @@
+"""
+LLM response cache: normalized keys, LRU/TTL eviction, the similarity tier,
+and a journal that survives restarts and is shared by worker processes.
+"""
+import json
+import multiprocessing
+import time
+
+from llm_cache import LLMCache, normalize_goal
+
+
+def test_goal_variants_share_an_entry():
+    cache = LLMCache()
+    cache.put("ns", "Need electrical PPE", "answer")
+    assert normalize_goal("  need  ELECTRICAL ppe!!") == "need electrical ppe"
+    assert cache.get("ns", "need electrical ppe!") == "answer"
+    assert cache.get("other", "need electrical ppe") is None
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+
+
+def test_lru_and_ttl_eviction(monkeypatch):
+    cache = LLMCache(capacity=2, ttl=10)
+    cache.put("ns", "a", "1")
+    cache.put("ns", "b", "2")
+    cache.get("ns", "a")
+    cache.put("ns", "c", "3")
+    assert cache.get("ns", "b") is None and cache.get("ns", "a") == "1"
+
+    now = time.time()
+    monkeypatch.setattr("llm_cache.time.time", lambda: now + 11)
+    assert cache.get("ns", "a") is None
+
+
+def test_similarity_tier():
+    cache = LLMCache(similarity=0.6)
+    cache.put("ns", "need gas detector for the crew", "gas")
+    assert cache.get("ns", "need gas detector for crew") == "gas"
+    assert cache.get("ns", "need gas detector for crew", similar=False) is None
+    assert cache.get("ns", "spill kit") is None
+    assert cache.stats()["similar_hits"] == 1
+
+
+def test_journal_survives_restart_and_compacts(tmp_path):
+    path = tmp_path / "llm.jsonl"
+    cache = LLMCache(path, capacity=3)
+    for i in range(20):
+        cache.put("ns", f"goal {i % 4}", f"r{i}")
+    cache.close()
+    # Compaction keeps the journal within twice the live entries
+    assert len(path.read_text().splitlines()) <= 2 * 3
+    with open(path, "a") as f:
+        f.write('{"ns": "ns", "te')
+
+    restarted = LLMCache(path, capacity=3)
+    assert [restarted.get("ns", f"goal {i}") for i in (1, 2, 3)] == ["r17", "r18", "r19"]
+    restarted.close()
+
+
+def _worker(path, worker):
+    cache = LLMCache(path)
+    for i in range(60):
+        for _ in range(4):
+            cache.put("ns", f"shared {i % 3}", "x")  # churn forces compactions
+        cache.put("ns", f"worker {worker} goal {i}", f"{worker}-{i}")
+    cache.close()
+
+
+def test_workers_share_one_journal(tmp_path):
+    path = tmp_path / "llm.jsonl"
+    workers = [multiprocessing.Process(target=_worker, args=(path, w)) for w in range(3)]
+    for process in workers:
+        process.start()
+    for process in workers:
+        process.join()
+        assert process.exitcode == 0
+
+    cache = LLMCache(path)
+    assert all(cache.get("ns", f"worker {w} goal {i}") == f"{w}-{i}" for w in range(3) for i in range(60))
+    cache.close()
+
+
+def test_compaction_keeps_lru_state(tmp_path):
+    path = tmp_path / "llm.jsonl"
+    cache = LLMCache(path, capacity=3)
+    for goal in ("a", "b", "c"):
+        cache.put("ns", goal, goal)
+    cache.get("ns", "a")
+    cache.put("ns", "d", "d")  # evicts b, the least recently used
+    for _ in range(3):
+        cache.put("ns", "d", "d")  # churn until the journal compacts
+    assert len(path.read_text().splitlines()) == 3
+    assert cache.get("ns", "a") == "a" and cache.get("ns", "b") is None
+    assert {json.loads(line)["text"] for line in path.read_text().splitlines()} == {"a", "c", "d"}
+    cache.close()
+
+
+def test_compaction_folds_in_other_writers(tmp_path):
+    path = tmp_path / "llm.jsonl"
+    first, second = LLMCache(path, capacity=3), LLMCache(path, capacity=3)
+    first.put("ns", "a", "a")
+    second.put("ns", "x", "x")  # another worker's line between first's own lines
+    first.put("ns", "b", "b")
+    first.get("ns", "a")
+    for _ in range(4):
+        first.put("ns", "b", "b")
+    lines = [json.loads(line)["text"] for line in path.read_text().splitlines()]
+    assert sorted(lines) == ["a", "b", "x"]
+    # The other worker's entry is folded in without disturbing first's own
+    assert [first.get("ns", goal) for goal in ("a", "b", "x")] == ["a", "b", "x"]
+    assert first.stats()["size"] == 3
+    first.close()
+    second.close()
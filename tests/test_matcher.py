@@ -0,0 +1,82 @@
+"""
+Multi-pattern matchers agree with naive substring search.
+"""
+import random
+import string
+
+from matcher import ComponentMatcher, IntentMatcher
+
+
+def naive_index(patterns, texts):
+    return {p: [i for i, text in enumerate(texts) if p in text] for p in {p.lower() for p in patterns if p}}
+
+
+def random_texts(rng, alphabet, n, length):
+    return ["".join(rng.choice(alphabet) for _ in range(rng.randint(0, length))) for _ in range(n)]
+
+
+def test_index_matches_naive_substring_search():
+    rng = random.Random(0)
+    # A tiny alphabet makes overlapping and nested keys common
+    for _ in range(50):
+        patterns = random_texts(rng, "ab-", 12, 4)
+        texts = random_texts(rng, "ab-", 40, 12)
+        assert ComponentMatcher(patterns).index(texts) == naive_index(patterns, texts)
+
+
+def test_match_reports_every_contained_key():
+    rng = random.Random(1)
+    patterns = random_texts(rng, "abc", 30, 5)
+    matcher = ComponentMatcher(patterns)
+    for text in random_texts(rng, "abc", 200, 15):
+        assert matcher.match(text) == {p for p in matcher.patterns if p in text}
+
+
+def test_scan_reports_longest_keys_and_expand_their_prefixes():
+    matcher = ComponentMatcher(["a", "ab", "abc", "b"])
+    assert matcher.scan("xABcb") == {"abc", "b"}
+    assert sorted(matcher.expand("abc")) == ["a", "ab", "abc"]
+    assert ComponentMatcher([]).scan("abc") == set()
+
+
+def test_component_ids(products):
+    from catalog import default_components
+
+    ids = [p["id"].lower() for p in products]
+    components = default_components()
+    assert ComponentMatcher(components).index(ids) == naive_index(components, ids)
+
+
+def test_special_characters_are_literal():
+    patterns = ["a.b", "c+", "(x)", "1|2"]
+    texts = ["a.b c+ (x) 1|2", "axb cc x 12", string.punctuation]
+    assert ComponentMatcher(patterns).index(texts) == naive_index(patterns, texts)
+
+
+def naive_score(table, text):
+    text = text.lower()
+    hits = [(i, sorted({k.lower() for k in keywords if k.lower() in text})) for i, (_, keywords) in enumerate(table)]
+    hits = [(i, found) for i, found in hits if found]
+    total = sum(len(found) for _, found in hits)
+    ranked = sorted(hits, key=lambda hit: (-len(hit[1]), hit[0]))
+    return [(table[i][0], len(found), len(found) / total, found) for i, found in ranked]
+
+
+def test_intent_scores_match_naive_scoring():
+    rng = random.Random(2)
+    syllables = ["ka", "kal", "lo", "lom", "mi", "ren", "Tus"]
+    for _ in range(30):
+        # Keywords shared between labels and prefixes of one another
+        table = [(f"label_{i}", ["".join(rng.sample(syllables, 2)) for _ in range(3)]) for i in range(8)]
+        matcher = IntentMatcher(table)
+        for _ in range(30):
+            text = " ".join(rng.choice(syllables) + rng.choice(syllables) for _ in range(5))
+            assert matcher.score(text) == naive_score(table, text)
+
+
+def test_scenario_keywords():
+    from rules import get_rules
+
+    rules = get_rules()
+    for goal in ["Electrical work at height", "confined space GAS check", "warehouse security + fire", "nothing here"]:
+        assert rules.intent_matcher.score(goal) == naive_score(rules.intent_keywords, goal)
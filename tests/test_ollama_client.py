@@ -0,0 +1,109 @@
+"""
+Ollama client: circuit breaker states, deadlines, hedging, and failures
+(including malformed bodies and cancelled probes) against FakeOllamaServer.
+"""
+import asyncio
+import itertools
+
+import httpx
+import pytest
+
+from ollama_client import CircuitBreaker, FakeOllamaServer, LLMUnavailable, OllamaClient
+
+
+def test_breaker_opens_probes_and_closes(monkeypatch):
+    now = [0.0]
+    monkeypatch.setattr("ollama_client.time.monotonic", lambda: now[0])
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=10)
+    breaker.failure()
+    assert breaker.allow() and breaker.state == "closed"
+    breaker.failure()
+    assert breaker.state == "open" and not breaker.allow()
+
+    now[0] = 10.0
+    assert breaker.allow() and breaker.state == "half_open"
+    assert not breaker.allow()  # one probe at a time
+    breaker.failure()
+    assert breaker.state == "open" and not breaker.allow()
+
+    now[0] = 20.0
+    assert breaker.allow()
+    breaker.success()
+    assert breaker.state == "closed" and breaker.failures == 0 and breaker.allow()
+
+
+def test_generate_against_fake_server():
+    async def run():
+        async with FakeOllamaServer(respond=lambda prompt: prompt.upper()) as server:
+            client = OllamaClient(server.url, timeout=5.0)
+            answers = await asyncio.gather(*(client.generate(f"goal {i}") for i in range(6)))
+            await client.aclose()
+            return answers, client.stats(), server.max_in_flight
+
+    answers, stats, peak = asyncio.run(run())
+    assert answers == [f"GOAL {i}" for i in range(6)]
+    assert stats["calls"] == 6 and stats["failures"] == 0 and stats["breaker"] == "closed"
+    assert peak <= 2
+
+
+def test_outage_trips_the_breaker_and_fails_fast():
+    async def run():
+        async with FakeOllamaServer(latency=0.5) as server:
+            server.healthy = False
+            client = OllamaClient(server.url, timeout=0.1, breaker=CircuitBreaker(failure_threshold=3, reset_timeout=60))
+            for _ in range(5):
+                with pytest.raises(LLMUnavailable):
+                    await client.generate("plan a cart")
+            await client.aclose()
+            return client.stats(), server.requests
+
+    stats, requests = asyncio.run(run())
+    assert stats["failures"] == 3 and stats["rejected"] == 2 and stats["breaker"] == "open"
+    assert requests == 3
+
+
+@pytest.mark.parametrize("body", [b"[]", b'"text"', b"{}", b"not json"])
+def test_malformed_body_counts_as_failure(body):
+    async def run():
+        client = OllamaClient(timeout=1.0, breaker=CircuitBreaker(failure_threshold=1, reset_timeout=60))
+        await client._client.aclose()
+        client._client = httpx.AsyncClient(transport=httpx.MockTransport(lambda request: httpx.Response(200, content=body)))
+        with pytest.raises(LLMUnavailable):
+            await client.generate("plan a cart")
+        await client.aclose()
+        return client
+
+    client = asyncio.run(run())
+    assert client.failures == 1 and client.breaker.state == "open"
+
+
+def test_cancelled_probe_is_released():
+    async def run():
+        async with FakeOllamaServer(latency=1.0) as server:
+            breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+            breaker.failure()
+            client = OllamaClient(server.url, timeout=5.0, breaker=breaker)
+            probe = asyncio.ensure_future(client.generate("probe"))
+            await asyncio.sleep(0.05)
+            probe.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await probe
+            await client.aclose()
+            return breaker
+
+    breaker = asyncio.run(run())
+    assert breaker.state == "half_open"
+    assert breaker.allow()
+
+
+def test_hedge_answers_a_slow_call():
+    async def run():
+        calls = itertools.count()
+        async with FakeOllamaServer(latency=lambda prompt: 2.0 if next(calls) == 0 else 0.0) as server:
+            client = OllamaClient(server.url, timeout=1.0, hedge_after=0.05)
+            answer = await client.generate("plan a cart")
+            await client.aclose()
+            return answer, client.hedges
+
+    answer, hedges = asyncio.run(run())
+    assert answer and hedges == 1
@@ -0,0 +1,139 @@
+"""
+Versioned rules file: version stamps, rejection of malformed or cyclic
+files, and atomic hot reload through reload_rules, RulesWatcher and the API.
+"""
+import json
+import os
+import re
+import threading
+
+import pytest
+from fastapi.testclient import TestClient
+
+from rules import RULES_PATH, RulesWatcher, load_rules
+
+
+@pytest.fixture
+def rules_file(tmp_path):
+    path = tmp_path / "rules.json"
+    path.write_bytes(RULES_PATH.read_bytes())
+    return path
+
+
+def edit(path, change, stamp):
+    data = json.loads(path.read_text())
+    change(data)
+    path.write_text(json.dumps(data))
+    os.utime(path, ns=(stamp, stamp))
+
+
+def add_dependency(data):
+    data["dependencies"]["wrenches"] = ["safety-gloves"]
+
+
+def test_version_tracks_content(rules_file):
+    rules = load_rules(rules_file)
+    assert re.fullmatch(r"2026\.10\.1\+[0-9a-f]{8}", rules.version)
+    assert load_rules(rules_file).version == rules.version
+    edit(rules_file, add_dependency, 1)
+    assert load_rules(rules_file).version != rules.version
+
+
+@pytest.mark.parametrize("change", [
+    lambda data: data.pop("scenarios"),
+    lambda data: data["compatibility"].append({"components": ["a", "b", "c"], "compatible": False}),
+    lambda data: data["tag_conflicts"].append(["ppe"]),
+    lambda data: data["compatibility"][0].update(compatible="false"),
+    lambda data: data["compatibility"][0].update(compatible=0),
+    lambda data: data["intent_keywords"].update(fire_risk_environment=[1]),
+    lambda data: data["dependencies"].update({"safety-goggles": ["digital-multimeters"]}),
+])
+def test_invalid_files_keep_the_current_rules(rules_file, resident_rules, change):
+    current = resident_rules.get_rules()
+    edit(rules_file, change, 1)
+    with pytest.raises(ValueError):
+        resident_rules.reload_rules(rules_file)
+    rules_file.write_text("{not json")
+    with pytest.raises(ValueError):
+        resident_rules.reload_rules(rules_file)
+    assert resident_rules.get_rules() is current
+
+
+def test_watcher_swaps_valid_edits_only(rules_file, resident_rules, capsys):
+    resident_rules.set_rules(load_rules(rules_file))
+    old = resident_rules.get_rules()
+    watcher = RulesWatcher(rules_file)
+    assert not watcher.check()
+
+    edit(rules_file, lambda data: data["dependencies"].update({"safety-goggles": ["digital-multimeters"]}), 1)
+    assert not watcher.check()
+    assert resident_rules.get_rules() is old
+    assert "keeping version" in capsys.readouterr().out
+
+    rules_file.write_bytes(RULES_PATH.read_bytes())
+    edit(rules_file, add_dependency, 2)
+    assert watcher.check()
+    new = resident_rules.get_rules()
+    assert new.version != old.version and new.dependency_rules["wrenches"] == ["safety-gloves"]
+    # A request that pinned the old version still resolves it
+    assert resident_rules.get_rules(old.version) is old
+
+
+def test_readers_never_see_a_partial_swap(rules_file, resident_rules):
+    a = load_rules(rules_file)
+    edit(rules_file, add_dependency, 1)
+    b = load_rules(rules_file)
+    expected = {a.version: a.dependency_rules, b.version: b.dependency_rules}
+    resident_rules.set_rules(a)
+    stop, seen = threading.Event(), []
+
+    def read():
+        while not stop.is_set():
+            rules = resident_rules.get_rules()
+            seen.append(rules.dependency_rules == expected[rules.version])
+
+    readers = [threading.Thread(target=read) for _ in range(4)]
+    for reader in readers:
+        reader.start()
+    for i in range(200):
+        resident_rules.set_rules(b if i % 2 == 0 else a)
+    stop.set()
+    for reader in readers:
+        reader.join()
+    assert seen and all(seen)
+
+
+def test_reload_endpoint(rules_file, resident_rules, monkeypatch):
+    import api
+
+    monkeypatch.setattr(resident_rules, "RULES_PATH", rules_file)
+    client = TestClient(api.app)
+    response = client.post("/rules/reload")
+    assert response.status_code == 200
+    assert response.json()["rules_version"] == resident_rules.get_rules().version
+
+    current = resident_rules.get_rules()
+    edit(rules_file, lambda data: data["compatibility"][0].update(compatible="false"), 1)
+    response = client.post("/rules/reload")
+    assert response.status_code == 422 and "Rules not reloaded" in response.json()["detail"]
+    assert resident_rules.get_rules() is current
+
+
+def test_reloaded_scenarios_are_classified(rules_file, resident_rules, monkeypatch):
+    from agents import INTENT_CASCADE, classify_intents
+    from graph import run_cartpilot
+    from ollama_client import LLMUnavailable
+
+    monkeypatch.setattr(INTENT_CASCADE, "_llm", lambda batch, scenarios, timeout=None: [LLMUnavailable("down")] * len(batch))
+
+    def add_welding(data):
+        data["scenarios"]["welding_work"] = ["safety-goggles", "safety-gloves"]
+        data["intent_keywords"]["welding_work"] = ["welding", "welder"]
+
+    goals = ["welding job", "weldng goggles"]
+    assert "welding_work" not in [i["scenario"] for i in classify_intents(goals)]
+    edit(rules_file, add_welding, 1)
+    resident_rules.reload_rules(rules_file)
+    intents = classify_intents(goals)
+    assert [(i["scenario"], i["tier"]) for i in intents] == [("welding_work", "rules"), ("welding_work", "vector")]
+    assert run_cartpilot("welding job")["required_components"] == ["safety-goggles", "safety-gloves"]
@@ -0,0 +1,86 @@
+"""
+Concurrent crawler: same products, in keyword order, as one search at a
+time, within the concurrency cap and rate limit, retrying transient errors.
+"""
+import asyncio
+import time
+
+import pytest
+
+from scraper import Crawler, FakeSearchServer, SerpApiTransport, TokenBucket, TransientSearchError, parse_results
+
+WORDS = [f"keyword {i}" for i in range(12)]
+
+
+class RecordingTransport:
+    """In-process transport tracking requests in flight; fails each query's first `failures` attempts."""
+
+    def __init__(self, failures=0):
+        self.server = FakeSearchServer()
+        self.failures = failures
+        self.attempts = {}
+        self.in_flight = self.max_in_flight = 0
+
+    async def search(self, params):
+        query = params["q"]
+        self.attempts[query] = self.attempts.get(query, 0) + 1
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(0.005)
+            if self.attempts[query] <= self.failures:
+                raise TransientSearchError("HTTP 503")
+            return self.server.respond(query)
+        finally:
+            self.in_flight -= 1
+
+
+def expected_products():
+    server = FakeSearchServer()
+    return [p for word in WORDS for p in parse_results(server.respond(f"site:grainger.com {word}"), word)]
+
+
+def test_crawl_matches_sequential_order_over_http():
+    async def crawl():
+        async with FakeSearchServer(failure_rate=0.3) as server:
+            transport = SerpApiTransport(server.url)
+            products = await Crawler(transport, rate=1e6, concurrency=4, backoff=0.001, retries=10).crawl(WORDS)
+            await transport.aclose()
+            return products
+
+    assert asyncio.run(crawl()) == expected_products()
+
+
+def test_concurrency_cap_and_retries():
+    transport = RecordingTransport(failures=2)
+    crawler = Crawler(transport, rate=1e6, concurrency=3, backoff=0.001)
+    assert asyncio.run(crawler.crawl(WORDS)) == expected_products()
+    assert transport.max_in_flight == 3
+    assert set(transport.attempts.values()) == {3}
+
+
+def test_retries_exhausted_raises():
+    crawler = Crawler(RecordingTransport(failures=5), rate=1e6, retries=2, backoff=0.001)
+    with pytest.raises(TransientSearchError):
+        asyncio.run(crawler.search("x"))
+
+
+def test_token_bucket_rate():
+    async def acquire_all(bucket, n):
+        for _ in range(n):
+            await bucket.acquire()
+
+    bucket = TokenBucket(rate=100.0, capacity=5)
+    start = time.monotonic()
+    asyncio.run(acquire_all(bucket, 25))
+    # The burst of 5 is free; the other 20 are paced at 100/s
+    assert time.monotonic() - start >= 0.19
+
+
+def test_parse_results_keeps_grainger_links():
+    results = {"organic_results": [
+        {"title": "Gloves", "link": "https://www.grainger.com/category/gloves"},
+        {"title": "Elsewhere", "link": "https://example.com/gloves"},
+        {"link": "https://www.grainger.com/product/X-1"},
+    ]}
+    assert [(p["id"], p["name"]) for p in parse_results(results, "gloves")] == [("gloves", "Gloves"), ("X-1", "gloves")]
@@ -0,0 +1,54 @@
+"""
+Vendor shards: fan_out answers each shard exactly as a direct lookup would,
+whichever backend serves it, and the cheapest vendor offer is selected.
+"""
+import json
+
+import pytest
+
+from benchmarks.common import synthetic_products
+from catalog import Catalog, ShardedCatalog, fan_out, load_catalog, merge_offers
+from catalog_sqlite import SQLiteCatalog, build_sqlite_catalog
+
+COMPONENTS = ["digital-multimeters", "safety-goggles", "locks", "sku-0000042", "no-such-component"]
+
+
+@pytest.fixture(scope="module")
+def sharded(tmp_path_factory):
+    path = tmp_path_factory.mktemp("shards") / "vendor2.db"
+    build_sqlite_catalog(synthetic_products(2_000, seed=2), path, vendor="vendor2")
+    return ShardedCatalog({
+        "vendor0": Catalog(synthetic_products(2_000, seed=0), vendor="vendor0"),
+        "vendor1": Catalog(synthetic_products(2_000, seed=1), vendor="vendor1"),
+        "vendor2": SQLiteCatalog(path),
+    })
+
+
+def test_fan_out_matches_direct_lookups(sharded):
+    found, timings = fan_out(sharded, COMPONENTS)
+    assert list(found) == list(timings) == list(sharded.shards)
+    for vendor, shard in sharded.shards.items():
+        for component in COMPONENTS:
+            assert found[vendor][component].rows.tolist() == shard.rows(component).tolist()
+
+
+def test_cheapest_vendor_offer_is_selected(sharded):
+    found, _ = fan_out(sharded, ["safety-goggles"])
+    offers = [(vendor, matches["safety-goggles"]) for vendor, matches in found.items()]
+    selected, _, _ = merge_offers(offers)
+    cheapest = min(matches[0]["price"] for _, matches in offers)
+    assert selected["price"] == cheapest
+    assert selected["vendor"] in sharded.shards
+
+
+def test_load_catalog_shards_by_vendor(tmp_path):
+    first, second = tmp_path / "a.json", tmp_path / "b.json"
+    first.write_text(json.dumps({"products": {"v1": synthetic_products(10), "v2": synthetic_products(10, seed=1)}}))
+    second.write_text(json.dumps({"products": {"v3": synthetic_products(10, seed=2)}}))
+    catalog = load_catalog(first, second)
+    assert isinstance(catalog, ShardedCatalog)
+    assert sorted(catalog.shards) == ["v1", "v2", "v3"] and len(catalog) == 30
+
+    second.write_text(json.dumps({"products": {"v1": synthetic_products(10)}}))
+    with pytest.raises(ValueError):
+        load_catalog(first, second)
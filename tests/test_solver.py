@@ -0,0 +1,182 @@
+"""
+Constrained cart solver against brute force over every combination, and
+the pipeline's empty cart when the constraints cannot be met.
+"""
+import itertools
+import random
+
+import pytest
+
+from graph import run_cartpilot
+from rules import TagConflictIndex
+from solver import solve
+
+TAGS = [f"tag-{i}" for i in range(10)]
+
+
+def brute_force(candidates, budget=None, required_tags=(), forbidden_tags=(), tag_conflicts=()):
+    """Cheapest total over every combination that meets the constraints, or None."""
+    best = None
+    for combo in itertools.product(*candidates.values()):
+        tags = {tag for product in combo for tag in product["compatibility_tags"]}
+        total = sum(product["price"] for product in combo)
+        if (set(required_tags) <= tags and not tags & set(forbidden_tags)
+                and not any(a in tags and b in tags for a, b in tag_conflicts)
+                and (budget is None or total <= budget)):
+            best = total if best is None else min(best, total)
+    return best
+
+
+def random_problem(rng):
+    candidates = {
+        f"component-{c}": [
+            {"id": f"{c}-{i}", "price": round(rng.uniform(5, 100), 2), "compatibility_tags": rng.sample(TAGS, rng.randint(0, 3))}
+            for i in range(rng.randint(1, 5))
+        ]
+        for c in range(rng.randint(1, 5))
+    }
+    constraints = {
+        "required_tags": rng.sample(TAGS, rng.randint(0, 2)),
+        "forbidden_tags": rng.sample(TAGS, rng.randint(0, 1)),
+        "tag_conflicts": [tuple(rng.sample(TAGS, 2)) for _ in range(rng.randint(0, 3))],
+        "budget": rng.choice([None, rng.uniform(50, 300)]),
+    }
+    return candidates, constraints
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_solver_matches_brute_force(seed):
+    rng = random.Random(seed)
+    for _ in range(100):
+        candidates, constraints = random_problem(rng)
+        expected = brute_force(candidates, **constraints)
+        result = solve(candidates, time_limit=5.0, **constraints)
+        assert result["optimal"]
+        if expected is None:
+            assert not result["feasible"] and result["choice"] == {} and result["reason"]
+            continue
+        assert result["feasible"] and result["total"] == pytest.approx(expected, abs=0.01)
+        choice = result["choice"]
+        assert list(choice) == list(candidates)
+        assert all(choice[c] in candidates[c] for c in candidates)
+        # The chosen cart itself meets every constraint
+        assert brute_force({c: [p] for c, p in choice.items()}, **constraints) == pytest.approx(expected, abs=0.01)
+
+
+def test_compiled_tag_conflicts_are_shared_across_requests():
+    rng = random.Random(7)
+    pairs = [("tag-0", "tag-1"), ("tag-2", "tag-3")]
+    index = TagConflictIndex(pairs)
+    bits = dict(index.bit)
+    for _ in range(50):
+        candidates, constraints = random_problem(rng)
+        constraints["tag_conflicts"] = pairs
+        expected = solve(candidates, time_limit=5.0, **constraints)
+        result = solve(candidates, time_limit=5.0, **{**constraints, "tag_conflicts": index})
+        assert (result["choice"], result["total"], result["reason"]) == (
+            expected["choice"], expected["total"], expected["reason"]
+        )
+    # Tags a request requires or forbids never leak into the shared index
+    assert index.bit == bits
+
+
+def test_time_limit_returns_best_so_far():
+    rng = random.Random(0)
+    candidates = {
+        f"component-{c}": [{"id": f"{c}-{i}", "price": rng.uniform(5, 500), "compatibility_tags": rng.sample(TAGS, 3)}
+                           for i in range(40)]
+        for c in range(30)
+    }
+    result = solve(candidates, required_tags=TAGS[:6], tag_conflicts=[("tag-1", "tag-2"), ("tag-3", "tag-4")], time_limit=0.0)
+    assert not result["optimal"]
+    assert result["feasible"] or result["reason"] == "time limit reached before a feasible cart was found"
+
+
+def test_infeasible_constraints_give_an_empty_cart():
+    state = run_cartpilot("electrical work", {"budget": 1.0})
+    assert state["final_cart"] == [] and state["total_price"] == 0
+    assert state["validation_errors"] == ["Constraints not met: no cart within budget 1.00"]
+    assert state["product_alternatives"]
+
+    # A zero budget is a constraint too, not "no budget"
+    state = run_cartpilot("electrical work", {"budget": 0})
+    assert state["final_cart"] == [] and state["validation_errors"] == ["Constraints not met: no cart within budget 0.00"]
+
+    state = run_cartpilot("electrical work", {"forbidden_tags": ["ppe"], "required_tags": ["ppe"]})
+    assert state["final_cart"] == [] and state["validation_errors"][0].startswith("Constraints not met")
+
+
+def test_loose_constraints_keep_the_cheapest_cart():
+    unconstrained = run_cartpilot("electrical work")
+    state = run_cartpilot("electrical work", {"budget": 10_000})
+    assert state["solver"]["feasible"] and not state["validation_errors"]
+    assert state["total_price"] == unconstrained["total_price"]
+
+
+def test_alternatives_follow_the_solver_choice(resident_catalog):
+    import api
+    from catalog import Catalog, ShardedCatalog
+    from fastapi.testclient import TestClient
+
+    rng = random.Random(3)
+    components = ["digital-multimeters", "clamp-meters", "safety-goggles", "electrical-insulating-gloves"]
+    products = {
+        vendor: [
+            {"id": f"{rng.choice(components)}-{vendor}-{i}", "name": f"{vendor} item {i}", "price": round(rng.uniform(5, 500), 2),
+             "category": "test", "specs": {}, "compatibility_tags": []}
+            for i in range(2_500)
+        ]
+        for vendor in ("vendor0", "vendor1")
+    }
+    counts = {c: sum(p["id"].startswith(c) for listed in products.values() for p in listed) for c in components}
+    resident_catalog.set_catalog(ShardedCatalog({
+        vendor: Catalog(listed, vendor=vendor, version=vendor) for vendor, listed in products.items()
+    }))
+
+    unconstrained = run_cartpilot("electrical work")
+    state = run_cartpilot("electrical work", {"budget": 10_000})
+    assert state["solver"]["feasible"] and not state["validation_errors"]
+    assert state["total_price"] == unconstrained["total_price"]
+
+
+def test_alternatives_follow_the_solver_choice(resident_catalog):
+    import api
+    from catalog import Catalog, ShardedCatalog
+    from fastapi.testclient import TestClient
+
+    rng = random.Random(3)
+    components = ["digital-multimeters", "clamp-meters", "safety-goggles", "electrical-insulating-gloves"]
+    shards = {
+        vendor: Catalog([
+            {"id": f"{rng.choice(components)}-{vendor}-{i}", "name": f"{vendor} item {i}", "price": round(rng.uniform(5, 500), 2),
+             "category": "test", "specs": {}, "compatibility_tags": []}
+            for i in range(2_500)
+        ], vendor=vendor, version=vendor)
+        for vendor in ("vendor0", "vendor1")
+    }
+    resident_catalog.set_catalog(ShardedCatalog(shards))
+    counts = {c: sum(shard.products[i]["id"].startswith(c) for shard in shards.values() for i in range(len(shard.products)))
+              for c in components}
+
+    unconstrained = run_cartpilot("electrical work")
+    state = run_cartpilot("electrical work", {"budget": round(unconstrained["total_price"] * 0.9, 2)})
+    assert state["solver"]["feasible"] and state["total_price"] < unconstrained["total_price"]
+
+    client = TestClient(api.app)
+    first_match = unconstrained["selected_products"]
+    moved = 0
+    for component, product in state["selected_products"].items():
+        listed = list(state["product_alternatives"][component])
+        cursor = state["alternatives_cursor"][component]
+        while cursor:
+            page = client.get("/alternatives", params={"cursor": cursor, "limit": 100}).json()
+            listed += page["alternatives"]
+            cursor = page["next_cursor"]
+        ids = [p["id"] for p in listed]
+        assert product["id"] not in ids
+        assert len(set(ids)) == len(ids) == counts[component] - 1
+        if product["id"] != first_match[component]["id"]:
+            moved += 1
+            # The displaced first match is an alternative again
+            assert first_match[component]["id"] in ids
+    assert moved
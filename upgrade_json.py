@@ -1,60 +1,128 @@
-import json
+"""
+Catalog enrichment: fills category, price, specs and compatibility tags for
+scraped products.
+
+Products are streamed from the source file, enriched one at a time and
+written out as they go, so peak memory stays flat on multi-GB vendor dumps.
+With --dedupe, a first pass over the source finds duplicates (see dedup.py),
+which the second pass collapses into canonical records. That first pass
+keeps a compact fingerprint per product, so memory then grows with the
+product count.
+
+Usage:
+    python upgrade_json.py [source] [target] [--format json|ndjson|compiled] [--dedupe]
+"""
+import argparse
+import time
+from pathlib import Path
+from typing import Dict
+
+from catalog import DEFAULT_VENDOR
+from catalog_stream import iter_products, JSONWriter, NDJSONWriter
+from catalog_compiler import CompiledWriter
+from dedup import Deduplicator, canonical_record, variant_record
+from enrichment import enrich_stream, get_engine
+
+DEFAULT_TARGETS = {
+    "json": "grainger_catalog_enriched.json",
+    "ndjson": "grainger_catalog_enriched.ndjson",
+    "compiled": "grainger_catalog_enriched.bin",
+}
 
-# load your huge scraped file
-with open("catalog.json","r") as f:
-    data = json.load(f)
 
 def enrich(product):
-    name = product["name"].lower()
-
-    # ---------- CATEGORY DETECTION ----------
-    if any(x in name for x in ["helmet","glove","respirator","goggles","hearing","fall","first aid","fire","gas","spill","lockout"]):
-        category = "safety"
-    elif any(x in name for x in ["camera","metal detector","safe","lock","gate","security"]):
-        category = "security"
-    elif any(x in name for x in ["hammer","pliers","wrench","screwdriver","drill","grinder","saw","tool","socket","bit"]):
-        category = "tools"
-    elif any(x in name for x in ["multimeter","clamp","oscilloscope","thermal","thermometer","air quality","pressure","sound","tachometer","data logger","inspection"]):
-        category = "test_instruments"
-    elif "kh-" in product["id"]:
-        category = "guide"
-    else:
-        category = "safety"
+    """Classify one product and fill price/specs/tags defaults (see enrichment.py)."""
+    return get_engine().enrich(product)
 
-    product["category"] = category
 
-    # ---------- PRICE + SPECS ----------
-    if product["price"] == 0:
-        if category == "safety":
-            product["price"] = 49.99
-            product["specs"] = {"type":"ppe"}
-            product["compatibility_tags"] = ["ppe","workplace_safety"]
+def deduplicated(source, vendor=DEFAULT_VENDOR):
+    """
+    Stream (vendor, product) pairs from source with duplicates collapsed.
 
-        elif category == "security":
-            product["price"] = 299.99
-            product["specs"] = {"type":"facility_security"}
-            product["compatibility_tags"] = ["security","access_control"]
+    Reads the source twice: once to fingerprint ids and names, once to emit
+    canonical records with their variants attached in full. A canonical
+    record is emitted once its last duplicate has been read, so only records
+    of clusters still being assembled are held in memory.
+    """
+    dedup = Deduplicator()
+    for product_vendor, product in iter_products(Path(source), vendor=vendor):
+        dedup.add(product, product_vendor)
+    plan = dedup.plan()
+    collapsed = len(dedup) - len(plan)
+    if collapsed:
+        print(f"🧹 Collapsing {collapsed:,} duplicate products into {len(plan):,} canonical records")
+
+    head_of = {row: head for head, variants in plan.items() for row in variants}
+    # head row -> [vendor, canonical product (None until read), {variant row: record}]
+    assembling: Dict[int, list] = {}
+    for row, (product_vendor, product) in enumerate(iter_products(Path(source), vendor=vendor)):
+        head = head_of.get(row, row)
+        if head == row and not plan[row]:
+            yield product_vendor, canonical_record(product, [])
+            continue
+        entry = assembling.setdefault(head, [None, None, {}])
+        if head == row:
+            entry[0], entry[1] = product_vendor, product
+        else:
+            entry[2][row] = variant_record(product)
+        if entry[1] is not None and len(entry[2]) == len(plan[head]):
+            del assembling[head]
+            yield entry[0], canonical_record(entry[1], [entry[2][v] for v in plan[head]])
+
+
+def upgrade_catalog(source, target, fmt="json", vendor=DEFAULT_VENDOR, progress_every=100_000, workers=None, dedupe=False):
+    """
+    Stream-enrich source into target. Returns (rows written, rows per second).
+
+    Products are enriched in batches across `workers` processes (default: one
+    per CPU). With dedupe, duplicate products are collapsed first, at the
+    cost of a second read and O(products) fingerprint memory. The
+    compiled format holds a single vendor; other vendors are skipped.
+    """
+    if fmt == "compiled":
+        writer = CompiledWriter(Path(target), vendor=vendor)
+    elif fmt == "ndjson":
+        writer = NDJSONWriter(Path(target))
+    else:
+        writer = JSONWriter(Path(target))
 
-        elif category == "tools":
-            product["price"] = 59.99
-            product["specs"] = {"material":"steel"}
-            product["compatibility_tags"] = ["hand_tool"]
+    rows = skipped = 0
+    start = time.perf_counter()
+    products = deduplicated(source, vendor) if dedupe else iter_products(Path(source), vendor=vendor)
+    for product_vendor, product in enrich_stream(products, workers=workers):
+        if fmt == "compiled" and product_vendor != vendor:
+            skipped += 1
+            continue
+        if fmt == "compiled":
+            writer.add(product)
+        else:
+            writer.add(product_vendor, product)
+        rows += 1
+        if progress_every and rows % progress_every == 0:
+            print(f"  {rows:,} rows ({rows / (time.perf_counter() - start):,.0f} rows/s)")
+    writer.close()
 
-        elif category == "test_instruments":
-            product["price"] = 249.99
-            product["specs"] = {"usage":"diagnostics"}
-            product["compatibility_tags"] = ["testing"]
+    if skipped:
+        print(f"⚠ Skipped {skipped:,} products from vendors other than {vendor!r}")
+    elapsed = time.perf_counter() - start
+    return rows, rows / elapsed if elapsed > 0 else 0.0
 
-        elif category == "guide":
-            product["price"] = 0
-            product["specs"] = {"type":"knowledge_article"}
-            product["compatibility_tags"] = ["guide","documentation"]
 
-for p in data["products"]["grainger"]:
-    enrich(p)
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Enrich a scraped catalog (streaming)")
+    parser.add_argument("source", nargs="?", default="catalog.json", help="catalog.json or .ndjson")
+    parser.add_argument("target", nargs="?")
+    parser.add_argument("--format", choices=sorted(DEFAULT_TARGETS), default="json")
+    parser.add_argument("--vendor", default=DEFAULT_VENDOR)
+    parser.add_argument("--workers", type=int, help="enrichment processes (default: CPU count)")
+    parser.add_argument(
+        "--dedupe", action="store_true", help="collapse duplicate products (two passes, memory grows with input)"
+    )
+    args = parser.parse_args()
 
-# save upgraded file
-with open("grainger_catalog_enriched.json","w") as f:
-    json.dump(data,f,indent=2)
+    target = args.target or DEFAULT_TARGETS[args.format]
+    rows, rate = upgrade_catalog(
+        args.source, target, fmt=args.format, vendor=args.vendor, workers=args.workers, dedupe=args.dedupe
+    )
 
-print("✅ Catalog successfully enriched!")
+    print(f"✅ Catalog successfully enriched! {rows:,} products → {target} ({rate:,.0f} rows/s)")